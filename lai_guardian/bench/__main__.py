@@ -0,0 +1,63 @@
+from __future__ import annotations
+"""python -m lai_guardian.bench: roda os benchmarks e grava o resultado em JSON (opcionalmente comparando com outro)."""
+import argparse
+import json
+
+from .corpus import CorpusConfig
+from .runner import BENCHMARKS, compare, run_benchmarks, save_results
+
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="lai_guardian.bench")
+    p.add_argument("--rows", type=int, default=5_000, help="Pedidos no corpus sintético.")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--pii-density", type=float, default=0.35, help="Fração de pedidos com dado pessoal.")
+    p.add_argument("--admin-density", type=float, default=0.30, help="Fração de pedidos com SEI/CNJ/protocolo.")
+    p.add_argument("--min-sentences", type=int, default=1)
+    p.add_argument("--max-sentences", type=int, default=6, help="Controla o tamanho dos textos.")
+    p.add_argument("--only", type=str, default=",".join(BENCHMARKS), help=f"Subconjunto de: {', '.join(BENCHMARKS)}.")
+    p.add_argument("--ner", choices=("both", "off", "on"), default="both")
+    p.add_argument("--no-isolate", action="store_true", help="Roda tudo no mesmo processo (RSS acumulado).")
+    p.add_argument("--out", type=str, default="data/processed/bench.json")
+    p.add_argument("--compare", type=str, default="", help="JSON de uma execução anterior para comparar.")
+    return p
+
+
+def main():
+    args = build_parser().parse_args()
+    from ..ui.render import console
+    from rich.markup import escape
+    from rich.table import Table
+
+    cfg = CorpusConfig(
+        n_rows=args.rows, seed=args.seed, pii_density=args.pii_density, admin_density=args.admin_density,
+        min_sentences=args.min_sentences, max_sentences=args.max_sentences,
+    )
+    ner_modes = {"both": (False, True), "off": (False,), "on": (True,)}[args.ner]
+    only = [b.strip() for b in args.only.split(",") if b.strip()]
+    results = run_benchmarks(cfg, only=only, ner_modes=ner_modes, isolate=not args.no_isolate)
+    save_results(results, args.out)
+
+    ratios = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            ratios = compare(json.load(f), results)
+
+    t = Table(title=f"Benchmarks ({args.rows} pedidos, seed {args.seed})")
+    for col in ("Estágio", "linhas/s", "p50 ms", "p99 ms", "pico RSS MB") + (("vs. anterior",) if ratios else ()):
+        t.add_column(col, justify="left" if col == "Estágio" else "right")
+    for key, r in results["results"].items():
+        if "skipped" in r:
+            t.add_row(escape(key), r["skipped"], "", "", "", *([""] if ratios else []))
+            continue
+        row = [escape(key), f"{r['rows_per_sec']:,.0f}", str(r.get("p50_ms", "-")), str(r.get("p99_ms", "-")), str(r["peak_rss_mb"])]
+        if ratios:
+            ratio = ratios.get(key, {}).get("rows_per_sec")
+            row.append(f"{ratio:.2f}x" if ratio else "-")
+        t.add_row(*row)
+    console.print(t)
+    console.print(f"✅ Resultados em: [underline yellow]{args.out}[/underline yellow]", style="success")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+"""Gerador de pedidos e-SIC sintéticos (com gabarito de entidades) para benchmarks e testes de carga."""
+
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..core.metrics import ADMIN_TYPES, LABEL_COLUMNS, PII_TYPES
+
+# (tipo no padrão do detector, início, fim)
+Entity = Tuple[str, int, int]
+
+DEFAULT_PII_WEIGHTS = {
+    "CPF": 5, "TELEFONE": 4, "E-MAIL": 4, "NOME_PESSOA": 4,
+    "ENDEREÇO": 2, "CEP": 2, "RG": 1, "CARTÃO": 0.5,
+}
+
+_OPENINGS = (
+    "Prezados senhores, boa tarde!", "Bom dia.", "Olá,", "Senhores,", "À Ouvidoria,",
+    "Prezada equipe do e-SIC,", "",
+)
+_REQUESTS = (
+    "Solicito cópia do contrato firmado com a empresa responsável pela manutenção das escolas",
+    "Gostaria de saber quais foram os gastos com diárias e passagens no último exercício",
+    "Solicito acesso ao laudo de adicional de periculosidade pago atualmente aos servidores",
+    "Peço informações sobre a fila de cirurgias eletivas no hospital regional",
+    "Requeiro a relação de servidores lotados na administração regional",
+    "Solicito a planilha de medição das obras de pavimentação do bairro",
+    "Gostaria de receber o cronograma de poda de árvores da minha região",
+    "Peço a cópia integral das atas das reuniões do conselho",
+    "Solicito informações sobre o reajuste do auxílio saúde dos dependentes",
+    "Requeiro dados sobre a frota de veículos oficiais e seus custos de manutenção",
+)
+_FILLERS = (
+    "conforme previsto na Lei de Acesso à Informação.",
+    "visto a decorrência de prazo em andamento.",
+    "pois a informação é de interesse coletivo.",
+    "haja vista que o pedido anterior não foi respondido.",
+    "no formato de planilha eletrônica, se possível.",
+    "referente aos anos de 2023 a 2025.",
+    "com a devida urgência.",
+    "Agradeço desde já a atenção.",
+)
+_FIRST = ("Maria", "João", "Ana", "Carlos", "Francisca", "José", "Antônia", "Paulo", "Luiza", "Pedro", "Juliana", "Marcos")
+_LAST = ("Silva", "Souza", "Oliveira", "Santos", "Pereira", "Lima", "Carvalho", "Ferreira", "Rodrigues", "Almeida", "Costa", "Gomes")
+_STREETS = ("Rua das Flores", "Avenida Central", "Quadra Cento e Dois Norte", "Rua Jardim Botânico", "Avenida das Palmeiras", "Travessa São José")
+_DOMAINS = ("exemplo.gov.br", "gmail.com", "hotmail.com", "uol.com.br", "empresa.com.br")
+
+
+def cpf_digits(rng: random.Random) -> str:
+    """CPF com dígitos verificadores válidos (mód. 11), nunca com todos os dígitos iguais."""
+    while True:
+        base = [rng.randrange(10) for _ in range(9)]
+        if len(set(base)) > 1:
+            break
+    for weight in (10, 11):
+        s = sum(v * (weight - i) for i, v in enumerate(base))
+        d = (s * 10) % 11
+        base.append(0 if d == 10 else d)
+    return "".join(map(str, base))
+
+
+def _cpf(rng: random.Random) -> str:
+    d = cpf_digits(rng)
+    return f"{d[:3]}.{d[3:6]}.{d[6:9]}-{d[9:]}" if rng.random() < 0.7 else d
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(_FIRST)} {rng.choice(_LAST)}" + (f" {rng.choice(_LAST)}" if rng.random() < 0.4 else "")
+
+
+def _phone(rng: random.Random) -> str:
+    ddd = rng.choice((61, 11, 21, 31, 62, 71))
+    n = f"9{rng.randrange(1000, 10000)}-{rng.randrange(10000):04d}"
+    return f"({ddd}) {n}" if rng.random() < 0.8 else f"{ddd} {n}"
+
+
+def _email(rng: random.Random) -> str:
+    user = f"{rng.choice(_FIRST)}.{rng.choice(_LAST)}".lower()
+    user = user.translate(str.maketrans("ãâáàéêíóôõúç", "aaaaeeiooouc"))
+    return f"{user}{rng.randrange(100) if rng.random() < 0.5 else ''}@{rng.choice(_DOMAINS)}"
+
+
+def _cep(rng: random.Random) -> str:
+    return f"{rng.randrange(70000, 73700)}-{rng.randrange(1000):03d}"
+
+
+def _address(rng: random.Random) -> str:
+    return f"{rng.choice(_STREETS)}, {rng.randrange(1, 2000)}"
+
+
+def _rg(rng: random.Random) -> str:
+    return f"{rng.randrange(1, 10)}.{rng.randrange(1000):03d}.{rng.randrange(1000):03d}-{rng.choice('0123456789X')}"
+
+
+def _card(rng: random.Random) -> str:
+    return " ".join(f"{rng.randrange(10000):04d}" for _ in range(4))
+
+
+def _sei(rng: random.Random) -> str:
+    return f"{rng.randrange(10, 100000):05d}-{rng.randrange(10**7, 10**8):08d}/{rng.randrange(2010, 2027)}-{rng.randrange(100):02d}"
+
+
+def _cnj(rng: random.Random) -> str:
+    return (f"{rng.randrange(10**7):07d}-{rng.randrange(100):02d}.{rng.randrange(2010, 2027)}."
+            f"8.07.{rng.randrange(10000):04d}")
+
+
+def _protocolo(rng: random.Random) -> str:
+    return f"{rng.randrange(10000, 999999)}/{rng.randrange(2018, 2027)}"
+
+
+# tipo -> (prefixo, gerador, sufixo). O gabarito cobre só o valor gerado.
+_TEMPLATES = {
+    "CPF": (("Meu CPF é ", "CPF: ", "inscrito no CPF sob o nº "), _cpf, (".", ",", " para cadastro.")),
+    "NOME_PESSOA": (("Meu nome é ", "Sou ", "O servidor ", "A requerente "), _name, (".", ", ", " solicita retorno.")),
+    "TELEFONE": (("Contato: ", "Telefone ", "ligar no "), _phone, (".", " (WhatsApp).", ".")),
+    "E-MAIL": (("Responder para ", "e-mail: ", "Meu email é "), _email, (".", " por favor.", ".")),
+    "CEP": (("CEP ", "CEP: "), _cep, (".", ",")),
+    "ENDEREÇO": (("Endereço: ", "Resido na ", "moro em: "), _address, (".", " apto 101.", ".")),
+    "RG": (("RG: ", "Identidade "), _rg, (".", " SSP/DF.")),
+    "CARTÃO": (("Cartão ", "cartão de crédito "), _card, (".",)),
+    "PROCESSO_SEI": (("Processo SEI ", "autos do processo SEI nº "), _sei, (".", ",")),
+    "PROCESSO_CNJ": (("Processo judicial ", "autos nº "), _cnj, (".", ",")),
+    "PROTOCOLO": (("Protocolo ", "protocolo nº "), _protocolo, (".", ",")),
+}
+
+
+@dataclass
+class CorpusConfig:
+    n_rows: int = 10_000
+    seed: int = 0
+    pii_density: float = 0.35  # fração dos pedidos com ao menos um dado pessoal
+    admin_density: float = 0.30  # fração com SEI/CNJ/protocolo
+    max_pii_per_row: int = 3
+    min_sentences: int = 1  # frases de "recheio": controlam o tamanho do texto
+    max_sentences: int = 6
+    pii_weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_PII_WEIGHTS))
+
+
+@dataclass
+class SyntheticRow:
+    text: str
+    entities: List[Entity]
+
+    @property
+    def label(self) -> int:
+        return int(any(t in PII_TYPES for t, _, _ in self.entities))
+
+    @property
+    def types(self) -> List[str]:
+        return sorted({t for t, _, _ in self.entities})
+
+
+def _row(rng: random.Random, cfg: CorpusConfig) -> SyntheticRow:
+    pieces: List[Tuple[str, Optional[str], str, str]] = []  # (prefixo, tipo, valor, sufixo)
+    opening = rng.choice(_OPENINGS)
+    if opening:
+        pieces.append((opening + " ", None, "", ""))
+    pieces.append((rng.choice(_REQUESTS) + ". ", None, "", ""))
+
+    fillers = [(rng.choice(_FILLERS) + " ", None, "", "") for _ in range(rng.randint(cfg.min_sentences, cfg.max_sentences))]
+    inserts = []
+    if rng.random() < cfg.admin_density:
+        inserts.append(rng.choice(ADMIN_TYPES))
+    if rng.random() < cfg.pii_density:
+        kinds, weights = zip(*[(k, w) for k, w in cfg.pii_weights.items() if w > 0])
+        inserts.extend(rng.choices(kinds, weights, k=rng.randint(1, cfg.max_pii_per_row)))
+    for tipo in inserts:
+        prefixes, gen, suffixes = _TEMPLATES[tipo]
+        fillers.insert(rng.randrange(len(fillers) + 1), (rng.choice(prefixes), tipo, gen(rng), rng.choice(suffixes) + " "))
+    pieces.extend(fillers)
+
+    parts, entities, pos = [], [], 0
+    for prefix, tipo, value, suffix in pieces:
+        parts.append(prefix)
+        pos += len(prefix)
+        if tipo:
+            parts.append(value)
+            entities.append((tipo, pos, pos + len(value)))
+            pos += len(value)
+        parts.append(suffix)
+        pos += len(suffix)
+    text = "".join(parts).rstrip(" ,")
+    if not text.endswith("."):
+        text += "."
+    return SyntheticRow(text, entities)
+
+
+def generate_rows(cfg: Optional[CorpusConfig] = None) -> Iterator[SyntheticRow]:
+    """Gera `cfg.n_rows` pedidos. Mesma semente, mesmo corpus."""
+    cfg = cfg or CorpusConfig()
+    rng = random.Random(cfg.seed)
+    for _ in range(cfg.n_rows):
+        yield _row(rng, cfg)
+
+
+def generate_corpus(cfg: Optional[CorpusConfig] = None) -> List[SyntheticRow]:
+    return list(generate_rows(cfg))
+
+
+def to_frame(rows: List[SyntheticRow], text_col: str = "Texto Mascarado"):
+    """DataFrame com ID, texto e as colunas label_* do dataset rotulado."""
+    import pandas as pd
+
+    data: Dict[str, list] = {"ID": list(range(1, len(rows) + 1)), text_col: [r.text for r in rows]}
+    data["label_any_pii"] = [r.label for r in rows]
+    for col, kinds in LABEL_COLUMNS.items():
+        data[col] = [int(any(t in kinds for t, _, _ in r.entities)) for r in rows]
+    return pd.DataFrame(data)
@@ -0,0 +1,198 @@
+from __future__ import annotations
+"""Benchmarks de vazão/latência/memória dos estágios do LAI Guardian sobre o corpus sintético."""
+
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .corpus import CorpusConfig, generate_corpus, to_frame
+
+BENCHMARKS = ("detect", "redact", "predict", "export_excel", "full_pipeline")
+SCHEMA = 1
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss: KB no Linux, bytes no macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def time_per_item(fn: Callable[[Any], Any], items: Iterable[Any]) -> Dict[str, float]:
+    """Chama fn(item) para cada item e resume: vazão, p50/p99 (ms) e total."""
+    lat: List[float] = []
+    t0 = time.perf_counter()
+    for item in items:
+        s = time.perf_counter()
+        fn(item)
+        lat.append(time.perf_counter() - s)
+    total = time.perf_counter() - t0
+    lat.sort()
+    return {
+        "rows": len(lat),
+        "seconds": round(total, 6),
+        "rows_per_sec": round(len(lat) / total, 2) if total else 0.0,
+        "p50_ms": round(_percentile(lat, 0.50) * 1000, 4),
+        "p99_ms": round(_percentile(lat, 0.99) * 1000, 4),
+    }
+
+
+def time_whole(fn: Callable[[], Any], rows: int) -> Dict[str, float]:
+    """Para estágios que só fazem sentido em lote (Excel, pipeline): vazão sem latência por texto."""
+    t0 = time.perf_counter()
+    fn()
+    total = time.perf_counter() - t0
+    return {"rows": rows, "seconds": round(total, 6), "rows_per_sec": round(rows / total, 2) if total else 0.0}
+
+
+def _ner_available() -> bool:
+    from ..core.detector import HybridDetector
+    return HybridDetector(use_ner=True)._ensure_ner()
+
+
+# --- estágios ---
+
+def _bench_detect(texts: List[str], ner: bool) -> Dict[str, Any]:
+    from ..core.detector import HybridDetector
+    det = HybridDetector(use_ner=ner)
+    det._ensure_ner()
+    return time_per_item(det.detect, texts)
+
+
+def _bench_redact(texts: List[str], ner: bool) -> Dict[str, Any]:
+    from ..core.detector import HybridDetector
+    from ..core.anonymizer import redact_by_spans
+    det = HybridDetector(use_ner=ner)
+    pairs = list(zip(texts, det.detect_batch(texts)))  # só a tarja entra na medição
+    return time_per_item(lambda p: redact_by_spans(p[0], p[1]), pairs)
+
+
+def _bench_predict(texts: List[str], labels: List[int]) -> Dict[str, Any]:
+    from ..ml.model import TextClassifier
+    clf = TextClassifier()
+    n_train = max(2, len(texts) // 2)
+    clf.train(texts[:n_train], labels[:n_train])
+    out = time_per_item(lambda t: clf.predict([t]), texts)
+    out["batch"] = time_whole(lambda: clf.predict(texts), len(texts))
+    return out
+
+
+def _bench_export_excel(df) -> Dict[str, Any]:
+    from ..reports.excel import export_excel
+    with tempfile.TemporaryDirectory() as tmp:
+        return time_whole(lambda: export_excel(df, os.path.join(tmp, "auditoria.xlsx")), len(df))
+
+
+def _bench_full_pipeline(df, ner: bool) -> Dict[str, Any]:
+    from ..pipeline import FullPipelineConfig, run_full_pipeline
+    from ..ui.render import console
+
+    console.quiet = True
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "entrada.csv")
+        df.to_csv(src, index=False)
+        cfg = FullPipelineConfig(
+            input_path=src,
+            model_path=os.path.join(tmp, "sem_modelo.joblib"),
+            no_ner=not ner,
+            bundle_dir=os.path.join(tmp, "run"),
+        )
+        return time_whole(lambda: run_full_pipeline(cfg), len(df))
+
+
+def run_one(name: str, corpus_cfg: CorpusConfig, ner: bool = False) -> Dict[str, Any]:
+    """Executa um benchmark e devolve as métricas + pico de RSS do processo."""
+    rows = generate_corpus(corpus_cfg)
+    texts = [r.text for r in rows]
+    if name == "detect":
+        out = _bench_detect(texts, ner)
+    elif name == "redact":
+        out = _bench_redact(texts, ner)
+    elif name == "predict":
+        out = _bench_predict(texts, [r.label for r in rows])
+    elif name == "export_excel":
+        out = _bench_export_excel(to_frame(rows))
+    elif name == "full_pipeline":
+        out = _bench_full_pipeline(to_frame(rows), ner)
+    else:
+        raise ValueError(f"Benchmark desconhecido: {name} (use {', '.join(BENCHMARKS)})")
+    out["peak_rss_mb"] = round(_peak_rss_mb(), 1)
+    return out
+
+
+def run_benchmarks(
+    corpus_cfg: Optional[CorpusConfig] = None,
+    only: Sequence[str] = BENCHMARKS,
+    ner_modes: Sequence[bool] = (False, True),
+    isolate: bool = True,
+) -> Dict[str, Any]:
+    """
+    Roda os benchmarks pedidos. Com `isolate`, cada um roda num processo novo (spawn),
+    para que o pico de RSS seja só dele e não herde caches dos anteriores.
+    Estágios que dependem de NER aparecem como "<nome>[ner]" / "<nome>[no_ner]".
+    """
+    corpus_cfg = corpus_cfg or CorpusConfig()
+    ner_ok = True in ner_modes and _ner_available()
+    results: Dict[str, Any] = {}
+
+    ctx = multiprocessing.get_context("spawn")
+    for name in only:
+        modes = ner_modes if name in ("detect", "redact", "full_pipeline") else (False,)
+        for ner in modes:
+            key = f"{name}[{'ner' if ner else 'no_ner'}]" if name in ("detect", "redact", "full_pipeline") else name
+            if ner and not ner_ok:
+                results[key] = {"skipped": "spaCy/pt_core_news_sm indisponível"}
+                continue
+            if isolate:
+                with ctx.Pool(1) as pool:
+                    results[key] = pool.apply(run_one, (name, corpus_cfg, ner))
+            else:
+                results[key] = run_one(name, corpus_cfg, ner)
+
+    return {
+        "schema": SCHEMA,
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "isolated": isolate,
+            "corpus": asdict(corpus_cfg),
+        },
+        "results": results,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Dict[str, Optional[float]]]:
+    """Razões novo/antigo por benchmark (vazão > 1 é melhor; p99 e RSS < 1 são melhores)."""
+    out: Dict[str, Dict[str, Optional[float]]] = {}
+    for key, cur in new.get("results", {}).items():
+        prev = old.get("results", {}).get(key)
+        if not prev or "skipped" in cur or "skipped" in prev:
+            continue
+        row: Dict[str, Optional[float]] = {}
+        for metric in ("rows_per_sec", "p99_ms", "peak_rss_mb"):
+            a, b = prev.get(metric), cur.get(metric)
+            row[metric] = round(b / a, 3) if a and b is not None else None
+        out[key] = row
+    return out
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
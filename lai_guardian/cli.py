@@ -1,84 +1,138 @@
 from __future__ import annotations
 """CLI do LAI Guardian. Útil quando você quer controlar entradas/saídas sem mexer no run.py."""
-import argparse, os, time, json
+import argparse, os, time
+
+# Só o necessário para montar o parser. pandas, scikit-learn, openpyxl, rich e spaCy
+# são importados dentro de cada comando: `--help` e comandos pequenos não pagam por eles.
+# (Ver tests/test_startup.py, que mede o tempo de import.)
+OVERLAP_POLICIES = ("longest", "risk", "union")  # espelho de core.anonymizer.OVERLAP_POLICIES
+DEFAULT_OVERLAP_POLICY = "longest"
+REGEX_BACKENDS = ("auto", "re", "re2", "hyperscan")  # espelho de core.regex_backend.BACKENDS
+
+def add_overlap_policy_argument(parser: argparse.ArgumentParser) -> None:
+    """--overlap-policy comum aos comandos que tarjam (e a run_full.py)."""
+    parser.add_argument(
+        "--overlap-policy", choices=OVERLAP_POLICIES, default=DEFAULT_OVERLAP_POLICY,
+        help="Rótulo da tarja quando achados se sobrepõem.",
+    )
 
-from .ui.render import console, header, kpis, confusion, spinner_progress
-from .io.loader import load_table, parse_labels
-from .core.engine import GuardianEngine
-from .core.metrics import calculate, to_dict
-from .reports.excel import export_excel
-from .ml.model import TextClassifier
-from .pipeline import FullPipelineConfig, run_full_pipeline
+def add_regex_backend_argument(parser: argparse.ArgumentParser) -> None:
+    """--regex-backend comum aos comandos que rodam o detector (e a run_full.py)."""
+    parser.add_argument(
+        "--regex-backend", choices=REGEX_BACKENDS, default="auto",
+        help="Motor de regex: auto (RE2/Hyperscan se instalados), re, re2 ou hyperscan (mesmo resultado).",
+    )
 
 def cmd_default(args):
-    ml = TextClassifier.load(args.model) if args.model else None
-    engine = GuardianEngine(use_ner=not args.no_ner, ml_model=ml)
-
-    data = load_table(args.input, args.column, label_col=args.label_col or None)
-    df = data.df.copy()
-    texts = df[data.text_col].astype(str).tolist()
+    from .ui.render import console, header, spinner_progress
+    import pandas as pd
+    from .io.loader import iter_table, read_header
+    from .core.engine import GuardianEngine
+    from .core.cache import ResultCache
+    from .core.columnar import add_audit_columns
+    from .reports.excel import ExcelAuditWriter
+    from .ml.registry import load_model
+
+    ml = load_model(args.model) if args.model else None
+    engine = GuardianEngine(
+        use_ner=not args.no_ner, ml_model=ml, overlap_policy=args.overlap_policy,
+        cache=ResultCache(args.cache) if args.cache else None, columnar=args.columnar, ml_threshold=args.ml_threshold,
+        regex_backend=args.regex_backend,
+    )
 
     header()
-    console.print(f"✔ Fonte carregada: [bold]{len(df)}[/bold] registros.", style="muted")
-
-    with spinner_progress("Auditando pedidos LAI...") as prog:
-        task = prog.add_task("Auditando pedidos LAI...", total=max(1, len(texts)))
-        flags, reasons, redacted = [], [], []
-        types_detected, max_risk, findings_count = [], [], []
-        for t in texts:
-            dec = engine.analyze(t, redact=True)
-            flags.append(dec.contains_pii)
-            reasons.append(dec.reason)
-            redacted.append(dec.redacted_text)
-            types_detected.append(getattr(dec, 'types_detected', ''))
-            max_risk.append(getattr(dec, 'max_risk', ''))
-            findings_count.append(int(getattr(dec, 'findings_count', 0)))
-            prog.update(task, advance=1)
-
-    df["Contem_Dados_Pessoais"] = flags
-    df["Motivo"] = reasons
-    df["Versao_Publicavel"] = redacted
-    df["Tipos_Detectados"] = types_detected
-    df["Risco_Max"] = max_risk
-    df["Qtd_Achados"] = findings_count
+    console.print(f"✔ Fonte: [bold]{args.input}[/bold] (leitura em blocos de {args.chunk_rows} linhas)", style="muted")
 
+    # Bloco a bloco (iter_table): cada bloco vai para o Excel assim que é auditado.
+    xls = None
     if args.out:
         os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
-        export_excel(df, args.out)
+        xls = ExcelAuditWriter(
+            args.out, shard_rows=args.excel_shard_rows, shard_files=args.excel_shard_files, workers=args.workers,
+        )
+    frames = []
+    total = 0
+    with spinner_progress("Auditando pedidos LAI...") as prog:
+        task = prog.add_task("Auditando pedidos LAI...", total=None)
+
+        def tables():
+            for chunk in iter_table(args.input, args.column, label_col=args.label_col or None, chunk_rows=args.chunk_rows):
+                frames.append(chunk.df)
+                yield chunk.df[chunk.text_col].astype(str).tolist()
+
+        for decisions in engine.analyze_stream(
+            tables(), workers=args.workers, redact=True, progress=lambda n: prog.update(task, advance=n),
+        ):
+            df = frames.pop(0)
+            # As colunas de resumo saem da tabela longa de achados (groupby), não de listas por linha.
+            add_audit_columns(df, decisions, engine.ml_model is not None)
+            if xls is not None:
+                xls.write(df)
+            total += len(df)
+        prog.update(task, total=max(1, total), completed=max(1, total))
+
+    console.print(f"✔ Registros auditados: [bold]{total}[/bold]", style="muted")
+    if xls is not None:
+        if not total:
+            xls.write(add_audit_columns(pd.DataFrame(columns=read_header(args.input)), [], engine.ml_model is not None))
+        written = xls.close()
         console.print(f"✅ Excel gerado em: [underline yellow]{args.out}[/underline yellow]", style="success")
+        if len(written) > 1:
+            console.print(f"   + {len(written) - 1} partes ({os.path.basename(written[1])} ...)", style="muted")
 
 def cmd_anonymize(args):
-    ml = TextClassifier.load(args.model) if args.model else None
-    engine = GuardianEngine(use_ner=not args.no_ner, ml_model=ml)
-
-    data = load_table(args.input, args.column, label_col=None)
-    df = data.df.copy()
-    texts = df[data.text_col].astype(str).tolist()
+    from .ui.render import console, header, spinner_progress
+    from .io.loader import iter_table
+    from .core.engine import GuardianEngine
+    from .core.cache import ResultCache
+    from .reports.trail import open_trail
+    from .ml.registry import load_model
+
+    ml = load_model(args.model) if args.model else None
+    engine = GuardianEngine(
+        use_ner=not args.no_ner, ml_model=ml, overlap_policy=args.overlap_policy,
+        cache=ResultCache(args.cache) if args.cache else None, ml_threshold=args.ml_threshold,
+        regex_backend=args.regex_backend,
+    )
 
     header()
-    console.print(f"✔ Fonte carregada: [bold]{len(df)}[/bold] registros.", style="muted")
-
-    rel = []
-    with spinner_progress("Anonimizando e gerando trilha...") as prog:
-        task = prog.add_task("Anonimizando e gerando trilha...", total=max(1, len(texts)))
-        for idx, t in enumerate(texts):
-            dec = engine.analyze(t, redact=True)
-            if dec.contains_pii:
-                rel.append({"row": int(idx), "reason": dec.reason, "findings": dec.findings, "public_text": dec.redacted_text})
-            prog.update(task, advance=1)
+    console.print(f"✔ Fonte: [bold]{args.input}[/bold] (leitura em blocos de {args.chunk_rows} linhas)", style="muted")
 
     os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
-    with open(args.json, "w", encoding="utf-8") as f:
-        json.dump(rel, f, ensure_ascii=False, indent=2)
+    total = 0
+    with spinner_progress("Anonimizando e gerando trilha...") as prog, open_trail(args.json) as trail:
+        task = prog.add_task("Anonimizando e gerando trilha...", total=None)
+        indices = []
+
+        def tables():
+            for chunk in iter_table(args.input, args.column, chunk_rows=args.chunk_rows):
+                indices.append(chunk.df.index)
+                yield chunk.df[chunk.text_col].astype(str).tolist()
+
+        # Um único pool de workers (spaCy/modelo carregados uma vez) atende todos os blocos.
+        for decisions in engine.analyze_stream(
+            tables(), workers=args.workers, redact=True, progress=lambda n: prog.update(task, advance=n),
+        ):
+            for idx, dec in zip(indices.pop(0), decisions):
+                if dec.contains_pii:
+                    trail.write({"row": int(idx), "reason": dec.reason, "findings": dec.findings, "public_text": dec.redacted_text})
+            total += len(decisions)
+        prog.update(task, total=max(1, total), completed=max(1, total))
+
     console.print(f"✅ Relatório JSON em: [underline yellow]{args.json}[/underline yellow]", style="success")
 
 
 def cmd_full(args):
+    from .pipeline import FullPipelineConfig, run_full_pipeline
+
     cfg = FullPipelineConfig(
         input_path=args.input_full or None,
         input_column=args.column_full,
         excel_out=args.excel_full,
+        excel_shard_rows=args.excel_shard_rows,
+        excel_shard_files=args.excel_shard_files,
         json_out=args.json_full,
+        findings_out=args.findings_full or None,
         train_csv=args.train_csv or None,
         train_text_col=args.train_text_col,
         train_label_col=args.train_label_col,
@@ -87,14 +141,70 @@ def cmd_full(args):
         eval_label_col=args.eval_label_col,
         model_path=args.model_path,
         metrics_out=args.metrics_out,
+        tune=args.tune,
+        tune_folds=args.tune_folds,
+        tune_jobs=args.tune_jobs,
         no_ner=args.no_ner_full,
         strict=args.strict,
+        ner_batch_size=args.ner_batch_size,
+        workers=args.workers,
+        chunk_rows=args.chunk_rows,
+        overlap_policy=args.overlap_policy,
+        cache_path=args.cache or None,
+        incremental=args.incremental,
+        previous_bundle=args.previous_bundle or None,
+        id_column=args.id_column or None,
+        profile_rules=args.profile_rules,
+        columnar=args.columnar,
+        ml_threshold=args.ml_threshold,
+        regex_backend=args.regex_backend,
         bundle_dir=args.bundle_dir or None,
     )
     run_full_pipeline(cfg)
 
+def cmd_serve(args):
+    from .ui.render import console, header
+    from .core.engine import GuardianEngine
+    from .ml.registry import load_model
+    from .server import GuardianService, make_server
+
+    header()
+    ml = load_model(args.model) if args.model else None
+    engine = GuardianEngine(
+        use_ner=not args.no_ner, ml_model=ml, ner_batch_size=args.max_batch, overlap_policy=args.overlap_policy,
+        ml_threshold=args.ml_threshold, regex_backend=args.regex_backend,
+    )
+    service = GuardianService(
+        engine,
+        model_path=args.model or None,
+        max_batch=args.max_batch,
+        max_wait=args.max_wait_ms / 1000.0,
+        workers=args.workers,
+        max_pending=args.max_pending,
+        reload_interval=args.reload_interval,
+    )
+    server = make_server(service, args.host, args.port, args.unix_socket or None, quiet=not args.verbose)
+    where = args.unix_socket or f"http://{args.host}:{server.server_address[1]}"
+    console.print(f"✔ Servindo em [bold]{where}[/bold] (NER: {'sim' if engine.detector._ner_ready else 'não'}). Ctrl+C para parar.", style="muted")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.unlink(args.unix_socket)
+
 def cmd_train(args):
+    from .ui.render import console, header, spinner_progress
+    from .io.loader import load_table, parse_labels
+    from .ml.model import TextClassifier
+
     header()
+    if args.mode == "hashing" or args.warm_start:
+        return _train_streaming(args)
+
     data = load_table(args.csv, args.text_col, label_col=args.label_col)
     df = data.df
     y = parse_labels(df[data.label_col])
@@ -110,33 +220,164 @@ def cmd_train(args):
         prog.update(task, completed=100)
 
     os.makedirs(os.path.dirname(args.model) or ".", exist_ok=True)
-    clf.save(args.model)
+    clf.save(args.model, compact=args.compact, prune=args.prune)
     console.print(f"✅ Modelo salvo em: [underline yellow]{args.model}[/underline yellow]", style="success")
 
+def _train_streaming(args):
+    # Modo hashing: o CSV é lido em blocos de --chunk-rows e nunca fica inteiro na memória.
+    from .ui.render import console, spinner_progress
+    from .ml.model import MLConfig, TextClassifier
+    from .ml.train import train_from_table
+
+    if args.warm_start:
+        if not os.path.exists(args.model):
+            raise SystemExit(f"--warm-start: modelo não encontrado em {args.model}")
+        clf = TextClassifier.load(args.model)
+        if not clf.incremental:
+            kind = "compacto" if clf.compact else "do modo tfidf"
+            raise SystemExit(f"--warm-start: {args.model} é um modelo {kind}; só modelos hashing completos continuam o treino.")
+        console.print(f"✔ Continuando o treino de: [bold]{args.model}[/bold]", style="muted")
+    else:
+        clf = TextClassifier(MLConfig(mode="hashing", n_features=args.n_features, chunk_rows=args.chunk_rows))
+
+    with spinner_progress("Treinando modelo ML (hashing + SGD, em blocos)...") as prog:
+        task = prog.add_task("Treinando modelo ML (hashing + SGD, em blocos)...", total=None)
+        seen = train_from_table(
+            clf, args.csv, args.text_col, args.label_col, chunk_rows=args.chunk_rows, epochs=args.epochs,
+            progress=lambda n: prog.update(task, advance=n),
+        )
+        prog.update(task, total=max(1, seen), completed=max(1, seen))
+
+    os.makedirs(os.path.dirname(args.model) or ".", exist_ok=True)
+    clf.save(args.model, compact=args.compact, prune=args.prune)
+    console.print(f"✅ Modelo salvo em: [underline yellow]{args.model}[/underline yellow] ({seen} linhas)", style="success")
+
+def _floats(value: str):
+    return tuple(float(v) for v in value.split(",") if v.strip())
+
+
+def cmd_tune(args):
+    from .ui.render import console, header, spinner_progress
+    from .io.loader import load_table, parse_labels
+    from .ml.model import TextClassifier
+    from .ml.tune import SearchSpace, tune, write_results
+
+    header()
+    data = load_table(args.csv, args.text_col, label_col=args.label_col)
+    df = data.df
+    y = parse_labels(df[data.label_col])
+    X = df[data.text_col].astype(str).tolist()
+
+    space = SearchSpace(
+        min_df=tuple(int(v) for v in _floats(args.min_df)),
+        ngram_max=tuple(int(v) for v in _floats(args.ngram_max)),
+        C=_floats(args.C),
+        thresholds=_floats(args.thresholds) or SearchSpace().thresholds,
+    )
+    with spinner_progress("Buscando hiperparâmetros (validação cruzada)...") as prog:
+        task = prog.add_task("Buscando hiperparâmetros (validação cruzada)...", total=space.size() * args.folds)
+        result = tune(X, y, space, folds=args.folds, n_jobs=args.n_jobs, beta=args.beta, seed=args.seed,
+                      progress=lambda n: prog.update(task, advance=n))
+
+    json_path = os.path.join(args.out_dir, "tuning.json")
+    table_path = os.path.join(args.out_dir, "tuning.csv")
+    write_results(result, json_path, table_path)
+    cfg = result.config
+    console.print(
+        f"✅ Melhor: min_df={cfg.min_df}, ngram_max={cfg.ngram_max}, C={cfg.C}, limiar={result.threshold} "
+        f"(F{args.beta:g}={result.score:.4f}) → [underline yellow]{json_path}[/underline yellow]",
+        style="success",
+    )
+    if args.model:
+        clf = TextClassifier(cfg)
+        clf.train(X, y)
+        os.makedirs(os.path.dirname(args.model) or ".", exist_ok=True)
+        clf.save(args.model)
+        console.print(f"✅ Modelo com a melhor configuração salvo em: [underline yellow]{args.model}[/underline yellow] "
+                      f"(use --ml-threshold {result.threshold})", style="success")
+
 def cmd_evaluate(args):
+    from .ui.render import console, header, kpis, confusion, spinner_progress
+    from .io.loader import load_table, parse_labels
+    from .core.metrics import calculate, to_dict, update_metrics_file
+    from .ml.registry import load_model
+
     header()
     data = load_table(args.csv, args.text_col, label_col=args.label_col)
     df = data.df
     y_true = parse_labels(df[data.label_col])
     X = df[data.text_col].astype(str).tolist()
 
-    clf = TextClassifier.load(args.model)
+    clf = load_model(args.model)
 
     with spinner_progress("Avaliando modelo ML...") as prog:
         task = prog.add_task("Avaliando modelo ML...", total=max(1, len(X)))
         y_pred = []
         for i in range(0, len(X), 256):
             batch = X[i:i+256]
-            y_pred.extend(clf.predict(batch))
+            # Mesmo corte do backstop no motor e da etapa 4 do pipeline.
+            y_pred.extend(int(p >= args.ml_threshold) for p in clf.predict_proba(batch))
             prog.update(task, advance=len(batch))
 
     m = calculate(y_true, y_pred)
     kpis(m.precision, m.recall, m.f1, m.fn)
     confusion(m.vn, m.fp, m.fn, m.vp)
 
-    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
-    with open(args.report, "w", encoding="utf-8") as f:
-        json.dump(to_dict(m), f, ensure_ascii=False, indent=2)
+    # Só as chaves do modelo: o relatório do detector ("detector") e o perfil das regras continuam.
+    metrics = to_dict(m)
+    metrics["ml_threshold"] = args.ml_threshold
+    update_metrics_file(args.report, metrics)
+    console.print(f"✅ Relatório salvo em: [underline yellow]{args.report}[/underline yellow]", style="success")
+
+def cmd_evaluate_detector(args):
+    import pandas as pd
+    from rich.table import Table
+    from .ui.render import console, header, spinner_progress
+    from .io.loader import load_table, parse_labels
+    from .core.engine import GuardianEngine
+    from .core.metrics import LABEL_COLUMNS, PII_TYPES, label_matrix, per_type_report, update_metrics_file
+
+    header()
+    data = load_table(args.csv, args.text_col)
+    df = data.df
+    wanted = [c.strip() for c in args.labels.split(",") if c.strip()] if args.labels else list(LABEL_COLUMNS)
+    labels = {c: LABEL_COLUMNS[c] for c in wanted if c in LABEL_COLUMNS and c in df.columns}
+    if not labels:
+        raise SystemExit(f"Nenhuma coluna de rótulo por tipo encontrada em {args.csv} (esperado: {', '.join(LABEL_COLUMNS)}).")
+    texts = df[data.text_col].astype(str).tolist()
+
+    engine = GuardianEngine(use_ner=not args.no_ner, columnar=args.columnar, regex_backend=args.regex_backend)
+    with spinner_progress("Rodando o detector no conjunto rotulado...") as prog:
+        task = prog.add_task("Rodando o detector no conjunto rotulado...", total=max(1, len(texts)))
+        decisions = engine.analyze_many(
+            texts, workers=args.workers, chunk_size=args.chunk_size, redact=False,
+            progress=lambda n: prog.update(task, advance=n),
+        )
+    types = [[f["tipo"] for f in d.findings] for d in decisions]
+
+    y_true = pd.DataFrame({c: parse_labels(df[c]) for c in labels}).to_numpy(dtype=bool)
+    report = per_type_report(y_true, label_matrix(types, labels), list(labels), args.bootstrap, args.alpha, args.seed)
+    if "label_any_pii" in df.columns:
+        # "Algum dado pessoal": só os tipos pessoais contam (processo/protocolo são administrativos).
+        any_true = pd.Series(parse_labels(df["label_any_pii"])).to_numpy(dtype=bool)
+        any_pred = label_matrix(types, {"label_any_pii": PII_TYPES})
+        report["tipos"].update(per_type_report(any_true, any_pred[:, 0], ["label_any_pii"],
+                                               args.bootstrap, args.alpha, args.seed)["tipos"])
+    report["totais"] = {"linhas": len(texts), "ner": bool(engine.detector._ner_ready)}
+
+    t = Table(title="🧪 [bold]DETECTOR POR TIPO[/bold] (IC bootstrap)")
+    for col, justify in (("Rótulo", "left"), ("VP", "right"), ("FP", "right"), ("FN", "right"),
+                         ("Precisão", "right"), ("Recall", "right"), ("F1 [IC]", "right")):
+        t.add_column(col, justify=justify)
+    for name, entry in list(report["tipos"].items()) + [("micro", report["micro"])]:
+        c, m, ic = entry["contagens"], entry["metricas"], entry["ic"]["f1"]
+        interval = f" [{ic[0]:.1%}, {ic[1]:.1%}]" if ic else ""
+        t.add_row(name, str(c["vp"]), str(c["fp"]), str(c["fn"]), f"{m['precision']:.2%}", f"{m['recall']:.2%}",
+                  f"{m['f1']:.2%}{interval}")
+    console.print(t)
+
+    # metrics.json pode já ter as métricas do modelo: o detector entra na chave "detector".
+    update_metrics_file(args.report, {"detector": report})
     console.print(f"✅ Relatório salvo em: [underline yellow]{args.report}[/underline yellow]", style="success")
 
 def build_parser():
@@ -147,22 +388,44 @@ def build_parser():
     p.add_argument("--column", type=str, default="Texto Mascarado")
     p.add_argument("--label-col", type=str, default="")
     p.add_argument("--out", type=str, default="data/processed/auditoria.xlsx")
+    p.add_argument("--chunk-rows", type=int, default=50_000, help="Linhas lidas e auditadas por bloco da planilha/CSV.")
+    p.add_argument("--excel-shard-rows", type=int, default=0, help="Divide a auditoria a cada N linhas (0 = só no limite de 1.048.576 linhas da aba).")
+    p.add_argument("--excel-shard-files", action="store_true", help="Uma planilha por parte, gravadas em paralelo (--workers), com um índice/resumo consolidado no arquivo de saída.")
     p.add_argument("--model", type=str, default="")
     p.add_argument("--no-ner", action="store_true")
+    p.add_argument("--workers", type=int, default=1, help="Processos para a auditoria (0 = todos os núcleos).")
+    add_overlap_policy_argument(p)
+    p.add_argument("--cache", type=str, default="", help="Arquivo SQLite com decisões já calculadas (reaproveitadas entre execuções).")
+    p.add_argument("--columnar", action="store_true", help="Regras vetorizadas sobre a coluna inteira (mesmo resultado).")
+    p.add_argument("--ml-threshold", type=float, default=0.5, help="Probabilidade mínima para o backstop de ML marcar a linha (padrão 0.5).")
+    add_regex_backend_argument(p)
 
     a = sub.add_parser("anonymize", help="Anonimiza textos e gera trilha JSON.")
     a.add_argument("--input", type=str, default="data/raw/AMOSTRA_e-SIC.xlsx")
     a.add_argument("--column", type=str, default="Texto Mascarado")
-    a.add_argument("--json", type=str, default="data/processed/relatorio.json")
+    a.add_argument("--json", type=str, default="data/processed/relatorio.jsonl.gz",
+                   help="Trilha de saída. .jsonl/.jsonl.gz/.jsonl.zst grava em streaming (JSON Lines).")
     a.add_argument("--model", type=str, default="")
     a.add_argument("--no-ner", action="store_true")
+    a.add_argument("--workers", type=int, default=1, help="Processos para a anonimização (0 = todos os núcleos).")
+    add_overlap_policy_argument(a)
+    a.add_argument("--cache", type=str, default="", help="Arquivo SQLite com decisões já calculadas (reaproveitadas entre execuções).")
+    a.add_argument("--chunk-rows", type=int, default=50_000, help="Linhas lidas por bloco da planilha/CSV.")
+    a.add_argument("--ml-threshold", type=float, default=0.5, help="Probabilidade mínima para o backstop de ML marcar a linha (padrão 0.5).")
+    add_regex_backend_argument(a)
 
     
     f = sub.add_parser("full", help="Executa auditoria + anonimização + (opcional) treino + (opcional) avaliação em um comando.")
     f.add_argument("--input-full", type=str, default="data/raw/AMOSTRA_e-SIC.xlsx")
     f.add_argument("--column-full", type=str, default="Texto Mascarado")
     f.add_argument("--excel-full", type=str, default="data/processed/auditoria.xlsx")
-    f.add_argument("--json-full", type=str, default="data/processed/relatorio.json")
+    f.add_argument("--excel-shard-rows", type=int, default=0, help="Divide a auditoria a cada N linhas (0 = só no limite de 1.048.576 linhas da aba).")
+    f.add_argument("--excel-shard-files", action="store_true", help="Uma planilha por parte, gravadas em paralelo (--workers), com um índice/resumo consolidado no arquivo de saída.")
+    f.add_argument("--json-full", type=str, default="data/processed/relatorio.jsonl.gz",
+                   help="Trilha de saída. .jsonl/.jsonl.gz/.jsonl.zst grava em streaming; .json no formato antigo (tudo no fim).")
+    f.add_argument("--chunk-rows", type=int, default=50_000, help="Linhas por bloco da tabela (a trilha é gravada a cada bloco).")
+    f.add_argument("--findings-full", type=str, default="",
+                   help="Achados em Parquet (.parquet) ou Arrow IPC (.arrow); requer pyarrow. Desligado por padrão (ex.: data/processed/achados.parquet).")
 
     f.add_argument("--train-csv", type=str, default="")
     f.add_argument("--train-text-col", type=str, default="text")
@@ -174,16 +437,72 @@ def build_parser():
 
     f.add_argument("--model-path", type=str, default="data/processed/model.joblib")
     f.add_argument("--metrics-out", type=str, default="data/processed/metrics.json")
+    f.add_argument("--tune", action="store_true", help="Busca hiperparâmetros (validação cruzada) antes do treino.")
+    f.add_argument("--tune-folds", type=int, default=5)
+    f.add_argument("--tune-jobs", type=int, default=1, help="Processos da busca (-1 = todos os núcleos).")
 
     f.add_argument("--bundle-dir", type=str, default="", help="Se definido, salva todas as saídas dentro deste diretório.")
     f.add_argument("--no-ner-full", action="store_true", help="Desativa NER (spaCy) durante a execução FULL.")
     f.add_argument("--strict", action="store_true", help="Falha se alguma etapa solicitada não puder rodar.")
-
-t = sub.add_parser("train", help="Treina modelo ML supervisionado (CSV rotulado).")
+    f.add_argument("--ner-batch-size", type=int, default=64, help="Textos por lote no NER (spaCy nlp.pipe).")
+    f.add_argument("--workers", type=int, default=1, help="Processos para auditoria/anonimização (0 = todos os núcleos).")
+    add_overlap_policy_argument(f)
+    f.add_argument("--cache", type=str, default="", help="Arquivo SQLite com decisões já calculadas (reaproveitadas entre execuções).")
+    f.add_argument("--incremental", action="store_true", help="Reaproveita as linhas que não mudaram desde o bundle anterior.")
+    f.add_argument("--previous-bundle", type=str, default="", help="Bundle de referência do modo incremental (padrão: o irmão mais recente do bundle de saída com estado.jsonl.gz).")
+    f.add_argument("--id-column", type=str, default="", help="Coluna que identifica cada linha (padrão: hash do texto).")
+    f.add_argument("--profile-rules", action="store_true", help="Mede tempo e contadores por regra (summary e metrics.json).")
+    f.add_argument("--columnar", action="store_true", help="Regras vetorizadas sobre a coluna inteira (mesmo resultado).")
+    f.add_argument("--ml-threshold", type=float, default=None, help="Probabilidade mínima para o backstop de ML marcar a linha (padrão 0.5, ou o limiar achado por --tune).")
+    add_regex_backend_argument(f)
+
+    s = sub.add_parser("serve", help="Mantém o motor carregado e atende por HTTP local (ou socket Unix).")
+    s.add_argument("--host", type=str, default="127.0.0.1")
+    s.add_argument("--port", type=int, default=8765)
+    s.add_argument("--unix-socket", type=str, default="", help="Escuta neste arquivo de socket Unix em vez de TCP.")
+    s.add_argument("--model", type=str, default="", help="Modelo ML (.joblib); recarregado quando o arquivo muda.")
+    s.add_argument("--no-ner", action="store_true")
+    add_overlap_policy_argument(s)
+    s.add_argument("--workers", type=int, default=2, help="Threads que executam os lotes.")
+    s.add_argument("--max-batch", type=int, default=64, help="Máximo de textos por lote (e por nlp.pipe).")
+    s.add_argument("--max-wait-ms", type=float, default=5.0, help="Espera máxima para juntar pedidos num lote.")
+    s.add_argument("--max-pending", type=int, default=10_000, help="Pedidos em fila antes de responder 503.")
+    s.add_argument("--reload-interval", type=float, default=2.0, help="Segundos entre verificações do modelo (0 desliga).")
+    s.add_argument("--verbose", action="store_true", help="Registra cada requisição no terminal.")
+    s.add_argument("--ml-threshold", type=float, default=0.5, help="Probabilidade mínima para o backstop de ML marcar a linha (padrão 0.5).")
+    add_regex_backend_argument(s)
+
+    t = sub.add_parser("train", help="Treina modelo ML supervisionado (CSV rotulado).")
     t.add_argument("--csv", type=str, required=True)
     t.add_argument("--text-col", type=str, default="text")
     t.add_argument("--label-col", type=str, default="label")
     t.add_argument("--model", type=str, default="data/processed/model.joblib")
+    t.add_argument("--mode", choices=("tfidf", "hashing"), default="tfidf",
+                   help="tfidf: corpus inteiro em memória; hashing: HashingVectorizer + SGD com partial_fit, em blocos.")
+    t.add_argument("--chunk-rows", type=int, default=50_000, help="Linhas por bloco no modo hashing.")
+    t.add_argument("--epochs", type=int, default=1, help="Passadas pelo arquivo no modo hashing.")
+    t.add_argument("--n-features", type=int, default=2 ** 20, help="Dimensão do HashingVectorizer.")
+    t.add_argument("--warm-start", action="store_true",
+                   help="Continua o treino do modelo em --model (modo hashing) em vez de começar do zero.")
+    t.add_argument("--compact", action="store_true",
+                   help="Salva só os arrays de inferência (float32, mapeáveis em memória); não continua treino.")
+    t.add_argument("--prune", type=float, default=0.0,
+                   help="Com --compact (tfidf): remove do vocabulário termos com |peso| <= este valor.")
+
+    tu = sub.add_parser("tune", help="Busca min_df, ngram_max, C e limiar com validação cruzada (CSV rotulado).")
+    tu.add_argument("--csv", type=str, required=True)
+    tu.add_argument("--text-col", type=str, default="text")
+    tu.add_argument("--label-col", type=str, default="label")
+    tu.add_argument("--min-df", type=str, default="1,2,3", help="Valores separados por vírgula.")
+    tu.add_argument("--ngram-max", type=str, default="1,2")
+    tu.add_argument("--C", type=str, default="0.5,1,2,4,8")
+    tu.add_argument("--thresholds", type=str, default="", help="Limiares do backstop (padrão: 0.10 a 0.90, passo 0.05).")
+    tu.add_argument("--folds", type=int, default=5)
+    tu.add_argument("--n-jobs", type=int, default=1, help="Processos (folds × ngram_max em paralelo; -1 = todos os núcleos).")
+    tu.add_argument("--beta", type=float, default=1.0, help="Métrica F-beta da escolha (beta > 1 favorece recall).")
+    tu.add_argument("--seed", type=int, default=0)
+    tu.add_argument("--out-dir", type=str, default="data/processed", help="Onde gravar tuning.json e tuning.csv.")
+    tu.add_argument("--model", type=str, default="", help="Se definido, treina com a melhor configuração e salva aqui.")
 
     e = sub.add_parser("evaluate", help="Avalia modelo ML em CSV rotulado.")
     e.add_argument("--csv", type=str, required=True)
@@ -191,6 +510,21 @@ t = sub.add_parser("train", help="Treina modelo ML supervisionado (CSV rotulado)
     e.add_argument("--label-col", type=str, default="label")
     e.add_argument("--model", type=str, required=True)
     e.add_argument("--report", type=str, default="data/processed/metrics.json")
+    e.add_argument("--ml-threshold", type=float, default=0.5, help="Probabilidade mínima para contar como positivo (padrão 0.5; use o limiar achado por tune).")
+
+    d = sub.add_parser("evaluate-detector", help="Avalia o detector (regras + NER) por tipo no CSV rotulado (label_cpf, label_email, ...).")
+    d.add_argument("--csv", type=str, default="data/raw/dataset_labeled.csv")
+    d.add_argument("--text-col", type=str, default="text")
+    d.add_argument("--labels", type=str, default="", help="Rótulos avaliados, separados por vírgula (padrão: todos os label_* por tipo).")
+    d.add_argument("--no-ner", action="store_true")
+    d.add_argument("--columnar", action="store_true", help="Regras vetorizadas sobre a coluna inteira (mesmo resultado).")
+    add_regex_backend_argument(d)
+    d.add_argument("--workers", type=int, default=1, help="Processos (0 = todos os núcleos).")
+    d.add_argument("--chunk-size", type=int, default=2048, help="Linhas por bloco enviado a cada worker.")
+    d.add_argument("--bootstrap", type=int, default=1000, help="Reamostragens do intervalo de confiança.")
+    d.add_argument("--alpha", type=float, default=0.05, help="IC de nível 1 - alpha (padrão 95%%).")
+    d.add_argument("--seed", type=int, default=0)
+    d.add_argument("--report", type=str, default="data/processed/metrics.json", help="metrics.json (a chave 'detector' é substituída).")
 
     return p
 
@@ -199,5 +533,8 @@ def main():
     if args.cmd == "full": return cmd_full(args)
     if args.cmd == "train": return cmd_train(args)
     if args.cmd == "evaluate": return cmd_evaluate(args)
+    if args.cmd == "tune": return cmd_tune(args)
+    if args.cmd == "evaluate-detector": return cmd_evaluate_detector(args)
     if args.cmd == "anonymize": return cmd_anonymize(args)
+    if args.cmd == "serve": return cmd_serve(args)
     return cmd_default(args)
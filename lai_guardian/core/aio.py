@@ -0,0 +1,195 @@
+from __future__ import annotations
+"""Fachada asyncio do GuardianEngine: o trabalho de CPU vai para um executor e o event loop segue livre."""
+
+import asyncio
+import functools
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Iterable, List, Optional, Set, Tuple, Union
+
+from .engine import Decision, GuardianEngine
+
+Job = Tuple[List[str], bool, "asyncio.Future[List[Decision]]"]
+
+
+class AsyncGuardian:
+    """
+    Versão assíncrona do motor.
+
+      - analyze(text) / analyze_batch(texts): pedidos que chegam juntos (até `max_wait` segundos
+        ou `max_batch` textos) viram um único analyze_batch, ou seja, um nlp.pipe só
+      - analyze_stream(fonte): consome um iterável (assíncrono ou não) com no máximo `max_pending`
+        textos em voo; a leitura da fonte para enquanto o consumidor não acompanha
+      - no máximo `max_concurrency` lotes rodam ao mesmo tempo no executor
+
+    Cancelar um analyze() descarta o texto se o lote ainda não saiu; lote já em execução
+    termina no executor e o resultado é ignorado.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[GuardianEngine] = None,
+        *,
+        executor: Optional[Executor] = None,
+        max_concurrency: int = 2,
+        max_batch: int = 64,
+        max_wait: float = 0.005,
+        max_pending: int = 1024,
+    ):
+        self.engine = engine or GuardianEngine()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="lai-aio")
+        self._running = asyncio.Semaphore(max_concurrency)
+        self._pending: List[Job] = []
+        self._pending_texts = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "AsyncGuardian":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def analyze(self, text: str, redact: bool = True) -> Decision:
+        return (await self.analyze_batch([text], redact=redact))[0]
+
+    async def analyze_batch(self, texts: List[str], redact: bool = True) -> List[Decision]:
+        if not texts:
+            return []
+        return await self._enqueue(list(texts), redact)
+
+    async def analyze_stream(
+        self,
+        source: Union[AsyncIterable[str], Iterable[str]],
+        *,
+        redact: bool = True,
+        ordered: bool = True,
+    ) -> AsyncIterator[Union[Decision, Tuple[int, Decision]]]:
+        """
+        Analisa os textos de `source` à medida que chegam.
+
+        ordered=True devolve as decisões na ordem de entrada; ordered=False devolve pares
+        (posição, decisão) assim que cada um fica pronto. Fechar/cancelar o iterador cancela
+        o que ainda estiver pendente.
+        """
+        in_flight: "deque[Tuple[int, asyncio.Task]]" = deque()
+        try:
+            i = 0
+            async for text in _aiter(source):
+                in_flight.append((i, asyncio.ensure_future(self.analyze(text, redact))))
+                i += 1
+                if ordered:
+                    while len(in_flight) >= self.max_pending or (in_flight and in_flight[0][1].done()):
+                        yield await in_flight.popleft()[1]
+                else:
+                    if len(in_flight) >= self.max_pending:
+                        await asyncio.wait([t for _, t in in_flight], return_when=asyncio.FIRST_COMPLETED)
+                    for item in self._take_done(in_flight):
+                        yield item
+            while in_flight:
+                if ordered:
+                    yield await in_flight.popleft()[1]
+                else:
+                    await asyncio.wait([t for _, t in in_flight], return_when=asyncio.FIRST_COMPLETED)
+                    for item in self._take_done(in_flight):
+                        yield item
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+
+    async def aclose(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for _, _, fut in self._pending:
+            fut.cancel()
+        self._pending, self._pending_texts = [], 0
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+
+    # --- micro-batching ---
+
+    @staticmethod
+    def _take_done(in_flight: "deque[Tuple[int, asyncio.Task]]") -> List[Tuple[int, Decision]]:
+        done = [(i, t) for i, t in in_flight if t.done()]
+        for item in done:
+            in_flight.remove(item)
+        return [(i, t.result()) for i, t in done]
+
+    def _enqueue(self, texts: List[str], redact: bool) -> "asyncio.Future[List[Decision]]":
+        loop = asyncio.get_running_loop()
+        fut: "asyncio.Future[List[Decision]]" = loop.create_future()
+        self._pending.append((texts, redact, fut))
+        self._pending_texts += len(texts)
+        if self._pending_texts >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        jobs = [j for j in self._pending if not j[2].done()]
+        self._pending, self._pending_texts = [], 0
+        if jobs:
+            task = asyncio.ensure_future(self._run(jobs))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run(self, jobs: List[Job]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._running:
+                for redact in (True, False):
+                    group = [j for j in jobs if j[1] == redact and not j[2].done()]
+                    if not group:
+                        continue
+                    texts = [t for j in group for t in j[0]]
+                    call = functools.partial(self.engine.analyze_batch, texts, redact=redact)
+                    try:
+                        decisions = await loop.run_in_executor(self._executor, call)
+                    except Exception as e:
+                        for _, _, fut in group:
+                            if not fut.done():
+                                fut.set_exception(e)
+                        continue
+                    i = 0
+                    for job_texts, _, fut in group:
+                        if not fut.done():
+                            fut.set_result(decisions[i:i + len(job_texts)])
+                        i += len(job_texts)
+        except asyncio.CancelledError:
+            for _, _, fut in jobs:
+                fut.cancel()
+            raise
+
+
+async def _aiter(source: Union[AsyncIterable[str], Iterable[str]]) -> AsyncIterator[str]:
+    if hasattr(source, "__aiter__"):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
+
+
+async def analyze_stream(
+    source: Union[AsyncIterable[str], Iterable[str]],
+    engine: Optional[GuardianEngine] = None,
+    *,
+    redact: bool = True,
+    ordered: bool = True,
+    **kwargs,
+) -> AsyncIterator[Union[Decision, Tuple[int, Decision]]]:
+    """Atalho: `async for d in analyze_stream(fonte)` com um AsyncGuardian criado só para a fonte."""
+    async with AsyncGuardian(engine, **kwargs) as guardian:
+        async for item in guardian.analyze_stream(source, redact=redact, ordered=ordered):
+            yield item
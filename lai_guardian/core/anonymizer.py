@@ -4,27 +4,70 @@ from dataclasses import asdict
 from typing import List, Dict, Any, Tuple
 import datetime
 
-from .detector import HybridDetector, Finding
+from .detector import HybridDetector, Finding, RISK_ORDER
 
 RISK_TO_TAG = {"CRÍTICO":"CRITICO","ALTO":"ALTO","MÉDIO":"MEDIO","BAIXO":"BAIXO"}
 
-def redact_by_spans(text: str, findings: List[Finding]) -> str:
-    # Atenção: aplicamos as tarjas de trás para frente para não bagunçar os índices.
-    # Isso evita trocar a posição dos próximos achados.
+# Política para achados sobrepostos (ex.: CEP dentro de ENDEREÇO, telefone dentro de PROTOCOLO).
+# Em todas elas o trecho tarjado é a união dos spans sobrepostos; muda só o rótulo da tarja:
+#   "longest": o achado mais longo nomeia a tarja (empate: maior risco)
+#   "risk":    o achado de maior risco nomeia a tarja (empate: mais longo)
+#   "union":   a tarja lista todos os tipos do grupo, com o maior risco
+OVERLAP_POLICIES = ("longest", "risk", "union")
+DEFAULT_OVERLAP_POLICY = "longest"
+
+def _tag(tipo: str, risco: str) -> str:
+    return f"[{tipo}_{RISK_TO_TAG.get(risco, 'INFO')}_OMITIDO]"
+
+def _cluster_tag(group: List[Finding], policy: str) -> str:
+    if len(group) == 1:
+        return _tag(group[0].tipo, group[0].risco)
+    by_risk = lambda f: RISK_ORDER.get(f.risco, 0)
+    by_len = lambda f: f.end - f.start
+    if policy == "union":
+        tipos = list(dict.fromkeys(f.tipo for f in group))
+        return _tag("+".join(tipos), max(group, key=by_risk).risco)
+    if policy == "risk":
+        win = max(group, key=lambda f: (by_risk(f), by_len(f)))
+    else:
+        win = max(group, key=lambda f: (by_len(f), by_risk(f)))
+    return _tag(win.tipo, win.risco)
+
+def redact_by_spans(text: str, findings: List[Finding], policy: str = DEFAULT_OVERLAP_POLICY) -> str:
+    # Uma passada só: ordena os spans uma vez, agrupa os que se sobrepõem e monta a saída com um join.
+    # Nenhum caractere de achado escapa da tarja, mesmo com sobreposição.
     if not findings:
         return text
-    out = text
-    for f in sorted(findings, key=lambda x: x.start, reverse=True):
-        tag = RISK_TO_TAG.get(f.risco, "INFO")
-        out = out[:f.start] + f"[{f.tipo}_{tag}_OMITIDO]" + out[f.end:]
-    return out
-
-def audit_record(text: str, detector: HybridDetector) -> Tuple[List[Dict[str, Any]], str]:
-    findings = detector.detect(text)
+    if policy not in OVERLAP_POLICIES:
+        raise ValueError(f"Política de sobreposição inválida: {policy} (use {', '.join(OVERLAP_POLICIES)})")
+
+    spans = sorted((f for f in findings if f.end > f.start), key=lambda f: (f.start, -f.end))
+    parts: List[str] = []
+    pos = 0
+    i = 0
+    while i < len(spans):
+        group = [spans[i]]
+        start, end = spans[i].start, spans[i].end
+        i += 1
+        while i < len(spans) and spans[i].start < end:
+            group.append(spans[i])
+            end = max(end, spans[i].end)
+            i += 1
+        parts.append(text[pos:start])
+        parts.append(_cluster_tag(group, policy))
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+def audit_record(text: str, detector: HybridDetector, policy: str = DEFAULT_OVERLAP_POLICY) -> Tuple[List[Dict[str, Any]], str]:
+    return audit_from_findings(text, detector.detect(text), policy)
+
+def audit_from_findings(text: str, findings: List[Finding], policy: str = DEFAULT_OVERLAP_POLICY) -> Tuple[List[Dict[str, Any]], str]:
+    # Mesma trilha do audit_record, para achados que já vieram de detect_batch.
     now = datetime.datetime.now().isoformat()
     audit = []
     for f in findings:
         d = asdict(f)
         d["timestamp"] = now
         audit.append(d)
-    return audit, redact_by_spans(text, findings)
+    return audit, redact_by_spans(text, findings, policy)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+"""Cache de decisões por conteúdo: hash do texto + impressão digital do motor (regras, NER e modelo ML)."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+# Arquivos (em core/) cujo código-fonte entra na impressão digital: mudar um padrão,
+# um filtro ou a regra de tarja invalida o cache sem precisar apagar nada.
+_FINGERPRINT_FILES = ("patterns.py", "scanner.py", "triage.py", "columnar.py", "validators.py", "detector.py", "anonymizer.py", "engine.py")
+CACHE_SCHEMA = 1
+
+
+def _source_hash() -> str:
+    h = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in _FINGERPRINT_FILES:
+        with open(os.path.join(here, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+_SOURCE_HASH: Optional[str] = None
+
+
+def engine_fingerprint(engine) -> str:
+    """Impressão digital do motor: código das regras, modelo spaCy (nome/versão), modelo ML, limiar do ML e política de tarja."""
+    global _SOURCE_HASH
+    if _SOURCE_HASH is None:
+        _SOURCE_HASH = _source_hash()
+
+    det = engine.detector
+    ner = "off"
+    if det._ensure_ner():
+        meta = getattr(det._nlp, "meta", {}) or {}
+        ner = f"{meta.get('lang', '')}_{meta.get('name', '')}@{meta.get('version', '')}"
+    ml = engine.ml_model.fingerprint() if engine.ml_model is not None else "none"
+
+    parts = [str(CACHE_SCHEMA), _SOURCE_HASH, ner, ml, engine.overlap_policy, repr(engine.ml_threshold)]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def content_key(fingerprint: str, text: str, redact: bool) -> str:
+    h = hashlib.sha256(fingerprint.encode("ascii"))
+    h.update(b"\1" if redact else b"\0")
+    h.update(text.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Cache de decisões em dois níveis.
+
+      - LRU em memória (`max_items` entradas)
+      - SQLite opcional em disco (`path`), com despejo dos menos usados acima de `max_bytes`
+
+    Os valores são dicts JSON de Decision (sem o timestamp dos achados, que é do momento da execução).
+    """
+
+    def __init__(self, path: Optional[str] = None, max_items: int = 100_000, max_bytes: int = 1 << 30):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_bytes = 0
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results(last_used)")
+            self._db_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        keys = list(keys)
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for k in keys:
+            v = self._lru.get(k)
+            if v is not None:
+                self._lru.move_to_end(k)
+                found[k] = v
+            else:
+                missing.append(k)
+
+        if self._db is not None and missing:
+            now = time.time()
+            for i in range(0, len(missing), 500):
+                batch = missing[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                rows = self._db.execute(f"SELECT key, value FROM results WHERE key IN ({marks})", batch).fetchall()
+                for k, v in rows:
+                    found[k] = json.loads(v)
+                    self._remember(k, found[k])
+                if rows:
+                    self._db.execute(f"UPDATE results SET last_used = ? WHERE key IN ({marks})", [now] + batch)
+            self._db.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        for k, v in items.items():
+            self._remember(k, v)
+        if self._db is None or not items:
+            return
+        now = time.time()
+        rows = []
+        for k, v in items.items():
+            payload = json.dumps(v, ensure_ascii=False)
+            rows.append((k, payload, len(payload), now))
+        self._db.executemany("INSERT OR REPLACE INTO results(key, value, size, last_used) VALUES (?, ?, ?, ?)", rows)
+        self._db_bytes += sum(r[2] for r in rows)
+        if self._db_bytes > self.max_bytes:
+            self._evict()
+        self._db.commit()
+
+    def _evict(self) -> None:
+        # Remove os menos usados até ficar em 90% do limite.
+        target = int(self.max_bytes * 0.9)
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        cur = self._db.execute("SELECT key, size FROM results ORDER BY last_used ASC")
+        doomed = []
+        for key, size in cur:
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self._db_bytes = total
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "memory_items": len(self._lru), "disk_bytes": int(self._db_bytes)}
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
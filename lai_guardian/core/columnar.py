@@ -0,0 +1,267 @@
+from __future__ import annotations
+"""
+Detecção por coluna: os achados da coluna inteira saem numa tabela longa (row, tipo, valor, risco,
+start, end), da qual as colunas da auditoria são derivadas com groupby. A triagem (features_frame)
+decide por linha quais regras podem casar; cada texto passa uma vez pelo RuleScanner só com essas
+regras (mais uma passada para TELEFONE, na visão sem SEI/CNJ), e os spans são separados por regra.
+
+Mesmo resultado do HybridDetector (tests/test_columnar.py compara os dois); os pós-filtros
+(mód. 11 do CPF, filtros de telefone, janela de palavra-chave do PROTOCOLO) viram máscaras.
+"""
+import re
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .detector import DEFAULT_RISK, IDISH_PUNCT, RISK_ORDER, SEI_OR_CNJ, YEARS, Finding
+from .patterns import KW_PROCESSO, RULES
+from .scanner import _CAPTURE_OPEN, RuleScanner, Span
+from .triage import REQUIREMENTS, features_frame
+from .validators import validate_batch
+
+if TYPE_CHECKING:
+    from .detector import HybridDetector
+    from .engine import Decision
+
+FINDING_COLUMNS = ("row", "tipo", "valor", "risco", "start", "end")
+
+# Nome da regra (core/patterns.py) -> tipo do achado.
+TIPOS = {
+    "PROCESSO_SEI": "PROCESSO_SEI",
+    "PROCESSO_CNJ": "PROCESSO_CNJ",
+    "PROTOCOLO": "PROTOCOLO",
+    "CPF": "CPF",
+    "RG": "RG",
+    "ENDERECO": "ENDEREÇO",
+    "CEP": "CEP",
+    "EMAIL": "E-MAIL",
+    "TELEFONE": "TELEFONE",
+    "CARTAO": "CARTÃO",
+}
+_RISK_NAMES = {v: k for k, v in RISK_ORDER.items()}
+# KW_PROCESSO sem grupos de captura (str.contains avisa quando o padrão tem grupos).
+_KW_WINDOW = re.compile(_CAPTURE_OPEN.sub("(?:", KW_PROCESSO.pattern), KW_PROCESSO.flags)
+# Todas as regras numa passada (RuleScanner), menos TELEFONE, que é procurado noutra visão do texto.
+_SCANNER = RuleScanner([(name, pattern) for name, pattern in RULES if name != "TELEFONE"])
+_PHONE_SCANNER = RuleScanner([(name, pattern) for name, pattern in RULES if name == "TELEFONE"])
+
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame({
+        "row": pd.Series([], dtype="int64"),
+        "tipo": pd.Series([], dtype=object),
+        "valor": pd.Series([], dtype=object),
+        "risco": pd.Series([], dtype=object),
+        "start": pd.Series([], dtype="int64"),
+        "end": pd.Series([], dtype="int64"),
+    })
+
+
+def _scan(texts: pd.Series, gates: Dict[str, np.ndarray], scanner: RuleScanner) -> Dict[str, pd.DataFrame]:
+    """
+    Uma chamada de RuleScanner.scan por texto, só com as regras que o gate (triagem) liberou na linha;
+    os spans saem separados por regra, numa tabela (row/tipo/valor/risco/start/end) cada.
+    """
+    names = [name for name, _ in scanner.rules if name in gates]
+    bits = np.zeros(len(texts), dtype=np.int64)
+    for j, name in enumerate(names):
+        bits |= gates[name].astype(np.int64) << j
+    # Linhas com o mesmo padrão de gates compartilham o mesmo conjunto `only`.
+    allowed = {code: frozenset(n for j, n in enumerate(names) if code >> j & 1) for code in np.unique(bits).tolist()}
+    source = texts.to_numpy()
+    hits: Dict[str, Tuple[List[int], List[Span]]] = {name: ([], []) for name in names}
+    for i in np.flatnonzero(bits).tolist():
+        for name, spans in scanner.scan(source[i], allowed[int(bits[i])]).items():
+            if spans:
+                positions, found = hits[name]
+                positions.extend([i] * len(spans))
+                found.extend(spans)
+    return {name: _frame(name, texts, positions, found) for name, (positions, found) in hits.items() if positions}
+
+
+def _frame(name: str, texts: pd.Series, positions: List[int], spans: List[Span]) -> pd.DataFrame:
+    tipo = TIPOS[name]
+    pos = np.asarray(positions, dtype=np.int64)
+    flat = np.asarray(spans, dtype=np.int64).reshape(-1, 2)
+    source = texts.to_numpy()[pos]
+    starts, ends = flat[:, 0], flat[:, 1]
+    return pd.DataFrame({
+        "row": texts.index.to_numpy()[pos],
+        "tipo": tipo,
+        "valor": [t[s:e] for t, s, e in zip(source, starts.tolist(), ends.tolist())],
+        "risco": DEFAULT_RISK[tipo],
+        "start": starts,
+        "end": ends,
+    })
+
+
+def _protocol_mask(found: pd.DataFrame, texts: pd.Series) -> np.ndarray:
+    # Janela de 20 caracteres de cada lado do número, como no detector.
+    source = texts.to_numpy()[found["row"].to_numpy()]
+    windows = pd.Series(
+        [t[max(0, s - 20):e + 20] for t, s, e in zip(source, found["start"].tolist(), found["end"].tolist())],
+        dtype=object,
+    )
+    return windows.str.contains(_KW_WINDOW).to_numpy(dtype=bool)
+
+
+def _address_mask(found: pd.DataFrame) -> np.ndarray:
+    return (found["valor"].str.split(",").str[0].str.strip().str.len() >= 6).to_numpy(dtype=bool)
+
+
+def _phone_mask(found: pd.DataFrame) -> np.ndarray:
+    raw = found["valor"]
+    digits = raw.str.replace(r"\D", "", regex=True)
+    n = digits.str.len()
+    eight = n == 8
+    year = eight & digits.str[:4].isin(YEARS)
+    bare = eight & ~raw.str.contains(r"[-() ]", regex=True)
+    idish = raw.str.contains(IDISH_PUNCT)
+    return ((n >= 8) & ~year & ~bare & ~idish).to_numpy(dtype=bool)
+
+
+def detect_rules_frame(texts: Sequence[str]) -> pd.DataFrame:
+    """Achados das regras estruturadas para uma coluna de textos, já ordenados e sem duplicatas."""
+    # dtype=object: mantém o `re` do Python (mesma semântica Unicode dos padrões do detector).
+    s = pd.Series(list(texts), dtype=object)
+    if s.empty:
+        return _empty()
+    feats = features_frame(s)
+    digits = feats["digits"].to_numpy()
+
+    gates: Dict[str, np.ndarray] = {}
+    for name, _ in RULES:
+        req = REQUIREMENTS[name]
+        gate = digits >= req.min_digits
+        for flag in ("at", "comma_digit", "rg_keyword"):
+            if getattr(req, flag):
+                gate &= feats[flag].to_numpy(dtype=bool)
+        gates[name] = gate
+
+    found_by_rule = _scan(s, {k: v for k, v in gates.items() if k != "TELEFONE"}, _SCANNER)
+    phone_gate = gates["TELEFONE"]
+    if phone_gate.any():
+        # Telefone é procurado no texto sem SEI/CNJ (offsets dessa visão, como no detector).
+        view = s[phone_gate].str.replace(SEI_OR_CNJ, " ", regex=True)
+        found_by_rule.update(_scan(view, {"TELEFONE": np.ones(len(view), dtype=bool)}, _PHONE_SCANNER))
+
+    frames: List[pd.DataFrame] = []
+    for name, _ in RULES:
+        found = found_by_rule.get(name)
+        if found is None:
+            continue
+        if name == "CPF":
+            found = found[validate_batch(found["valor"].tolist(), "CPF")]
+        elif name == "PROTOCOLO":
+            found = found[_protocol_mask(found, s)]
+        elif name == "ENDERECO":
+            found = found[_address_mask(found)]
+        elif name == "TELEFONE":
+            found = found[_phone_mask(found)]
+        frames.append(found)
+    return finalize(frames)
+
+
+def _ner_frame(texts: Sequence[str], detector: "HybridDetector") -> pd.DataFrame:
+    docs = detector._nlp.pipe(list(texts), batch_size=detector.ner_batch_size, n_process=detector.ner_n_process)
+    records = [
+        (i, f.tipo, f.valor, f.risco, f.start, f.end)
+        for i, doc in enumerate(docs)
+        for f in detector._ner_findings(doc)
+    ]
+    return pd.DataFrame.from_records(records, columns=list(FINDING_COLUMNS)) if records else _empty()
+
+
+def finalize(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Mesma ordem e deduplicação do HybridDetector._finalize, para a tabela inteira."""
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return _empty()
+    out = pd.concat(frames, ignore_index=True)
+    out = out.sort_values(["row", "start", "end", "tipo"], kind="stable")
+    out = out.drop_duplicates(["row", "tipo", "start", "end", "valor"])
+    return out.reset_index(drop=True)[list(FINDING_COLUMNS)]
+
+
+def detect_frame(texts: Sequence[str], detector: Optional["HybridDetector"] = None) -> pd.DataFrame:
+    """Regras vetorizadas + (se o detector tiver spaCy) NER em lote."""
+    texts = list(texts)
+    frames = [detect_rules_frame(texts)]
+    if detector is not None and texts and detector._ensure_ner():
+        frames.append(_ner_frame(texts, detector))
+    return finalize(frames)
+
+
+def findings_by_row(findings: pd.DataFrame, n_rows: int) -> List[List[Finding]]:
+    """Tabela longa -> lista de Finding por linha (para tarja e trilha)."""
+    out: List[List[Finding]] = [[] for _ in range(n_rows)]
+    for row, tipo, valor, risco, start, end in findings[list(FINDING_COLUMNS)].itertuples(index=False, name=None):
+        out[row].append(Finding(tipo, valor, risco, int(start), int(end)))
+    return out
+
+
+def findings_frame(decisions: Sequence["Decision"]) -> pd.DataFrame:
+    """Tabela longa a partir de decisões do motor (inclui as que vieram do cache/estado)."""
+    counts = [len(d.findings) for d in decisions]
+    if not sum(counts):
+        return _empty()
+    cols = FINDING_COLUMNS[1:]
+    records = [tuple(f[c] for c in cols) for d in decisions for f in d.findings]
+    frame = pd.DataFrame.from_records(records, columns=list(cols))
+    frame.insert(0, "row", np.repeat(np.arange(len(decisions), dtype=np.int64), counts))
+    return frame
+
+
+def summary_columns(findings: pd.DataFrame, n_rows: int, ml_positive: Optional[Sequence[bool]] = None) -> pd.DataFrame:
+    """
+    Contem_Dados_Pessoais, Tipos_Detectados, Risco_Max e Qtd_Achados por linha (índice 0..n_rows-1).
+    `ml_positive` marca as linhas sem achado que o backstop de ML classificou como positivas.
+    """
+    index = pd.RangeIndex(n_rows)
+    by_row = findings.groupby("row")
+    count = by_row.size().reindex(index, fill_value=0).astype("int64")
+    types = (
+        findings.drop_duplicates(["row", "tipo"])
+        .sort_values(["row", "tipo"], kind="stable")
+        .groupby("row")["tipo"].agg("; ".join)
+        .reindex(index, fill_value="")
+    )
+    rank = findings["risco"].map(RISK_ORDER).fillna(0).astype("int64").groupby(findings["row"]).max()
+    risk = rank.map(_RISK_NAMES).reindex(index, fill_value="").fillna("")
+    contains = count > 0
+    if ml_positive is not None:
+        contains = contains | pd.Series(np.asarray(ml_positive, dtype=bool), index=index)
+    return pd.DataFrame({
+        "Contem_Dados_Pessoais": contains,
+        "Tipos_Detectados": types,
+        "Risco_Max": risk,
+        "Qtd_Achados": count,
+    }, index=index)
+
+
+def add_audit_columns(
+    df: pd.DataFrame,
+    decisions: Sequence["Decision"],
+    ml_probability: bool = False,
+    findings: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    `df` (uma linha por decisão, na mesma ordem) com as colunas da auditoria: Contem_Dados_Pessoais,
+    Motivo, Versao_Publicavel, Tipos_Detectados, Risco_Max, Qtd_Achados e, com `ml_probability`, Prob_ML.
+    `findings` reaproveita um findings_frame(decisions) já calculado.
+    """
+    summary = summary_columns(
+        findings_frame(decisions) if findings is None else findings, len(decisions),
+        ml_positive=[d.contains_pii and not d.findings for d in decisions],
+    )
+    df["Contem_Dados_Pessoais"] = summary["Contem_Dados_Pessoais"].to_numpy()
+    df["Motivo"] = [d.reason for d in decisions]
+    df["Versao_Publicavel"] = [d.redacted_text for d in decisions]
+    df["Tipos_Detectados"] = summary["Tipos_Detectados"].to_numpy()
+    df["Risco_Max"] = summary["Risco_Max"].to_numpy()
+    df["Qtd_Achados"] = summary["Qtd_Achados"].to_numpy()
+    if ml_probability:
+        # Permite ordenar os positivos só de ML pela confiança do modelo.
+        df["Prob_ML"] = [d.ml_probability for d in decisions]
+    return df
@@ -1,14 +1,16 @@
 from __future__ import annotations
 """Detector híbrido: regras + (opcionalmente) NER. A intenção é identificar PII sem confundir com IDs administrativos."""
 import re
+import time
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any, Tuple
 
-from .patterns import (
-    CPF, EMAIL, CEP, CARD, RG_CTX, PHONE, ADDRESS,
-    PROCESSO_SEI, PROCESSO_CNJ, PROTOCOLO_NUM, KW_PROCESSO
-)
-from .validators import validate_cpf_mod11, only_digits
+from .patterns import PHONE, KW_PROCESSO
+from .scanner import Span
+from .regex_backend import make_scanner
+from .validators import validate_batch, validate_cpf_mod11, only_digits
+from .profiling import DetectorProfile, Stopwatch
+from . import triage as _triage
 
 # Remove SEI/CNJ shapes from a text view used for phone scanning to avoid confusion
 SEI_OR_CNJ = re.compile(r"(\b\d{4,6}-\d{4,10}/\d{4}-\d{2}\b|\b\d{7}-\d{2}\.\d{4}\.\d\.\d{2}\.\d{4}\b)")
@@ -16,6 +18,11 @@ YEARS = set(str(y) for y in range(1900, 2101))
 
 IDISH_PUNCT = re.compile(r"[/.]")
 
+NER_BLACKLIST = {
+    "relatório","governo","distrito","secretaria","diário","ministério",
+    "pedido","nota","fiscal","auditoria","processo","protocolo","licitação"
+}
+
 RISK_ORDER = {"CRÍTICO": 4, "ALTO": 3, "MÉDIO": 2, "BAIXO": 1}
 DEFAULT_RISK = {
     "CPF": "ALTO",
@@ -42,12 +49,37 @@ class Finding:
 
 
 class HybridDetector:
-    def __init__(self, use_ner: bool = True):
+    def __init__(
+        self,
+        use_ner: bool = True,
+        ner_batch_size: int = 64,
+        ner_n_process: int = 1,
+        profile: bool = False,
+        profile_top_n: int = 10,
+        triage: bool = True,
+        regex_backend: str = "auto",
+    ):
         self.use_ner = use_ner
+        # Pula, por texto, as famílias de regra que não têm como casar (core/triage.py).
+        self.triage = triage
+        self.ner_batch_size = ner_batch_size
+        self.ner_n_process = ner_n_process
+        # Contadores/tempos por família de regra (ver core/profiling.py); desligado por padrão.
+        self.profile: Optional[DetectorProfile] = DetectorProfile(profile_top_n) if profile else None
+        # Motor de regex (core/regex_backend.py): "auto" usa RE2/Hyperscan se instalados, senão o `re`.
+        self._scanner = make_scanner(regex_backend)
+        self.regex_backend = self._scanner.backend
         self._nlp = None
         self._ner_ready = False
-        if use_ner:
+        # spaCy só carrega no primeiro texto: import + modelo custam segundos e
+        # muitos comandos (e workers sem texto) nunca chegam a usar o NER.
+        self._ner_loaded = not use_ner
+
+    def _ensure_ner(self) -> bool:
+        if not self._ner_loaded:
+            self._ner_loaded = True
             self._try_init_spacy()
+        return self._ner_ready
 
     def _try_init_spacy(self):
         try:
@@ -61,93 +93,122 @@ class HybridDetector:
             self._nlp = None
             self._ner_ready = False
 
-    def detect(self, text: str) -> List[Finding]:
-        if not isinstance(text, str):
-            return []
-
+    def _rule_findings(
+        self,
+        t: str,
+        sw: Optional[Stopwatch] = None,
+        hits: Optional[Dict[str, List[Span]]] = None,
+        cpf_ok: Optional[Dict[str, bool]] = None,
+    ) -> List[Finding]:
+        # `sw` só existe com profile ligado; sem ele, cada etapa custa um teste de None.
+        # detect_batch passa `hits` já varridos e `cpf_ok` já validados em lote (validate_batch).
         findings: List[Finding] = []
-        t = text
+        if hits is None:
+            only = _triage.families(t) if self.triage else None
+            if sw: sw.lap("triage", 0, findings)
+            hits = self._scanner.scan(t, only)
+            if sw: sw.lap("scan", 0, findings)
 
         # Primeiro tratamos identificadores administrativos (SEI/CNJ/protocolo).
         # Eles aparecem muito em pedido LAI e não devem virar 'telefone' por engano.
         # --- Administrative identifiers ---
-        for m in PROCESSO_SEI.finditer(t):
-            findings.append(Finding("PROCESSO_SEI", m.group(0), DEFAULT_RISK["PROCESSO_SEI"], m.start(0), m.end(0)))
-        for m in PROCESSO_CNJ.finditer(t):
-            findings.append(Finding("PROCESSO_CNJ", m.group(0), DEFAULT_RISK["PROCESSO_CNJ"], m.start(0), m.end(0)))
-        for m in PROTOCOLO_NUM.finditer(t):
-            window_start = max(0, m.start(0) - 20)
-            window_end = min(len(t), m.end(0) + 20)
+        for s, e in hits["PROCESSO_SEI"]:
+            findings.append(Finding("PROCESSO_SEI", t[s:e], DEFAULT_RISK["PROCESSO_SEI"], s, e))
+        if sw: sw.lap("PROCESSO_SEI", len(hits["PROCESSO_SEI"]), findings)
+        for s, e in hits["PROCESSO_CNJ"]:
+            findings.append(Finding("PROCESSO_CNJ", t[s:e], DEFAULT_RISK["PROCESSO_CNJ"], s, e))
+        if sw: sw.lap("PROCESSO_CNJ", len(hits["PROCESSO_CNJ"]), findings)
+        for s, e in hits["PROTOCOLO"]:
+            window_start = max(0, s - 20)
+            window_end = min(len(t), e + 20)
             if KW_PROCESSO.search(t[window_start:window_end]):
-                findings.append(Finding("PROTOCOLO", m.group(0), DEFAULT_RISK["PROTOCOLO"], m.start(0), m.end(0)))
+                findings.append(Finding("PROTOCOLO", t[s:e], DEFAULT_RISK["PROTOCOLO"], s, e))
+            elif sw:
+                sw.reject("PROTOCOLO", "sem_palavra_chave")
+        if sw: sw.lap("PROTOCOLO", len(hits["PROTOCOLO"]), findings)
 
         # --- CPF ---
-        for m in CPF.finditer(t):
-            raw = m.group(1)
-            if validate_cpf_mod11(raw):
-                findings.append(Finding("CPF", raw, DEFAULT_RISK["CPF"], m.start(1), m.end(1)))
+        for s, e in hits["CPF"]:
+            raw = t[s:e]
+            if cpf_ok[raw] if cpf_ok is not None else validate_cpf_mod11(raw):
+                findings.append(Finding("CPF", raw, DEFAULT_RISK["CPF"], s, e))
+            elif sw:
+                sw.reject("CPF", "mod11")
+        if sw: sw.lap("CPF", len(hits["CPF"]), findings)
 
         # --- RG contextual ---
-        for m in RG_CTX.finditer(t):
-            raw = m.group(1)
-            findings.append(Finding("RG", raw, DEFAULT_RISK["RG"], m.start(1), m.end(1)))
+        for s, e in hits["RG"]:
+            findings.append(Finding("RG", t[s:e], DEFAULT_RISK["RG"], s, e))
+        if sw: sw.lap("RG", len(hits["RG"]), findings)
 
         # --- Endereço ---
-        for m in ADDRESS.finditer(t):
-            raw = m.group(1)
+        for s, e in hits["ENDERECO"]:
+            raw = t[s:e]
             left = raw.split(",")[0].strip()
             if len(left) >= 6:
-                findings.append(Finding("ENDEREÇO", raw, DEFAULT_RISK["ENDEREÇO"], m.start(1), m.end(1)))
+                findings.append(Finding("ENDEREÇO", raw, DEFAULT_RISK["ENDEREÇO"], s, e))
+            elif sw:
+                sw.reject("ENDERECO", "logradouro_curto")
+        if sw: sw.lap("ENDERECO", len(hits["ENDERECO"]), findings)
 
         # CEP
-        for m in CEP.finditer(t):
-            findings.append(Finding("CEP", m.group(0), DEFAULT_RISK["CEP"], m.start(0), m.end(0)))
+        for s, e in hits["CEP"]:
+            findings.append(Finding("CEP", t[s:e], DEFAULT_RISK["CEP"], s, e))
+        if sw: sw.lap("CEP", len(hits["CEP"]), findings)
 
         # Email
-        for m in EMAIL.finditer(t):
-            findings.append(Finding("E-MAIL", m.group(0), DEFAULT_RISK["E-MAIL"], m.start(0), m.end(0)))
+        for s, e in hits["EMAIL"]:
+            findings.append(Finding("E-MAIL", t[s:e], DEFAULT_RISK["E-MAIL"], s, e))
+        if sw: sw.lap("EMAIL", len(hits["EMAIL"]), findings)
 
         # Telefone é uma fonte clássica de falso positivo (datas, processos, números secos).
         # Aqui a gente varre com filtro extra para evitar confusão.
         # --- Telefone com proteção anti-processo ---
-        t_for_phone = SEI_OR_CNJ.sub(" ", t)
-        for m in PHONE.finditer(t_for_phone):
-            raw = m.group(0)
+        t_for_phone, phone_spans = self._phone_view(t, hits)
+        for s, e in phone_spans:
+            raw = t_for_phone[s:e]
             digits = only_digits(raw)
             if len(digits) < 8:
+                if sw: sw.reject("TELEFONE", "poucos_digitos")
                 continue
 
             if len(digits) == 8 and digits[:4] in YEARS:
+                if sw: sw.reject("TELEFONE", "ano")
                 continue
 
             if len(digits) == 8 and ("-" not in raw and "(" not in raw and ")" not in raw and " " not in raw):
+                if sw: sw.reject("TELEFONE", "numero_seco")
                 continue
 
             if IDISH_PUNCT.search(raw):
+                if sw: sw.reject("TELEFONE", "pontuacao_de_id")
                 continue
 
-            findings.append(Finding("TELEFONE", raw, DEFAULT_RISK["TELEFONE"], m.start(0), m.end(0)))
+            findings.append(Finding("TELEFONE", raw, DEFAULT_RISK["TELEFONE"], s, e))
+        if sw: sw.lap("TELEFONE", len(phone_spans), findings)
 
         # Cartão
-        for m in CARD.finditer(t):
-            findings.append(Finding("CARTÃO", m.group(0), DEFAULT_RISK["CARTÃO"], m.start(0), m.end(0)))
+        for s, e in hits["CARTAO"]:
+            findings.append(Finding("CARTÃO", t[s:e], DEFAULT_RISK["CARTÃO"], s, e))
+        if sw: sw.lap("CARTAO", len(hits["CARTAO"]), findings)
+
+        return findings
 
+    def _ner_findings(self, doc, sw: Optional[Stopwatch] = None) -> List[Finding]:
         # NER é opcional: ajuda em nomes de pessoas, mas não pode atrapalhar o básico.
         # Se o modelo não estiver instalado, seguimos só com regras.
-        # --- NER (opcional) ---
-        if self._ner_ready:
-            doc = self._nlp(t)
-            blacklist = {
-                "relatório","governo","distrito","secretaria","diário","ministério",
-                "pedido","nota","fiscal","auditoria","processo","protocolo","licitação"
-            }
-            for ent in doc.ents:
-                if ent.label_ == "PER" and " " in ent.text and len(ent.text.strip()) > 3:
-                    low = ent.text.lower()
-                    if any(b in low for b in blacklist):
-                        continue
-                    findings.append(Finding("NOME_PESSOA", ent.text, DEFAULT_RISK["NOME_PESSOA"], ent.start_char, ent.end_char))
+        out: List[Finding] = []
+        for ent in doc.ents:
+            if ent.label_ == "PER" and " " in ent.text and len(ent.text.strip()) > 3:
+                low = ent.text.lower()
+                if any(b in low for b in NER_BLACKLIST):
+                    if sw: sw.reject("NER", "lista_negra")
+                    continue
+                out.append(Finding("NOME_PESSOA", ent.text, DEFAULT_RISK["NOME_PESSOA"], ent.start_char, ent.end_char))
+        return out
 
+    @staticmethod
+    def _finalize(findings: List[Finding]) -> List[Finding]:
         findings.sort(key=lambda f: (f.start, f.end, f.tipo))
         dedup, seen = [], set()
         for f in findings:
@@ -157,6 +218,109 @@ class HybridDetector:
                 dedup.append(f)
         return dedup
 
+    def detect(self, text: str) -> List[Finding]:
+        if not isinstance(text, str):
+            return []
+        sw = Stopwatch(self.profile) if self.profile is not None else None
+        findings = self._rule_findings(text, sw)
+        if self._ensure_ner():
+            if sw: sw.restart(findings)
+            doc = self._nlp(text)
+            findings.extend(self._ner_findings(doc, sw))
+            if sw: sw.lap("NER", len(doc.ents), findings)
+        if sw is None:
+            return self._finalize(findings)
+        sw.restart([])
+        out = self._finalize(findings)
+        sw.lap("dedup", len(findings), out)
+        self.profile.finish_text(text, sw.breakdown)
+        return out
+
+    def detect_batch(self, texts: List[str]) -> List[List[Finding]]:
+        """
+        Igual a detect() para uma lista de textos, mas o NER roda em lote (nlp.pipe).
+        Regras continuam por texto; as entidades PER voltam para a linha de origem.
+        """
+        prof = self.profile
+        gates: List[Optional[frozenset]] = [None] * len(texts)
+        if self.triage:
+            t0 = time.perf_counter()
+            idx = [i for i, t in enumerate(texts) if isinstance(t, str)]
+            for i, only in zip(idx, _triage.families_batch([texts[i] for i in idx])):
+                gates[i] = only
+            if prof is not None:
+                prof.add_family("triage", 0, 0, time.perf_counter() - t0, None)
+
+        watches: List[Optional[Stopwatch]] = []
+        scans: List[Optional[Dict[str, List[Span]]]] = []
+        for t, only in zip(texts, gates):
+            sw = Stopwatch(prof) if prof is not None and isinstance(t, str) else None
+            scans.append(self._scanner.scan(t, only) if isinstance(t, str) else None)
+            if sw: sw.lap("scan", 0, [])
+            watches.append(sw)
+
+        # Todos os candidatos a CPF do lote passam de uma vez pelo mód. 11 vetorizado.
+        t0 = time.perf_counter()
+        raws = list({t[s:e] for t, h in zip(texts, scans) if h for s, e in h["CPF"]})
+        cpf_ok = dict(zip(raws, validate_batch(raws, "CPF").tolist()))
+        if prof is not None:
+            prof.add_family("CPF", 0, 0, time.perf_counter() - t0, None)
+
+        results: List[List[Finding]] = []
+        for t, sw, h in zip(texts, watches, scans):
+            if h is None:
+                results.append([])
+                continue
+            if sw: sw.restart([])
+            results.append(self._rule_findings(t, sw, h, cpf_ok))
+        if self._ensure_ner():
+            idx = [i for i, t in enumerate(texts) if isinstance(t, str)]
+            docs = self._nlp.pipe(
+                (texts[i] for i in idx),
+                batch_size=self.ner_batch_size,
+                n_process=self.ner_n_process,
+            )
+            # Em lote o tempo do NER não se separa por texto: entra só no total da família.
+            ner_sw = Stopwatch(prof) if prof is not None else None
+            ents = accepted = 0
+            for i, doc in zip(idx, docs):
+                found = self._ner_findings(doc, ner_sw)
+                results[i].extend(found)
+                ents += len(doc.ents)
+                accepted += len(found)
+            if ner_sw:
+                prof.add_family("NER", ents, accepted, time.perf_counter() - ner_sw.t, None)
+        if prof is None:
+            return [self._finalize(f) for f in results]
+        out = []
+        for t, sw, found in zip(texts, watches, results):
+            if sw is None:
+                out.append(self._finalize(found))
+                continue
+            sw.restart([])
+            final = self._finalize(found)
+            sw.lap("dedup", len(found), final)
+            prof.finish_text(t, sw.breakdown)
+            out.append(final)
+        return out
+
+    @staticmethod
+    def _phone_view(t: str, hits: Dict[str, List[Span]]) -> Tuple[str, List[Span]]:
+        """
+        Texto usado na varredura de telefone: SEI/CNJ trocados por um espaço (equivale a SEI_OR_CNJ.sub).
+        As zonas administrativas já vêm do scanner; sem elas, aproveitamos os spans da passada única.
+        """
+        zones = sorted(hits["PROCESSO_SEI"] + hits["PROCESSO_CNJ"])
+        if not zones:
+            return t, hits["TELEFONE"]
+        parts, prev = [], 0
+        for s, e in zones:
+            parts.append(t[prev:s])
+            prev = e
+        parts.append(t[prev:])
+        view = " ".join(parts)
+        return view, [m.span() for m in PHONE.finditer(view)]
+
     @staticmethod
     def summarize(findings: List[Finding]) -> Tuple[str, str, int]:
         if not findings:
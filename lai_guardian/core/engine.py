@@ -1,11 +1,18 @@
 from __future__ import annotations
 """Motor de decisão: consolida achados do detector e, se configurado, usa um modelo estatístico como apoio."""
-from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Callable, Iterable, Iterator
 
 from .detector import HybridDetector
-from .anonymizer import audit_record
-from ..ml.model import TextClassifier
+from .profiling import DetectorProfile
+from .anonymizer import audit_from_findings, DEFAULT_OVERLAP_POLICY
+from .cache import ResultCache, engine_fingerprint, content_key
+
+if TYPE_CHECKING:  # scikit-learn só carrega quando há modelo de fato
+    from ..ml.model import TextClassifier
 
 @dataclass
 class Decision:
@@ -16,15 +23,234 @@ class Decision:
     redacted_text: str
     types_detected: str = ""
     max_risk: str = ""
+    # Probabilidade do backstop de ML (só nas linhas sem achado de regra/NER e com modelo carregado).
+    ml_probability: Optional[float] = None
 
 class GuardianEngine:
-    def __init__(self, use_ner: bool = True, ml_model: Optional[TextClassifier] = None):
-        self.detector = HybridDetector(use_ner=use_ner)
+    def __init__(
+        self,
+        use_ner: bool = True,
+        ml_model: Optional[TextClassifier] = None,
+        ner_batch_size: int = 64,
+        overlap_policy: str = DEFAULT_OVERLAP_POLICY,
+        cache: Optional[ResultCache] = None,
+        profile_rules: bool = False,
+        columnar: bool = False,
+        ml_threshold: float = 0.5,
+        regex_backend: str = "auto",
+    ):
+        self.use_ner = use_ner
+        self.ner_batch_size = ner_batch_size
+        self.overlap_policy = overlap_policy
+        self.profile_rules = profile_rules
+        # Regras vetorizadas por coluna (core/columnar.py) em vez de texto a texto; mesmo resultado.
+        self.columnar = columnar
+        # O motor de regex não muda nenhum resultado, por isso fica fora da impressão digital do cache.
+        self.detector = HybridDetector(
+            use_ner=use_ner, ner_batch_size=ner_batch_size, profile=profile_rules, regex_backend=regex_backend,
+        )
         self.ml_model = ml_model
+        # Probabilidade mínima para o backstop marcar a linha como positiva.
+        self.ml_threshold = ml_threshold
+        self.cache = cache
 
     def analyze(self, text: str, redact: bool = True) -> Decision:
-        audit, redacted = audit_record(text, self.detector)
+        return self.analyze_batch([text], redact=redact)[0]
+
+    def analyze_batch(self, texts: List[str], redact: bool = True) -> List[Decision]:
+        """Versão em lote de analyze(): mesmas decisões, na mesma ordem, com NER via nlp.pipe."""
+        return self._with_cache(texts, redact, lambda todo: self._analyze_fresh(todo, redact))
+
+    def _analyze_fresh(self, texts: List[str], redact: bool) -> List[Decision]:
+        """
+        Duas fases: (1) regras + NER no bloco inteiro; (2) as linhas que ficaram sem achado
+        passam juntas por uma única chamada predict_proba do modelo. A saída segue a ordem de entrada.
+        """
+        if self.columnar:
+            from . import columnar
+            per_row = columnar.findings_by_row(columnar.detect_frame(texts, self.detector), len(texts))
+        else:
+            per_row = self.detector.detect_batch(texts)
+        audits = [audit_from_findings(text, findings, self.overlap_policy) for text, findings in zip(texts, per_row)]
+
+        probs: Dict[int, float] = {}
+        if self.ml_model is not None:
+            negatives = [i for i, (audit, _) in enumerate(audits) if not audit]
+            if negatives:
+                probs = dict(zip(negatives, self.ml_model.predict_proba([texts[i] for i in negatives])))
+
+        return [
+            self._decide(text, audit, redacted, redact, probs.get(i))
+            for i, (text, (audit, redacted)) in enumerate(zip(texts, audits))
+        ]
+
+    def _with_cache(
+        self,
+        texts: List[str],
+        redact: bool,
+        compute: Callable[[List[str]], List[Decision]],
+    ) -> List[Decision]:
+        """
+        Analisa só o que for preciso: textos repetidos no lote são processados uma vez e,
+        com cache, os já conhecidos (mesmo texto + mesma impressão digital do motor) são reaproveitados.
+        """
+        unique = list(dict.fromkeys(texts))
+        known: Dict[str, Decision] = {}
+
+        keys: Dict[str, str] = {}
+        if self.cache is not None:
+            fp = engine_fingerprint(self)
+            # Células vazias/não textuais (None, NaN) não vão ao cache: seguem o caminho sem cache.
+            keys = {t: content_key(fp, t, redact) for t in unique if isinstance(t, str)}
+            stored = self.cache.get_many(keys.values())
+            now = datetime.now().isoformat()
+            for t, key in keys.items():
+                value = stored.get(key)
+                if value is not None:
+                    known[t] = decision_from_record(value, now)
+
+        todo = [t for t in unique if t not in known]
+        if todo:
+            fresh = compute(todo)
+            known.update(zip(todo, fresh))
+            if self.cache is not None:
+                self.cache.put_many({keys[t]: decision_to_record(d) for t, d in zip(todo, fresh) if isinstance(t, str)})
+
+        if len(unique) == len(texts):
+            return [known[t] for t in texts]
+        # Repetições recebem cópias, para que ninguém altere a decisão de outra linha sem querer.
+        seen = set()
+        out = []
+        for t in texts:
+            d = known[t]
+            if t in seen:
+                d = Decision(**asdict(d))
+            seen.add(t)
+            out.append(d)
+        return out
+
+    def analyze_many(
+        self,
+        texts: List[str],
+        workers: int = 1,
+        chunk_size: int = 256,
+        redact: bool = True,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> List[Decision]:
+        """
+        Analisa uma tabela inteira em blocos de `chunk_size`, opcionalmente em vários processos.
+
+        workers=1 roda aqui mesmo; workers>1 usa um pool de processos em que cada worker monta
+        o próprio motor (detector, spaCy e modelo ML) uma única vez; workers<=0 usa todos os núcleos.
+        A saída respeita a ordem de entrada. `progress` recebe o tamanho de cada bloco concluído.
+
+        Textos repetidos na tabela são analisados uma vez só; com `cache`, a consulta e a gravação
+        acontecem aqui no processo principal e apenas o que faltar vai para os workers.
+        """
+        out: List[Decision] = []
+        for decisions in self.analyze_stream([texts], workers, chunk_size, redact, progress):
+            out.extend(decisions)
+        return out
+
+    def analyze_stream(
+        self,
+        tables: Iterable[List[str]],
+        workers: int = 1,
+        chunk_size: int = 256,
+        redact: bool = True,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> Iterator[List[Decision]]:
+        """
+        analyze_many para uma sequência de blocos de tabela (ex.: iter_table): entrega as decisões de
+        cada bloco assim que ficam prontas, na ordem de entrada. O pool de processos é criado uma vez,
+        no primeiro bloco que precisar dele, e atende todos os blocos seguintes; assim spaCy e o
+        modelo carregam uma vez por worker na execução inteira, não uma vez por bloco.
+        """
+        workers = workers if workers > 0 else (os.cpu_count() or 1)
+        pool: List[ProcessPoolExecutor] = []
+
+        def get_pool() -> ProcessPoolExecutor:
+            # Dimensionado por `workers`, não pelo primeiro bloco: um bloco inicial pequeno (cache,
+            # modo incremental) não pode limitar os blocos grandes que vêm depois.
+            if not pool:
+                pool.append(ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker, initargs=(self._settings(),),
+                ))
+            return pool[0]
+
+        try:
+            for texts in tables:
+                texts = list(texts)
+                computed = []
+
+                def compute(todo: List[str]) -> List[Decision]:
+                    computed.append(len(todo))
+                    # `progress` conta linhas da tabela: o que veio do cache ou repetido entra de uma vez.
+                    if progress and len(todo) < len(texts):
+                        progress(len(texts) - len(todo))
+                    return self._analyze_chunks(todo, workers, chunk_size, redact, progress, get_pool)
+
+                out = self._with_cache(texts, redact, compute)
+                if progress and texts and not computed:
+                    progress(len(texts))
+                yield out
+        finally:
+            if pool:
+                pool[0].shutdown()
+
+    def _analyze_chunks(
+        self,
+        texts: List[str],
+        workers: int,
+        chunk_size: int,
+        redact: bool,
+        progress: Optional[Callable[[int], None]],
+        get_pool: Callable[[], ProcessPoolExecutor],
+    ) -> List[Decision]:
+        chunks = [texts[i:i+chunk_size] for i in range(0, len(texts), chunk_size)]
+        out: List[Decision] = []
 
+        if workers == 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                out.extend(self._analyze_fresh(chunk, redact))
+                if progress:
+                    progress(len(chunk))
+            return out
+
+        results = get_pool().map(_analyze_chunk, chunks, [redact] * len(chunks))
+        for chunk, (decisions, profile) in zip(chunks, results):
+            out.extend(decisions)
+            if profile is not None:
+                self.detector.profile.merge(profile)
+            if progress:
+                progress(len(chunk))
+        return out
+
+    def _settings(self) -> Dict[str, Any]:
+        # Tudo o que um worker precisa para montar um motor equivalente a este.
+        # Modelo que veio de arquivo vai como referência (caminho + hash): o worker o carrega
+        # pelo registro, com mmap, em vez de receber uma cópia serializada.
+        ref = None
+        if self.ml_model is not None:
+            from ..ml.registry import model_ref
+
+            ref = model_ref(self.ml_model)
+        return {
+            "use_ner": self.use_ner,
+            "ml_model": self.ml_model if ref is None else None,
+            "ml_model_ref": ref,
+            "ner_batch_size": self.ner_batch_size,
+            "overlap_policy": self.overlap_policy,
+            "profile_rules": self.profile_rules,
+            "columnar": self.columnar,
+            "ml_threshold": self.ml_threshold,
+            # O motor já resolvido ("auto" -> re2/hyperscan/re): todos os workers usam o mesmo.
+            "regex_backend": self.detector.regex_backend,
+        }
+
+    def _decide(
+        self, text: str, audit: List[Dict[str, Any]], redacted: str, redact: bool, ml_probability: Optional[float] = None,
+    ) -> Decision:
         if audit:
             types = sorted({a.get("tipo","") for a in audit if a.get("tipo")})
             risk_order = {"CRÍTICO":4,"ALTO":3,"MÉDIO":2,"BAIXO":1}
@@ -39,9 +265,52 @@ class GuardianEngine:
                 max_risk
             )
 
-        if self.ml_model is not None:
-            pred = self.ml_model.predict([text])[0]
-            if pred == 1:
-                return Decision(True, "ML: backstop classificou como positivo", 0, [], redacted if redact else text)
+        if ml_probability is not None and ml_probability >= self.ml_threshold:
+            return Decision(
+                True, "ML: backstop classificou como positivo", 0, [], redacted if redact else text,
+                ml_probability=ml_probability,
+            )
+
+        return Decision(
+            False, "NEGATIVO: nenhum sinal estruturado + ML negativo/ausente", 0, [], text,
+            ml_probability=ml_probability,
+        )
+
+
+def decision_to_record(d: Decision) -> Dict[str, Any]:
+    """Decision como dict JSON, sem o timestamp dos achados (usado pelo cache e pelo estado do bundle)."""
+    value = asdict(d)
+    value["findings"] = [{k: v for k, v in f.items() if k != "timestamp"} for f in d.findings]
+    return value
+
+
+def decision_from_record(value: Dict[str, Any], now: str) -> Decision:
+    """Inverso de decision_to_record: os achados recebem o timestamp `now`."""
+    findings = [{**f, "timestamp": now} for f in value["findings"]]
+    return Decision(**{**value, "findings": findings})
+
+
+# --- Execução em múltiplos processos ---
+# Cada worker guarda o seu próprio motor; assim spaCy e o modelo carregam uma vez por processo.
+_WORKER_ENGINE: Optional[GuardianEngine] = None
+
+
+def _init_worker(settings: Dict[str, Any]) -> None:
+    global _WORKER_ENGINE
+    settings = dict(settings)
+    ref = settings.pop("ml_model_ref", None)
+    if ref is not None:
+        from ..ml.registry import load_model
+
+        settings["ml_model"] = load_model(*ref)
+    _WORKER_ENGINE = GuardianEngine(**settings)
+
 
-        return Decision(False, "NEGATIVO: nenhum sinal estruturado + ML negativo/ausente", 0, [], text)
+def _analyze_chunk(texts: List[str], redact: bool):
+    decisions = _WORKER_ENGINE._analyze_fresh(texts, redact)
+    # Com profile ligado, o perfil do bloco volta junto e o worker recomeça do zero.
+    det = _WORKER_ENGINE.detector
+    profile = det.profile
+    if profile is not None:
+        det.profile = DetectorProfile(profile.top_n)
+    return decisions, profile
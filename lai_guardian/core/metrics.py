@@ -1,6 +1,29 @@
 from __future__ import annotations
+import json
+import os
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+CONFUSION_COLUMNS = ("vp", "fp", "fn", "vn")
+
+# Tipos que tornam o pedido "com dado pessoal"; SEI/CNJ/protocolo são administrativos.
+PII_TYPES = ("CPF", "RG", "E-MAIL", "TELEFONE", "CEP", "ENDEREÇO", "CARTÃO", "NOME_PESSOA")
+ADMIN_TYPES = ("PROCESSO_SEI", "PROCESSO_CNJ", "PROTOCOLO")
+
+# Coluna de rótulo (data/raw/dataset_labeled.csv) -> tipos do detector que contam para ela.
+LABEL_COLUMNS = {
+    "label_cpf": ("CPF",),
+    "label_email": ("E-MAIL",),
+    "label_phone": ("TELEFONE",),
+    "label_process": ADMIN_TYPES,
+    "label_address": ("ENDEREÇO",),
+    "label_rg": ("RG",),
+    "label_cep": ("CEP",),
+    "label_card": ("CARTÃO",),
+    "label_name": ("NOME_PESSOA",),
+}
 
 @dataclass
 class EvaluationMetrics:
@@ -8,18 +31,37 @@ class EvaluationMetrics:
     precision: float; recall: float; f1: float; accuracy: float
     total: int; positivos_reais: int; negativos_reais: int
 
-def calculate(y_true: List[int], y_pred: List[int]) -> EvaluationMetrics:
-    assert len(y_true) == len(y_pred)
-    vp = sum(1 for t,p in zip(y_true,y_pred) if t==1 and p==1)
-    fp = sum(1 for t,p in zip(y_true,y_pred) if t==0 and p==1)
-    fn = sum(1 for t,p in zip(y_true,y_pred) if t==1 and p==0)
-    vn = sum(1 for t,p in zip(y_true,y_pred) if t==0 and p==0)
+def confusion_counts(y_true, y_pred) -> np.ndarray:
+    """
+    Matriz de confusão de todas as colunas numa passada: entradas linhas × tipos (0/1, ou um vetor
+    para um tipo só); saída tipos × (vp, fp, fn, vn). Cada célula vira um código 0..3 e um único
+    bincount conta os códigos de todas as colunas.
+    """
+    t = np.asarray(y_true).astype(bool)
+    p = np.asarray(y_pred).astype(bool)
+    assert t.shape == p.shape
+    if t.ndim == 1:
+        t, p = t[:, None], p[:, None]
+    k = t.shape[1]
+    code = _codes(t, p)
+    return np.bincount((code + 4 * np.arange(k)).ravel(), minlength=4 * k).reshape(k, 4)
+
+def _codes(t: np.ndarray, p: np.ndarray) -> np.ndarray:
+    # vp=0, fp=1, fn=2, vn=3 (ordem de CONFUSION_COLUMNS)
+    return 2 * (~p).astype(np.int64) + (~t)
+
+def _from_counts(vp: int, fp: int, fn: int, vn: int) -> EvaluationMetrics:
     precision = vp/(vp+fp) if (vp+fp)>0 else 0.0
     recall = vp/(vp+fn) if (vp+fn)>0 else 0.0
     f1 = (2*precision*recall/(precision+recall)) if (precision+recall)>0 else 0.0
-    accuracy = (vp+vn)/len(y_true) if len(y_true)>0 else 0.0
-    pos = sum(y_true); neg = len(y_true)-pos
-    return EvaluationMetrics(vp,fp,fn,vn,precision,recall,f1,accuracy,len(y_true),pos,neg)
+    total = vp+fp+fn+vn
+    accuracy = (vp+vn)/total if total>0 else 0.0
+    return EvaluationMetrics(vp,fp,fn,vn,precision,recall,f1,accuracy,total,vp+fn,fp+vn)
+
+def calculate(y_true: List[int], y_pred: List[int]) -> EvaluationMetrics:
+    assert len(y_true) == len(y_pred)
+    vp, fp, fn, vn = (int(c) for c in confusion_counts(y_true, y_pred)[0])
+    return _from_counts(vp, fp, fn, vn)
 
 def to_dict(m: EvaluationMetrics) -> Dict:
     return {
@@ -27,3 +69,93 @@ def to_dict(m: EvaluationMetrics) -> Dict:
         "contagens": {"vp": m.vp, "fp": m.fp, "fn": m.fn, "vn": m.vn},
         "totais": {"total": m.total, "positivos_reais": m.positivos_reais, "negativos_reais": m.negativos_reais},
     }
+
+def update_metrics_file(path: str, entries: Mapping[str, Any]) -> None:
+    """
+    metrics.json é compartilhado (métricas do modelo, relatório do detector, perfil das regras):
+    cada escritor lê o arquivo, troca só as próprias chaves e grava de volta.
+    """
+    metrics: Dict[str, Any] = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            metrics = json.load(f)
+    metrics.update(entries)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, ensure_ascii=False, indent=2)
+
+def _prf(counts: np.ndarray) -> np.ndarray:
+    """(..., 4) contagens -> (..., 3) precision, recall, f1; NaN quando a métrica não é definida."""
+    vp, fp, fn = (counts[..., j].astype(np.float64) for j in range(3))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = vp / (vp + fp)
+        recall = vp / (vp + fn)
+        f1 = 2 * vp / (2 * vp + fp + fn)
+    return np.stack([precision, recall, f1], axis=-1)
+
+def bootstrap_counts(y_true, y_pred, n_boot: int = 1000, seed: int = 0) -> np.ndarray:
+    """
+    Contagens (vp, fp, fn, vn) por tipo em `n_boot` reamostragens das linhas com reposição: n_boot × tipos × 4.
+    Cada linha se resume a um padrão (o código de cada tipo); reamostrar n linhas equivale a sortear
+    uma multinomial sobre os padrões distintos, então o custo depende de quantos padrões há, não de n.
+    """
+    t = np.asarray(y_true).astype(bool)
+    p = np.asarray(y_pred).astype(bool)
+    if t.ndim == 1:
+        t, p = t[:, None], p[:, None]
+    n, k = t.shape
+    assert k <= 31, "até 31 tipos (o padrão da linha é um int64 em base 4)"
+    base = 4 ** np.arange(k, dtype=np.int64)
+    patterns, freq = np.unique(_codes(t, p) @ base, return_counts=True)
+    onehot = np.eye(4, dtype=np.int64)[(patterns[:, None] // base) % 4]  # padrões × tipos × 4
+    weights = np.random.default_rng(seed).multinomial(n, freq / n, size=n_boot)  # n_boot × padrões
+    return np.einsum("bp,pkc->bkc", weights, onehot)
+
+def _entry(counts: np.ndarray, boot: np.ndarray, alpha: float) -> Dict[str, Any]:
+    m = _from_counts(*(int(c) for c in counts))
+    # Reamostragens em que a métrica não existe (ex.: nenhum positivo sorteado) ficam de fora do percentil.
+    values = _prf(boot)
+    out = to_dict(m)
+    out["ic"] = {}
+    for j, name in enumerate(("precision", "recall", "f1")):
+        col = values[:, j][~np.isnan(values[:, j])]
+        out["ic"][name] = (
+            [float(v) for v in np.percentile(col, [100 * alpha / 2, 100 * (1 - alpha / 2)])] if col.size else None
+        )
+    return out
+
+def per_type_report(
+    y_true, y_pred, names: Sequence[str], n_boot: int = 1000, alpha: float = 0.05, seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Métricas por tipo (colunas de y_true/y_pred, na ordem de `names`) e a micro-média, cada uma com
+    intervalo de confiança bootstrap (percentil, nível 1 - alpha) para precision, recall e f1.
+    """
+    counts = confusion_counts(y_true, y_pred)
+    boot = bootstrap_counts(y_true, y_pred, n_boot, seed)
+    return {
+        "tipos": {name: _entry(counts[j], boot[:, j], alpha) for j, name in enumerate(names)},
+        "micro": _entry(counts.sum(axis=0), boot.sum(axis=1), alpha),
+        "bootstrap": {"reamostragens": n_boot, "alpha": alpha, "seed": seed},
+    }
+
+def label_matrix(types_per_row: Iterable[Iterable[str]], label_types: Mapping[str, Tuple[str, ...]]) -> np.ndarray:
+    """
+    linhas × rótulos (0/1): 1 quando algum tipo da linha pertence ao rótulo
+    (ex.: label_process <- SEI/CNJ/PROTOCOLO). Um tipo pode contar para mais de um rótulo.
+    """
+    columns: Dict[str, List[int]] = {}
+    for j, kinds in enumerate(label_types.values()):
+        for tipo in kinds:
+            columns.setdefault(tipo, []).append(j)
+    rows: List[int] = []
+    cols: List[int] = []
+    n = 0
+    for i, types in enumerate(types_per_row):
+        n = i + 1
+        for j in {j for t in types for j in columns.get(t, ())}:
+            rows.append(i)
+            cols.append(j)
+    out = np.zeros((n, len(label_types)), dtype=bool)
+    out[np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)] = True
+    return out
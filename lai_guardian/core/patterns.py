@@ -12,7 +12,8 @@ RG_CTX = re.compile(r"(?:RG|Identidade|Reg\.?\s*Geral)\s*[:\-]?\s*(\d{1,2}\.?\d{
 PHONE = re.compile(r"(?:\(?\d{2}\)?\s?)?(?:9\d{4}|\d{4})[-.\s]?\d{4}")
 
 # Address heuristic
-ADDRESS = re.compile(r"([A-ZÀ-Úa-zà-ú0-9\s\.]{6,},\s*\d+(?:[/-]\d+)?(?:\s*[A-Za-z]+)?)")
+ADDRESS_CHARS = r"[A-ZÀ-Úa-zà-ú0-9\s\.]"
+ADDRESS = re.compile(r"(" + ADDRESS_CHARS + r"{6,},\s*\d+(?:[/-]\d+)?(?:\s*[A-Za-z]+)?)")
 
 # --- Administrative identifiers (NOT PII by default) ---
 # SEI-like: flexible, e.g. 00015-01009853/2026-01
@@ -26,3 +27,18 @@ PROTOCOLO_NUM = re.compile(r"\b(?:\d{4,}[-/]\d{2,4}|\d{4,}/\d{4}(?:-\d{2})?)\b")
 
 # Keywords for contextual disambiguation
 KW_PROCESSO = re.compile(r"\b(sei|processo|protocolo|autos|procedimento|n[ºo]\.?|número)\b", re.IGNORECASE)
+
+# --- Tabela de regras (ordem do detector) ---
+# Consumida pelo scanner de passada única (core/scanner.py). O nome vira grupo nomeado no padrão combinado.
+RULES = (
+    ("PROCESSO_SEI", PROCESSO_SEI),
+    ("PROCESSO_CNJ", PROCESSO_CNJ),
+    ("PROTOCOLO", PROTOCOLO_NUM),
+    ("CPF", CPF),
+    ("RG", RG_CTX),
+    ("ENDERECO", ADDRESS),
+    ("CEP", CEP),
+    ("EMAIL", EMAIL),
+    ("TELEFONE", PHONE),
+    ("CARTAO", CARD),
+)
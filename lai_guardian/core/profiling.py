@@ -0,0 +1,158 @@
+from __future__ import annotations
+"""Contadores e tempos por família de regra do HybridDetector (ligados só quando pedidos)."""
+
+import hashlib
+import heapq
+import itertools
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Ordem de exibição. "triage" escolhe as famílias possíveis por texto (core/triage.py);
+# "scan" é a passada única do scanner (as regras escolhidas, juntas);
+# as demais medem o pós-filtro de cada família, o NER e a deduplicação final.
+STAGES = (
+    "triage", "scan", "PROCESSO_SEI", "PROCESSO_CNJ", "PROTOCOLO", "CPF", "RG", "ENDERECO",
+    "CEP", "EMAIL", "TELEFONE", "CARTAO", "NER", "dedup",
+)
+
+
+class DetectorProfile:
+    """
+    Acumula, por família: candidatos do scanner, aceitos, rejeitados por motivo e tempo total.
+    Guarda também os `top_n` textos mais lentos com o tempo de cada etapa.
+
+    Os textos lentos são identificados pelo sha256 (mesmo hash do estado do bundle) e tamanho,
+    nunca pelo conteúdo: o relatório não pode vazar o dado pessoal que estamos protegendo.
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.texts = 0
+        self.matched: Dict[str, int] = defaultdict(int)
+        self.accepted: Dict[str, int] = defaultdict(int)
+        self.rejected: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self._slowest: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._seq = itertools.count()
+
+    # --- coleta (chamada pelo detector) ---
+
+    def reject(self, family: str, reason: str) -> None:
+        self.rejected[family][reason] += 1
+
+    def add_family(self, family: str, matched: int, accepted: int, seconds: float, breakdown: Optional[Dict[str, float]]) -> None:
+        self.matched[family] += matched
+        self.accepted[family] += accepted
+        self.seconds[family] += seconds
+        if breakdown is not None:
+            breakdown[family] = breakdown.get(family, 0.0) + seconds
+
+    def finish_text(self, text: str, breakdown: Dict[str, float]) -> None:
+        self.texts += 1
+        total = sum(breakdown.values())
+        if self.top_n <= 0:
+            return
+        if len(self._slowest) >= self.top_n and total <= self._slowest[0][0]:
+            return
+        entry = {
+            "seconds": total,
+            "chars": len(text),
+            "text_sha256": hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest(),
+            "breakdown": dict(breakdown),
+        }
+        item = (total, next(self._seq), entry)
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, item)
+        else:
+            heapq.heapreplace(self._slowest, item)
+
+    # --- consolidação ---
+
+    def merge(self, other: "DetectorProfile") -> None:
+        """Soma o perfil de outro detector (ex.: de um worker do analyze_many)."""
+        self.texts += other.texts
+        for fam, n in other.matched.items():
+            self.matched[fam] += n
+        for fam, n in other.accepted.items():
+            self.accepted[fam] += n
+        for fam, s in other.seconds.items():
+            self.seconds[fam] += s
+        for fam, reasons in other.rejected.items():
+            for reason, n in reasons.items():
+                self.rejected[fam][reason] += n
+        for total, _, entry in other._slowest:
+            item = (total, next(self._seq), entry)
+            if len(self._slowest) < self.top_n:
+                heapq.heappush(self._slowest, item)
+            elif total > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def slowest(self) -> List[Dict[str, Any]]:
+        return [e for _, _, e in sorted(self._slowest, key=lambda x: (-x[0], x[1]))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        families = {}
+        order = list(STAGES) + sorted(set(self.seconds) - set(STAGES))
+        for fam in order:
+            if fam not in self.seconds and fam not in self.matched:
+                continue
+            families[fam] = {
+                "matched": self.matched.get(fam, 0),
+                "accepted": self.accepted.get(fam, 0),
+                "rejected": dict(self.rejected.get(fam, {})),
+                "seconds": round(self.seconds.get(fam, 0.0), 6),
+            }
+        return {
+            "texts": self.texts,
+            "total_seconds": round(sum(self.seconds.values()), 6),
+            "families": families,
+            "slowest": [
+                {**e, "seconds": round(e["seconds"], 6), "breakdown": {k: round(v, 6) for k, v in e["breakdown"].items()}}
+                for e in self.slowest()
+            ],
+        }
+
+    def __getstate__(self):
+        # defaultdict com lambda não é serializável: viaja como dicts comuns entre processos.
+        state = self.__dict__.copy()
+        state["matched"] = dict(self.matched)
+        state["accepted"] = dict(self.accepted)
+        state["seconds"] = dict(self.seconds)
+        state["rejected"] = {k: dict(v) for k, v in self.rejected.items()}
+        state["_seq"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.matched = defaultdict(int, state["matched"])
+        self.accepted = defaultdict(int, state["accepted"])
+        self.seconds = defaultdict(float, state["seconds"])
+        self.rejected = defaultdict(lambda: defaultdict(int), {k: defaultdict(int, v) for k, v in state["rejected"].items()})
+        self._seq = itertools.count(max((s for _, s, _ in self._slowest), default=-1) + 1)
+
+
+class Stopwatch:
+    """Cronômetro de um texto: cada lap() fecha a etapa anterior e credita o tempo à família."""
+
+    __slots__ = ("profile", "breakdown", "t", "n")
+
+    def __init__(self, profile: DetectorProfile):
+        self.profile = profile
+        self.breakdown: Dict[str, float] = {}
+        self.t = time.perf_counter()
+        self.n = 0
+
+    def lap(self, family: str, matched: int, findings: List[Any]) -> None:
+        now = time.perf_counter()
+        self.profile.add_family(family, matched, len(findings) - self.n, now - self.t, self.breakdown)
+        self.t = now
+        self.n = len(findings)
+
+    def reject(self, family: str, reason: str) -> None:
+        self.profile.reject(family, reason)
+
+    def restart(self, findings: List[Any]) -> None:
+        """Recomeça a contagem (ex.: depois de um trecho medido fora deste texto)."""
+        self.t = time.perf_counter()
+        self.n = len(findings)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+"""
+Motores de regex para as regras de core/patterns.py: `re` (RuleScanner), RE2 e Hyperscan.
+
+Os três devolvem exatamente os spans do RuleScanner (tests/test_regex_backend.py confere no corpus
+de benchmark); o motor só muda o tempo, por isso não entra na impressão digital do cache.
+- re2: cada regra traduzida para a sintaxe do RE2 (tempo linear, sem backtracking) e varrida com finditer.
+- hyperscan: um banco com todas as regras (SINGLEMATCH) diz, numa passada, quais regras casam em algum
+  ponto do texto; o RuleScanner varre só essas.
+
+RE2 e Hyperscan entendem \\d, \\s e \\b em ASCII; o `re` do Python, em Unicode. A tradução iguala \\d e \\s
+nos caracteres ASCII, e os textos com algum caractere não ASCII capaz de mudar um match (dígito ou
+espaço Unicode, letra acentuada encostada num número ou num e-mail) vão direto para o RuleScanner.
+"""
+import re
+import threading
+from typing import AbstractSet, Dict, List, Optional, Sequence, Tuple
+
+from .patterns import RULES
+from .scanner import RuleScanner, Span
+
+BACKENDS = ("auto", "re", "re2", "hyperscan")
+
+# Espaço do `re` em texto ASCII (str.isspace): inclui \v e \x1c-\x1f, que o \s do RE2 não inclui.
+_ASCII_SPACE = r"\t\n\x0b\f\r\x1c-\x1f "
+_OUTSIDE = {"d": "[0-9]", "D": "[^0-9]", "s": f"[{_ASCII_SPACE}]", "S": f"[^{_ASCII_SPACE}]"}
+_INSIDE = {"d": "0-9", "s": _ASCII_SPACE}
+# Construções que RE2/Hyperscan não aceitam (lookaround, referência) ou cuja diferença ASCII/Unicode
+# _NEEDS_RE não cobre (\w, \W, \B). \b é aceito: nas regras atuais ele sempre encosta num dígito
+# ou num caractere de e-mail, que é o caso tratado por _NEEDS_RE.
+_UNSUPPORTED = re.compile(r"\(\?(?:[=!]|<[=!])|\\[1-9wWB]")
+
+# Texto em que ASCII e Unicode podem discordar: dígito/espaço não ASCII, letras com dobra de caixa
+# especial (afetam o IGNORECASE do RG), ou letra não ASCII encostada num trecho com dígito ou '@'
+# (ali um \b daria resultado diferente).
+_NEEDS_RE = re.compile(
+    r"[^\x00-\x7f](?<=[\d\sİıſK])"
+    r"|[^\x00-\x7f](?<=\w)[A-Za-z0-9._%+@-]*[0-9@]"
+    r"|[0-9@][A-Za-z0-9._%+@-]*[^\x00-\x7f](?<=\w)"
+)
+
+
+def needs_re(text: str) -> bool:
+    """True quando só o `re` garante o resultado certo para `text`."""
+    return not text.isascii() and _NEEDS_RE.search(text) is not None
+
+
+def translate(pattern: re.Pattern) -> str:
+    """Fonte do padrão com \\d, \\D, \\s e \\S em classes ASCII explícitas (mesma semântica do `re` em ASCII)."""
+    src = pattern.pattern
+    if _UNSUPPORTED.search(src):
+        raise ValueError(f"Padrão sem tradução para RE2/Hyperscan: {src}")
+    out: List[str] = []
+    i, in_class = 0, False
+    while i < len(src):
+        c = src[i]
+        if c == "\\" and i + 1 < len(src):
+            esc = src[i + 1]
+            if in_class and esc in "DS":
+                raise ValueError(f"Classe negada dentro de [...] sem tradução: {src}")
+            out.append((_INSIDE if in_class else _OUTSIDE).get(esc, src[i:i + 2]))
+            i += 2
+            continue
+        if c == "[" and not in_class:
+            in_class = True
+        elif c == "]" and in_class and out[-1] != "[":
+            in_class = False
+        out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def _require(module: str, package: str):
+    try:
+        return __import__(module)
+    except ImportError as e:
+        raise RuntimeError(f"Backend de regex '{module}' requer o pacote '{package}' (pip install {package}).") from e
+
+
+class Re2Scanner:
+    """Mesma interface do RuleScanner (scan(text, only)), com um finditer do RE2 por regra."""
+
+    backend = "re2"
+
+    def __init__(self, rules: Sequence[Tuple[str, re.Pattern]] = RULES):
+        re2 = _require("re2", "google-re2")
+        self.rules = tuple(rules)
+        self._fallback = RuleScanner(self.rules)
+        self._compiled = []
+        for name, pattern in self.rules:
+            src = translate(pattern)
+            if pattern.flags & re.IGNORECASE:
+                src = f"(?i){src}"
+            self._compiled.append((name, re2.compile(src), 1 if pattern.groups else 0))
+
+    def scan(self, text: str, only: Optional[AbstractSet[str]] = None) -> Dict[str, List[Span]]:
+        if needs_re(text):
+            return self._fallback.scan(text, only)
+        return {
+            name: [m.span(group) for m in compiled.finditer(text)] if only is None or name in only else []
+            for name, compiled, group in self._compiled
+        }
+
+
+class HyperscanScanner:
+    """Hyperscan decide quais regras casam no texto; o RuleScanner calcula os spans só dessas."""
+
+    backend = "hyperscan"
+
+    def __init__(self, rules: Sequence[Tuple[str, re.Pattern]] = RULES):
+        hs = _require("hyperscan", "hyperscan")
+        self.rules = tuple(rules)
+        self._fallback = RuleScanner(self.rules)
+        self._names = [name for name, _ in self.rules]
+        self._hs = hs
+        self._db = hs.Database()
+        self._db.compile(
+            expressions=[translate(p).encode("utf-8") for _, p in self.rules],
+            ids=list(range(len(self.rules))),
+            elements=len(self.rules),
+            flags=[
+                hs.HS_FLAG_UTF8 | hs.HS_FLAG_SINGLEMATCH | hs.HS_FLAG_ALLOWEMPTY
+                | (hs.HS_FLAG_CASELESS if p.flags & re.IGNORECASE else 0)
+                for _, p in self.rules
+            ],
+        )
+        # O scratch do Hyperscan não pode ser usado por duas threads ao mesmo tempo (ex.: servidor).
+        self._local = threading.local()
+
+    def _fired(self, text: str) -> set:
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = self._hs.Scratch(self._db)
+        fired: set = set()
+        names = self._names
+        self._db.scan(
+            text.encode("utf-8"), scratch=scratch,
+            match_event_handler=lambda i, start, end, flags, ctx: fired.add(names[i]),
+        )
+        return fired
+
+    def scan(self, text: str, only: Optional[AbstractSet[str]] = None) -> Dict[str, List[Span]]:
+        if needs_re(text):
+            return self._fallback.scan(text, only)
+        fired = self._fired(text)
+        return self._fallback.scan(text, fired if only is None else fired & set(only))
+
+
+def make_scanner(backend: str = "auto", rules: Sequence[Tuple[str, re.Pattern]] = RULES):
+    """
+    Scanner das regras no motor pedido. "auto" usa o primeiro disponível entre re2, hyperscan e re;
+    pedir re2/hyperscan explicitamente sem o pacote instalado é erro (RuntimeError).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de regex inválido: {backend} (use {', '.join(BACKENDS)})")
+    if backend == "re":
+        return RuleScanner(rules)
+    if backend == "re2":
+        return Re2Scanner(rules)
+    if backend == "hyperscan":
+        return HyperscanScanner(rules)
+    for cls in (Re2Scanner, HyperscanScanner):
+        try:
+            return cls(rules)
+        except Exception:  # pacote ausente, ou Hyperscan numa CPU sem suporte
+            continue
+    return RuleScanner(rules)
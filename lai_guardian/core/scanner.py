@@ -0,0 +1,128 @@
+from __future__ import annotations
+"""Scanner de passada única: todas as regras de core/patterns.py compiladas num só padrão, preservando o resultado de cada finditer."""
+import re
+from typing import AbstractSet, Dict, List, Optional, Sequence, Tuple
+
+from .patterns import RULES, ADDRESS_CHARS
+
+Span = Tuple[int, int]
+
+# Regras que começam com uma sequência gulosa de uma classe de caracteres.
+# Dentro da mesma sequência todas as posições têm o mesmo desfecho, então basta
+# tentar no início dela (lookbehind) e logo após o último achado da própria regra.
+RUN_ANCHORED = {"ENDERECO": ADDRESS_CHARS}
+
+# Condição barata e NECESSÁRIA para uma regra casar a partir de uma posição.
+# A união delas vira um filtro na frente do padrão combinado: a maioria das posições
+# (letras no meio de palavras) é descartada sem testar regra nenhuma.
+START_GUARDS = {
+    "PROCESSO_SEI": r"\d",
+    "PROCESSO_CNJ": r"\d",
+    "PROTOCOLO": r"\d",
+    "CPF": r"\D?\d",
+    "RG": r"(?i:RG|Identidade|Reg)",
+    "ENDERECO": f"(?<!{ADDRESS_CHARS}){ADDRESS_CHARS}",
+    "CEP": r"\d",
+    "EMAIL": r"\b[a-zA-Z0-9._%+-]+@",
+    "TELEFONE": r"[\d(]",
+    "CARTAO": r"\d",
+}
+
+# Parênteses de captura "puros" (não escapados e que não abrem (?...)).
+_CAPTURE_OPEN = re.compile(r"(?<!\\)\((?!\?)")
+
+
+def _inline(name: str, pattern: re.Pattern) -> str:
+    """Fonte do padrão com o 1º grupo renomeado para <name>__v e os demais sem captura."""
+    seen = []
+
+    def repl(_m):
+        seen.append(1)
+        return f"(?P<{name}__v>" if len(seen) == 1 else "(?:"
+
+    src = _CAPTURE_OPEN.sub(repl, pattern.pattern)
+    if len(seen) != pattern.groups:
+        raise ValueError(f"Regra {name}: não foi possível reescrever os grupos de captura.")
+    if pattern.flags & re.IGNORECASE:
+        src = f"(?i:{src})"
+    return src
+
+
+class RuleScanner:
+    """
+    Varre o texto uma única vez e devolve, por regra, os spans que `finditer` daquela regra devolveria.
+
+    O padrão combinado é um filtro de início (START_GUARDS) seguido de lookaheads opcionais
+    (um grupo nomeado por regra), então cada posição informa todas as regras que casam ali.
+    A semântica "sem sobreposição" de cada finditer é refeita aqui, guardando o fim do
+    último achado de cada regra.
+    """
+
+    backend = "re"  # ver core/regex_backend.py
+
+    def __init__(self, rules: Sequence[Tuple[str, re.Pattern]] = RULES):
+        self.rules = tuple(rules)
+        parts, cond = [], "(?!)"
+        for name, pattern in self.rules:
+            src = _inline(name, pattern)
+            if name in RUN_ANCHORED:
+                src = f"(?<!{RUN_ANCHORED[name]}){src}"
+            parts.append(f"(?:(?=(?P<{name}>{src}))|)")
+        for name, _ in reversed(self.rules):
+            cond = f"(?({name})|{cond})"
+        guard = ""
+        if all(name in START_GUARDS for name, _ in self.rules):
+            alts = dict.fromkeys(START_GUARDS[name] for name, _ in self.rules)
+            guard = "(?=" + "|".join(alts) + ")"
+        self.combined = re.compile(guard + "".join(parts) + cond)
+
+        gi = self.combined.groupindex
+        # (nome, grupo do match completo, grupo do valor, padrão original)
+        self._slots = [
+            (name, gi[name], gi.get(f"{name}__v", gi[name]), pattern)
+            for name, pattern in self.rules
+        ]
+        # Scanners só com parte das regras (ver core/triage.py), compilados sob demanda.
+        self._subsets: Dict[frozenset, "RuleScanner"] = {}
+
+    def scan(self, text: str, only: Optional[AbstractSet[str]] = None) -> Dict[str, List[Span]]:
+        """
+        Spans por regra. Com `only`, varre só essas regras (as demais voltam vazias);
+        cada regra dá o mesmo resultado com ou sem as outras no padrão combinado.
+        """
+        if only is not None:
+            key = frozenset(only) & frozenset(name for name, _ in self.rules)
+            if len(key) < len(self.rules):
+                hits: Dict[str, List[Span]] = {name: [] for name, _ in self.rules}
+                if key:
+                    sub = self._subsets.get(key)
+                    if sub is None:
+                        sub = self._subsets[key] = RuleScanner([r for r in self.rules if r[0] in key])
+                    hits.update(sub.scan(text))
+                return hits
+
+        hits = {name: [] for name, _ in self.rules}
+        last_end = {name: 0 for name, _ in self.rules}
+
+        for m in self.combined.finditer(text):
+            pos = m.start()
+            for name, g_full, g_val, pattern in self._slots:
+                end = m.end(g_full)
+                if end < 0 or pos < last_end[name]:
+                    continue
+                hits[name].append(m.span(g_val))
+                if name in RUN_ANCHORED:
+                    end = self._resume(text, pattern, end, hits[name])
+                last_end[name] = end
+        return hits
+
+    @staticmethod
+    def _resume(text: str, pattern: re.Pattern, end: int, out: List[Span]) -> int:
+        # Depois de um achado, finditer volta a procurar exatamente no fim dele (meio da sequência).
+        group = 1 if pattern.groups else 0
+        while True:
+            mm: Optional[re.Match] = pattern.match(text, end)
+            if mm is None:
+                return end
+            out.append(mm.span(group))
+            end = mm.end()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+"""
+Triagem barata antes do scanner: poucos atributos por texto decidem quais famílias de regra podem casar.
+
+A maior parte dos pedidos LAI não tem '@', tem poucos dígitos e nenhum "número de endereço";
+para esses textos o scanner roda só com as regras possíveis (ou nem roda).
+Cada requisito abaixo é condição NECESSÁRIA do padrão em core/patterns.py, então a triagem
+nunca muda o resultado, só evita trabalho (tests/test_triage.py confere contra a varredura completa).
+"""
+import functools
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Sequence
+
+from .patterns import RULES
+from .scanner import START_GUARDS
+
+_DIGIT = re.compile(r"\d")
+_COMMA_DIGIT = re.compile(r",\s*\d")  # ADDRESS exige ",\s*\d+" depois do logradouro
+_RG_KEYWORD = re.compile(START_GUARDS["RG"])  # RG_CTX só casa depois de "RG", "Identidade" ou "Reg"
+
+# Abaixo disso, montar a Series custa mais que o laço escalar.
+PANDAS_MIN_BATCH = 64
+
+
+@dataclass(frozen=True)
+class Requirement:
+    min_digits: int = 0
+    at: bool = False
+    comma_digit: bool = False
+    rg_keyword: bool = False
+
+
+# Mínimo de dígitos = menor quantidade que o padrão aceita (ex.: CARD são 4 grupos de 4).
+# Não há requisito de palavra-chave para CPF: o padrão casa 11 dígitos sem contexto.
+REQUIREMENTS: Dict[str, Requirement] = {
+    "PROCESSO_SEI": Requirement(min_digits=14),
+    "PROCESSO_CNJ": Requirement(min_digits=20),
+    "PROTOCOLO": Requirement(min_digits=6),
+    "CPF": Requirement(min_digits=11),
+    "RG": Requirement(min_digits=7, rg_keyword=True),
+    "ENDERECO": Requirement(min_digits=1, comma_digit=True),
+    "CEP": Requirement(min_digits=8),
+    "EMAIL": Requirement(at=True),
+    "TELEFONE": Requirement(min_digits=8),
+    "CARTAO": Requirement(min_digits=16),
+}
+
+_NAMES = tuple(name for name, _ in RULES)
+ALL: FrozenSet[str] = frozenset(_NAMES)
+_MAX_DIGITS = max(r.min_digits for r in REQUIREMENTS.values())
+
+
+def _allowed(digits: int, at: bool, comma_digit: bool, rg_keyword: bool) -> FrozenSet[str]:
+    return _allowed_cached(min(digits, _MAX_DIGITS), bool(at), bool(comma_digit), bool(rg_keyword))
+
+
+@functools.lru_cache(maxsize=None)
+def _allowed_cached(digits: int, at: bool, comma_digit: bool, rg_keyword: bool) -> FrozenSet[str]:
+    return frozenset(
+        name for name in _NAMES
+        if digits >= REQUIREMENTS[name].min_digits
+        and (at or not REQUIREMENTS[name].at)
+        and (comma_digit or not REQUIREMENTS[name].comma_digit)
+        and (rg_keyword or not REQUIREMENTS[name].rg_keyword)
+    )
+
+
+def families(text: str) -> FrozenSet[str]:
+    """Famílias de regra que podem casar em `text`."""
+    digits = len(_DIGIT.findall(text))
+    if digits == 0 and "@" not in text:
+        return frozenset()
+    return _allowed(
+        digits,
+        "@" in text,
+        _COMMA_DIGIT.search(text) is not None,
+        _RG_KEYWORD.search(text) is not None,
+    )
+
+
+def features_frame(texts: Sequence[str]):
+    """Atributos da triagem para uma coluna inteira (operações vetorizadas de string do pandas)."""
+    import pandas as pd
+
+    # dtype=object mantém o `re` do Python: \d precisa casar os mesmos dígitos Unicode que os padrões.
+    s = pd.Series(list(texts), dtype=object)
+    return pd.DataFrame({
+        "digits": s.str.count(_DIGIT.pattern),
+        "at": s.str.contains("@", regex=False),
+        "comma_digit": s.str.contains(_COMMA_DIGIT.pattern, regex=True),
+        "rg_keyword": s.str.contains(_RG_KEYWORD.pattern, regex=True),
+    })
+
+
+def families_batch(texts: Sequence[str]) -> List[FrozenSet[str]]:
+    """families() para muitos textos; com lote grande, os atributos saem de features_frame()."""
+    if len(texts) < PANDAS_MIN_BATCH:
+        return [families(t) for t in texts]
+
+    f = features_frame(texts)
+    digits = f["digits"].clip(upper=_MAX_DIGITS)
+    rows = zip(digits.tolist(), f["at"].tolist(), f["comma_digit"].tolist(), f["rg_keyword"].tolist())
+    return [_allowed_cached(*r) for r in rows]
@@ -1,22 +1,220 @@
+from __future__ import annotations
+"""
+Dígitos verificadores de documentos brasileiros (CPF, CNPJ, PIS/NIS, título de eleitor, CNH) e Luhn (cartão).
+
+Cada documento é uma linha de SCHEMES: pesos por posição + regra que transforma o resto no dígito.
+O mesmo esquema roda em Python puro (poucos candidatos) ou como aritmética NumPy sobre uma matriz
+de dígitos (lotes), e os dois caminhos dão o mesmo resultado.
+"""
 import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+_NON_DIGIT = re.compile(r"\D")
+
+# Abaixo disso o custo fixo do NumPy (montar a matriz) passa o do laço em Python.
+NUMPY_MIN_BATCH = 32
+
 
 def only_digits(s: str) -> str:
-    return re.sub(r"\D", "", s or "")
+    return _NON_DIGIT.sub("", s or "")
 
-def validate_cpf_mod11(cpf: str) -> bool:
-    nums = [int(d) for d in only_digits(cpf)]
-    if len(nums) != 11:
+
+# Regras resto -> dígito. Recebem `where` (np.where ou um if/else escalar) para servir aos dois caminhos;
+# `ctx` dá acesso às colunas de dígitos e aos restos dos dígitos verificadores anteriores.
+Where = Callable[[Any, Any, Any], Any]
+
+
+class _Ctx:
+    __slots__ = ("digits", "remainders")
+
+    def __init__(self, digits):
+        self.digits = digits  # lista de ints (escalar) ou matriz n x L (NumPy)
+        self.remainders: List[Any] = []
+
+    def col(self, i: int):
+        d = self.digits
+        return d[i] if isinstance(d, list) else d[:, i]
+
+
+def _mod11(r, ctx: _Ctx, where: Where):
+    # CPF, CNPJ, PIS: resto 0 ou 1 vira 0, senão 11 - resto (equivale ao "(s * 10) % 11, 10 -> 0" do CPF).
+    return where(r < 2, 0, 11 - r)
+
+
+def _titulo(r, ctx: _Ctx, where: Where):
+    # O próprio resto é o dígito (10 -> 0); em SP (01) e MG (02), resto 0 vira 1.
+    uf = ctx.col(8) * 10 + ctx.col(9)
+    d = where(r == 10, 0, r)
+    return where(((uf == 1) | (uf == 2)) & (r == 0), 1, d)
+
+
+def _cnh_1(r, ctx: _Ctx, where: Where):
+    return where(r >= 10, 0, r)
+
+
+def _cnh_2(r, ctx: _Ctx, where: Where):
+    # Quando o 1º dígito "estoura" (resto >= 10), o 2º é descontado de 2.
+    dsc = where(ctx.remainders[0] >= 10, 2, 0)
+    d = r - dsc
+    d = where(d < 0, d + 11, d)
+    return where(d >= 10, 0, d)
+
+
+@dataclass(frozen=True)
+class CheckDigit:
+    position: int  # índice do dígito verificador na string só de dígitos
+    weights: Tuple[int, ...]  # peso das posições 0..len(weights)-1 (0 = não entra na soma)
+    rule: Callable[..., Any]
+
+
+@dataclass(frozen=True)
+class Scheme:
+    name: str
+    lengths: Tuple[int, ...]
+    checks: Tuple[CheckDigit, ...] = ()
+    luhn: bool = False
+    reject_repeated: bool = True  # "111.111.111-11" passa no mód. 11 mas não é documento
+    extra: Optional[Callable[[_Ctx, Where], Any]] = None  # validação além dos dígitos (ex.: UF do título)
+
+
+def _titulo_uf(ctx: _Ctx, where: Where):
+    uf = ctx.col(8) * 10 + ctx.col(9)
+    return (uf >= 1) & (uf <= 28)
+
+
+SCHEMES: Dict[str, Scheme] = {
+    "CPF": Scheme("CPF", (11,), (
+        CheckDigit(9, tuple(range(10, 1, -1)), _mod11),
+        CheckDigit(10, tuple(range(11, 1, -1)), _mod11),
+    )),
+    "CNPJ": Scheme("CNPJ", (14,), (
+        CheckDigit(12, (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), _mod11),
+        CheckDigit(13, (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), _mod11),
+    )),
+    "PIS": Scheme("PIS", (11,), (
+        CheckDigit(10, (3, 2, 9, 8, 7, 6, 5, 4, 3, 2), _mod11),
+    )),
+    # 8 dígitos sequenciais + 2 da UF + 2 verificadores; o 2º usa a UF e o 1º verificador.
+    "TITULO_ELEITOR": Scheme("TITULO_ELEITOR", (12,), (
+        CheckDigit(10, (2, 3, 4, 5, 6, 7, 8, 9), _titulo),
+        CheckDigit(11, (0, 0, 0, 0, 0, 0, 0, 0, 7, 8, 9), _titulo),
+    ), extra=_titulo_uf),
+    "CNH": Scheme("CNH", (11,), (
+        CheckDigit(9, (9, 8, 7, 6, 5, 4, 3, 2, 1), _cnh_1),
+        CheckDigit(10, (1, 2, 3, 4, 5, 6, 7, 8, 9), _cnh_2),
+    )),
+    "CARTAO": Scheme("CARTAO", tuple(range(13, 20)), luhn=True, reject_repeated=False),
+}
+
+
+def _scalar_where(cond, a, b):
+    return a if cond else b
+
+
+def _check_digits(nums: List[int], scheme: Scheme) -> bool:
+    if len(nums) not in scheme.lengths:
         return False
-    if len(set(nums)) == 1:
+    if scheme.reject_repeated and len(set(nums)) == 1:
         return False
+    if scheme.luhn:
+        total = 0
+        for i, v in enumerate(reversed(nums)):
+            if i % 2:
+                v *= 2
+                if v > 9:
+                    v -= 9
+            total += v
+        return total % 10 == 0
+    ctx = _Ctx(nums)
+    if scheme.extra is not None and not scheme.extra(ctx, _scalar_where):
+        return False
+    for cd in scheme.checks:
+        r = sum(w * v for w, v in zip(cd.weights, nums)) % 11
+        ctx.remainders.append(r)
+        if cd.rule(r, ctx, _scalar_where) != nums[cd.position]:
+            return False
+    return True
 
-    def calc(slice_, start_weight):
-        s = sum(v * (start_weight - i) for i, v in enumerate(slice_))
-        d = (s * 10) % 11
-        return 0 if d == 10 else d
 
-    d1 = calc(nums[:9], 10)
-    if d1 != nums[9]:
-        return False
-    d2 = calc(nums[:10], 11)
-    return d2 == nums[10]
+def _check_matrix(m, scheme: Scheme):
+    """Versão NumPy de _check_digits: `m` é uma matriz n x L de dígitos (uma linha por candidato)."""
+    import numpy as np
+
+    n, length = m.shape
+    ok = np.ones(n, dtype=bool)
+    if scheme.reject_repeated:
+        ok &= (m != m[:, :1]).any(axis=1)
+    if scheme.luhn:
+        # Dobra as posições ímpares a partir da direita; 2*v - 9 quando passa de 9.
+        factor = np.where(np.arange(length)[::-1] % 2 == 1, 2, 1)
+        v = m * factor
+        v = np.where(v > 9, v - 9, v)
+        return ok & (v.sum(axis=1) % 10 == 0)
+    ctx = _Ctx(m)
+    if scheme.extra is not None:
+        ok &= scheme.extra(ctx, np.where)
+    for cd in scheme.checks:
+        w = np.asarray(cd.weights, dtype=np.int64)
+        r = (m[:, :len(w)] @ w) % 11
+        ctx.remainders.append(r)
+        ok &= cd.rule(r, ctx, np.where) == m[:, cd.position]
+    return ok
+
+
+def validate_batch(values: Sequence[str], scheme: str = "CPF"):
+    """
+    Valida muitos candidatos de uma vez; devolve um np.ndarray de bool alinhado a `values`.
+    Pontuação é ignorada (como em only_digits); tamanho fora do esquema é inválido.
+    """
+    import numpy as np
+
+    sch = SCHEMES[scheme]
+    out = np.zeros(len(values), dtype=bool)
+    if len(values) < NUMPY_MIN_BATCH:
+        for i, v in enumerate(values):
+            out[i] = _check_digits([int(d) for d in only_digits(v)], sch)
+        return out
+
+    cleaned = [only_digits(v) for v in values]
+    for length in sch.lengths:
+        idx = [i for i, c in enumerate(cleaned) if len(c) == length]
+        if not idx:
+            continue
+        joined = "".join(cleaned[i] for i in idx)
+        if joined.isascii():
+            m = (np.frombuffer(joined.encode("ascii"), dtype=np.uint8).reshape(len(idx), length) - 48).astype(np.int64)
+        else:
+            # \d também casa dígitos de outros alfabetos (ex.: árabe-índicos); int() sabe convertê-los.
+            m = np.array([[int(ch) for ch in cleaned[i]] for i in idx], dtype=np.int64)
+        out[np.asarray(idx)] = _check_matrix(m, sch)
+    return out
+
+
+def validate(value: str, scheme: str = "CPF") -> bool:
+    """Versão escalar de validate_batch (sem NumPy)."""
+    return _check_digits([int(d) for d in only_digits(value)], SCHEMES[scheme])
+
+
+def validate_cpf_mod11(cpf: str) -> bool:
+    return validate(cpf, "CPF")
+
+
+def validate_cnpj(cnpj: str) -> bool:
+    return validate(cnpj, "CNPJ")
+
+
+def validate_pis(pis: str) -> bool:
+    return validate(pis, "PIS")
+
+
+def validate_titulo_eleitor(titulo: str) -> bool:
+    return validate(titulo, "TITULO_ELEITOR")
+
+
+def validate_cnh(cnh: str) -> bool:
+    return validate(cnh, "CNH")
+
+
+def validate_luhn(number: str) -> bool:
+    return validate(number, "CARTAO")
@@ -0,0 +1,128 @@
+from __future__ import annotations
+"""Estado de um bundle (run_*/): decisão de cada linha, para que a próxima execução reprocesse só o que mudou."""
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ..reports.trail import JsonlTrailWriter, _compression_for, iter_trail
+
+STATE_FILE = "estado.jsonl.gz"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def row_key(text_digest: str, id_value: Any = None) -> str:
+    """Chave estável da linha: o valor da coluna de ID, se houver, senão o hash do conteúdo."""
+    if id_value is None or (isinstance(id_value, float) and id_value != id_value):
+        return text_digest
+    return f"id:{id_value}"
+
+
+@dataclass
+class BundleState:
+    path: str
+    fingerprint: str
+    id_column: Optional[str]
+    rows: Dict[str, Tuple[str, Dict[str, Any]]] = field(default_factory=dict)  # chave -> (hash do texto, decisão)
+
+    def lookup(self, key: str, digest: str) -> Optional[Dict[str, Any]]:
+        hit = self.rows.get(key)
+        if hit is None or hit[0] != digest:
+            return None
+        return hit[1]
+
+
+def state_path(bundle_dir: str) -> str:
+    return os.path.join(bundle_dir, STATE_FILE)
+
+
+def find_previous_bundle(bundle_dir: str) -> Optional[str]:
+    """
+    Bundle anterior para o modo incremental quando nenhum é indicado (--previous-bundle): entre os
+    diretórios irmãos de `bundle_dir` (mesmo diretório-pai, p.ex. outputs/run_*), o de estado.jsonl.gz
+    mais recente (mtime). Bundles em outro diretório-pai só entram pelo caminho explícito.
+    """
+    here = os.path.abspath(bundle_dir)
+    parent = os.path.dirname(here)
+    if not os.path.isdir(parent):
+        return None
+    best, best_mtime = None, -1.0
+    for name in os.listdir(parent):
+        cand = os.path.join(parent, name)
+        if cand == here:
+            continue
+        sp = state_path(cand)
+        if os.path.isfile(sp):
+            mtime = os.path.getmtime(sp)
+            if mtime > best_mtime:
+                best, best_mtime = cand, mtime
+    return best
+
+
+def load_state(bundle_dir: str) -> Optional[BundleState]:
+    """Estado gravado em `bundle_dir`; None se não houver ou se o arquivo não for legível."""
+    sp = state_path(bundle_dir)
+    if not os.path.isfile(sp):
+        return None
+    try:
+        records = iter_trail(sp)
+        head = next(records, None)
+        if not head or "fingerprint" not in head:
+            return None
+        state = BundleState(bundle_dir, head["fingerprint"], head.get("id_column"))
+        for rec in records:
+            state.rows[rec["key"]] = (rec["hash"], rec["decision"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return state
+
+
+class StateWriter(JsonlTrailWriter):
+    """
+    Grava o estado em <estado>.parcial e só o publica (rename) no close(). Se o bloco `with`
+    terminar com exceção, o arquivo parcial fica de fora: find_previous_bundle não o enxerga.
+    """
+
+    def __init__(self, path: str, flush_every: int = 10_000):
+        super().__init__(path + ".parcial", compression=_compression_for(path), flush_every=flush_every)
+        self._partial = self.path
+        self.path = path
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            super().close()
+
+    def close(self) -> None:
+        super().close()
+        if os.path.exists(self._partial):
+            os.replace(self._partial, self.path)
+
+
+def open_state(bundle_dir: str, fingerprint: str, id_column: Optional[str]) -> StateWriter:
+    """
+    Escritor do estado já com o cabeçalho; cada linha entra com
+    write({"key": chave, "hash": hash do texto, "decision": decisão}), à medida que é decidida.
+    """
+    os.makedirs(bundle_dir or ".", exist_ok=True)
+    w = StateWriter(state_path(bundle_dir))
+    w.write({"fingerprint": fingerprint, "id_column": id_column})
+    return w
+
+
+def write_state(
+    bundle_dir: str,
+    fingerprint: str,
+    id_column: Optional[str],
+    rows: Iterable[Tuple[str, str, Dict[str, Any]]],
+) -> str:
+    """Grava (chave, hash do texto, decisão) de cada linha; a primeira linha do arquivo é o cabeçalho."""
+    with open_state(bundle_dir, fingerprint, id_column) as w:
+        for key, digest, decision in rows:
+            w.write({"key": key, "hash": digest, "decision": decision})
+    return w.path
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, Iterator
 import pandas as pd
 import os
 
@@ -17,12 +17,72 @@ def load_table(path: str, text_col: str, label_col: Optional[str] = None) -> Loa
         df = pd.read_excel(path, engine="openpyxl")
     else:
         df = pd.read_csv(path)
-    if text_col not in df.columns:
-        raise ValueError(f"Coluna de texto '{text_col}' não encontrada. Colunas: {list(df.columns)}")
-    if label_col and label_col not in df.columns:
-        raise ValueError(f"Coluna de label '{label_col}' não encontrada. Colunas: {list(df.columns)}")
+    _check_columns(list(df.columns), text_col, label_col)
     return LoadedData(df=df, text_col=text_col, label_col=label_col)
 
+def _check_columns(columns: List[str], text_col: str, label_col: Optional[str]) -> None:
+    if text_col not in columns:
+        raise ValueError(f"Coluna de texto '{text_col}' não encontrada. Colunas: {list(columns)}")
+    if label_col and label_col not in columns:
+        raise ValueError(f"Coluna de label '{label_col}' não encontrada. Colunas: {list(columns)}")
+
+def _is_excel(path: str) -> bool:
+    return path.lower().endswith((".xlsx",".xls"))
+
+def _excel_cell(v):
+    # Mesma conversão do leitor openpyxl do pandas: vazio vira NaN e float inteiro vira int.
+    if v is None:
+        return float("nan")
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+def read_header(path: str) -> List[str]:
+    """Lê só o cabeçalho (CSV ou primeira aba do Excel), sem carregar as linhas."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    if _is_excel(path):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            first = next(wb.worksheets[0].iter_rows(max_row=1, values_only=True), ())
+        finally:
+            wb.close()
+        return [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(first)]
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def iter_table(path: str, text_col: str, label_col: Optional[str] = None, chunk_rows: int = 50_000) -> Iterator[LoadedData]:
+    """
+    Versão em blocos de load_table: valida as colunas pelo cabeçalho e entrega até `chunk_rows` linhas por vez.
+    CSV usa o leitor em chunks do pandas; Excel usa openpyxl em modo read_only, linha a linha.
+    O índice de cada bloco continua a numeração global (0..N-1), como no DataFrame inteiro.
+    """
+    columns = read_header(path)
+    _check_columns(columns, text_col, label_col)
+
+    if not _is_excel(path):
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            yield LoadedData(df=chunk, text_col=text_col, label_col=label_col)
+        return
+
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows, start = [], 0
+        for values in wb.worksheets[0].iter_rows(min_row=2, values_only=True):
+            if all(v is None for v in values):
+                continue  # pd.read_excel também descarta linhas vazias
+            values = tuple(values[:len(columns)]) + (None,) * (len(columns) - len(values))
+            rows.append(tuple(_excel_cell(v) for v in values))
+            if len(rows) >= chunk_rows:
+                yield LoadedData(pd.DataFrame(rows, columns=columns, index=range(start, start + len(rows))), text_col, label_col)
+                start += len(rows)
+                rows = []
+        if rows:
+            yield LoadedData(pd.DataFrame(rows, columns=columns, index=range(start, start + len(rows))), text_col, label_col)
+    finally:
+        wb.close()
+
 def parse_labels(series: pd.Series) -> List[int]:
     def to_int(x):
         if isinstance(x, bool): return 1 if x else 0
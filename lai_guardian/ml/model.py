@@ -1,37 +1,223 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Optional
-import joblib
-from sklearn.pipeline import Pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import pickle
+
+MODES = ("tfidf", "hashing")
+# Artefato compacto (save(compact=True)): só arrays NumPy, gravados sem compressão para que
+# joblib.load(mmap_mode="r") mapeie as páginas do arquivo e os workers as compartilhem.
+COMPACT_FORMAT = "lai_guardian.compact/1"
+_TERM_SEP = "\x00"  # não aparece em tokens do TfidfVectorizer (\w\w+ unidos por espaço)
 
 @dataclass
 class MLConfig:
     min_df: int = 2
     ngram_max: int = 2
     C: float = 4.0
+    # "tfidf": vocabulário + LogisticRegression, treino com o corpus inteiro em memória.
+    # "hashing": HashingVectorizer (sem vocabulário) + SGDClassifier com partial_fit, em blocos;
+    # a memória fica limitada a n_features coeficientes + um bloco, qualquer que seja o dataset.
+    mode: str = "tfidf"
+    n_features: int = 2 ** 20
+    alpha: float = 1e-5  # regularização do SGD (modo hashing)
+    chunk_rows: int = 50_000  # tamanho do bloco de train() no modo hashing
+
+class _CompactPipe:
+    """
+    Substitui o Pipeline num artefato compacto: vetorizador + w·x + b e sigmoide
+    (a mesma probabilidade da LogisticRegression e do SGD com log_loss).
+    """
+
+    def __init__(self, vectorizer, coef, intercept: float):
+        import numpy as np
+
+        self.vectorizer = vectorizer
+        self.coef_ = coef  # float32, possivelmente um memmap somente leitura
+        self.intercept_ = float(intercept)
+        self.classes_ = np.array([0, 1])
+
+    def decision_function(self, texts):
+        return self.vectorizer.transform(texts) @ self.coef_ + self.intercept_
+
+    def predict_proba(self, texts):
+        import numpy as np
+
+        p = 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, texts):
+        return self.classes_[(self.decision_function(texts) > 0).astype(int)]
+
 
 class TextClassifier:
     def __init__(self, config: Optional[MLConfig] = None):
+        # scikit-learn é importado aqui (e joblib em save/load) para não pesar no import do módulo.
+        from sklearn.pipeline import Pipeline
+
         self.config = config or MLConfig()
-        self.pipe = Pipeline([
-            ("tfidf", TfidfVectorizer(min_df=self.config.min_df, ngram_range=(1, self.config.ngram_max))),
-            ("clf", LogisticRegression(C=self.config.C, max_iter=2000, class_weight="balanced")),
-        ])
+        if self.config.mode not in MODES:
+            raise ValueError(f"Modo de ML inválido: {self.config.mode} (use {', '.join(MODES)})")
+        if self.config.mode == "hashing":
+            from sklearn.feature_extraction.text import HashingVectorizer
+            from sklearn.linear_model import SGDClassifier
+
+            self.pipe = Pipeline([
+                ("hash", HashingVectorizer(
+                    n_features=self.config.n_features, ngram_range=(1, self.config.ngram_max),
+                    alternate_sign=False, norm="l2",
+                )),
+                ("clf", SGDClassifier(loss="log_loss", alpha=self.config.alpha)),
+            ])
+        else:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.linear_model import LogisticRegression
+
+            self.pipe = Pipeline([
+                ("tfidf", TfidfVectorizer(min_df=self.config.min_df, ngram_range=(1, self.config.ngram_max))),
+                ("clf", LogisticRegression(C=self.config.C, max_iter=2000, class_weight="balanced")),
+            ])
+        # Contagem acumulada por classe (modo hashing): dá o peso "balanced" bloco a bloco.
+        self.class_counts = [0, 0]
+        self.compact = False  # veio de um artefato compacto (só inferência)
+        self.source: Optional[str] = None  # arquivo de origem, quando veio de load()
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def incremental(self) -> bool:
+        return self.config.mode == "hashing" and not self.compact
 
     def train(self, texts: List[str], labels: List[int]):
+        if self.compact:
+            raise ValueError("Modelo compacto é só para inferência; treine um TextClassifier novo.")
+        if self.incremental:
+            step = max(1, self.config.chunk_rows)
+            self.train_stream((texts[i:i + step], labels[i:i + step]) for i in range(0, len(texts), step))
+            return
         self.pipe.fit(texts, labels)
+        self._fingerprint = None
+
+    def partial_fit(self, texts: List[str], labels: List[int]):
+        """Atualiza o modelo com mais um bloco (só no modo hashing; serve também para continuar um modelo salvo)."""
+        if self.compact:
+            raise ValueError("Modelo compacto é só para inferência; continue o treino a partir do .joblib completo.")
+        if not self.incremental:
+            raise ValueError("partial_fit requer MLConfig(mode='hashing'); o modo tfidf só treina com fit().")
+        if not texts:
+            return
+        import numpy as np
+
+        y = np.asarray(labels, dtype=np.int64)
+        for c in (0, 1):
+            self.class_counts[c] += int((y == c).sum())
+        # class_weight="balanced" não existe no partial_fit: o mesmo peso sai das contagens acumuladas.
+        total = sum(self.class_counts)
+        weights = np.array([total / (2 * n) if n else 1.0 for n in self.class_counts])
+        X = self.pipe.named_steps["hash"].transform(texts)
+        sgd = self.pipe.named_steps["clf"]
+        if getattr(sgd, "coef_", None) is not None and not sgd.coef_.flags.writeable:
+            # Carregado com mmap: o SGD atualiza os coeficientes no lugar, então precisa de uma cópia.
+            sgd.coef_ = sgd.coef_.copy()
+            sgd.intercept_ = sgd.intercept_.copy()
+        sgd.partial_fit(X, y, classes=np.array([0, 1]), sample_weight=weights[y])
+        self._fingerprint = None
+
+    def train_stream(self, chunks: Iterable[Tuple[List[str], List[int]]]) -> int:
+        """partial_fit em cada (textos, labels) do iterável; devolve quantas linhas foram vistas."""
+        seen = 0
+        for texts, labels in chunks:
+            self.partial_fit(texts, labels)
+            seen += len(texts)
+        return seen
+
+    def fingerprint(self) -> str:
+        """Hash do modelo: do arquivo .joblib quando veio de load(), senão do pipeline serializado."""
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha256(pickle.dumps(self.pipe)).hexdigest()
+        return self._fingerprint
 
     def predict(self, texts: List[str]) -> List[int]:
         return self.pipe.predict(texts).tolist()
 
-    def save(self, path: str):
-        joblib.dump({"config": self.config, "pipe": self.pipe}, path)
+    def predict_proba(self, texts: List[str]) -> List[float]:
+        """Probabilidade da classe positiva (1) para cada texto, numa única passada pelo pipeline."""
+        proba = self.pipe.predict_proba(texts)
+        col = list(self.pipe.classes_).index(1) if 1 in self.pipe.classes_ else None
+        return [0.0] * len(texts) if col is None else proba[:, col].tolist()
+
+    def save(self, path: str, compact: bool = False, prune: float = 0.0):
+        """
+        Grava o modelo. Com `compact`, grava só os arrays de inferência (coeficientes em float32;
+        no modo tfidf, o vocabulário sem os termos com |peso| <= `prune`). O artefato compacto não
+        continua treino. Podar muda a norma L2 do vetor TF-IDF, então as probabilidades mudam um pouco.
+        """
+        import joblib
+        if compact:
+            joblib.dump(self._compact_state(prune), path)
+            return
+        joblib.dump({"config": self.config, "pipe": self.pipe, "class_counts": self.class_counts}, path)
+
+    def _compact_state(self, prune: float) -> Dict[str, Any]:
+        import numpy as np
+
+        clf = self.pipe.steps[-1][1]
+        coef = np.asarray(clf.coef_, dtype=np.float64).ravel()
+        state: Dict[str, Any] = {
+            "format": COMPACT_FORMAT,
+            "config": self.config,
+            "class_counts": list(self.class_counts),
+            "intercept": float(np.ravel(clf.intercept_)[0]),
+        }
+        if self.config.mode == "hashing":
+            # Sem vocabulário: o vetor denso inteiro fica mapeado e compartilhado entre processos.
+            state["coef"] = coef.astype(np.float32)
+            return state
+        vec = self.pipe.named_steps["tfidf"]
+        terms = np.empty(len(vec.vocabulary_), dtype=object)
+        for term, j in vec.vocabulary_.items():
+            terms[j] = term
+        keep = np.flatnonzero(np.abs(coef) > prune)
+        state["coef"] = coef[keep].astype(np.float32)
+        state["idf"] = np.asarray(vec.idf_, dtype=np.float32)[keep]
+        # Termos num único bloco de bytes (array uint8, mapeável) em vez de um dict pickled.
+        state["terms"] = np.frombuffer(_TERM_SEP.join(terms[keep]).encode("utf-8"), dtype=np.uint8)
+        return state
+
+    @classmethod
+    def _from_compact(cls, obj: Dict[str, Any]) -> "TextClassifier":
+        inst = cls(obj["config"])
+        inst.compact = True
+        inst.class_counts = list(obj.get("class_counts", [0, 0]))
+        if inst.config.mode == "hashing":
+            vec = inst.pipe.named_steps["hash"]
+        else:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            blob = bytes(obj["terms"]).decode("utf-8")
+            terms = blob.split(_TERM_SEP) if blob else []
+            vec = TfidfVectorizer(ngram_range=(1, inst.config.ngram_max), vocabulary={t: j for j, t in enumerate(terms)})
+            vec.idf_ = obj["idf"]
+        inst.pipe = _CompactPipe(vec, obj["coef"], obj["intercept"])
+        return inst
 
     @classmethod
-    def load(cls, path: str) -> "TextClassifier":
-        obj = joblib.load(path)
-        inst = cls(obj.get("config"))
-        inst.pipe = obj["pipe"]
+    def load(cls, path: str, mmap: bool = False) -> "TextClassifier":
+        """
+        Carrega um .joblib completo ou compacto. Com `mmap`, os arrays vêm mapeados do arquivo
+        (somente leitura, páginas compartilhadas entre processos); é o que ml.registry.load_model() usa.
+        """
+        import joblib
+        obj = joblib.load(path, mmap_mode="r" if mmap else None)
+        if obj.get("format") == COMPACT_FORMAT:
+            inst = cls._from_compact(obj)
+        else:
+            inst = cls(obj.get("config"))
+            inst.pipe = obj["pipe"]
+            inst.class_counts = list(obj.get("class_counts", [0, 0]))
+        inst.source = path
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        inst._fingerprint = h.hexdigest()
         return inst
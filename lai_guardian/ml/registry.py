@@ -0,0 +1,79 @@
+from __future__ import annotations
+"""
+Registro de modelos do processo: cada arquivo .joblib é carregado uma vez e reaproveitado.
+
+A chave é (caminho real, mtime, tamanho); regravar o arquivo gera outra chave e o modelo antigo
+sai do registro. Dois caminhos com o mesmo conteúdo (mesmo hash) devolvem o mesmo objeto.
+Nos workers do motor, o modelo chega como referência (caminho + hash) e é carregado daqui,
+com os arrays mapeados do arquivo: as páginas ficam compartilhadas entre os processos.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from .model import TextClassifier
+
+_Key = Tuple[str, int, int]
+
+_LOCK = threading.Lock()
+_BY_KEY: Dict[_Key, TextClassifier] = {}
+_BY_HASH: Dict[str, TextClassifier] = {}
+_KEY_BY_PATH: Dict[str, _Key] = {}
+
+
+def _key(path: str) -> _Key:
+    real = os.path.realpath(path)
+    st = os.stat(real)
+    return real, st.st_mtime_ns, st.st_size
+
+
+def load_model(path: str, expected_hash: Optional[str] = None) -> TextClassifier:
+    """
+    Modelo de `path`, carregado (com mmap) só na primeira chamada do processo.
+    Com `expected_hash`, falha se o arquivo não for mais o mesmo modelo (RuntimeError).
+    """
+    key = _key(path)
+    with _LOCK:
+        model = _BY_KEY.get(key)
+        if model is None:
+            loaded = TextClassifier.load(path, mmap=True)
+            model = _BY_HASH.setdefault(loaded.fingerprint(), loaded)
+            old = _KEY_BY_PATH.get(key[0])
+            if old is not None and old != key:
+                _forget(old)
+            _BY_KEY[key] = model
+            _KEY_BY_PATH[key[0]] = key
+    if expected_hash is not None and model.fingerprint() != expected_hash:
+        raise RuntimeError(f"Modelo em {path} mudou desde que foi carregado (hash diferente).")
+    return model
+
+
+def _forget(key: _Key) -> None:
+    model = _BY_KEY.pop(key, None)
+    if model is not None and model not in _BY_KEY.values():
+        _BY_HASH.pop(model.fingerprint(), None)
+
+
+def model_ref(model: Optional[TextClassifier]) -> Optional[Tuple[str, str]]:
+    """
+    (caminho, hash) de um modelo carregado por load_model() cujo arquivo não mudou desde então;
+    None nos outros casos (ex.: treinado em memória), em que o modelo precisa ir inteiro.
+    """
+    if model is None or model.source is None:
+        return None
+    try:
+        key = _key(model.source)
+    except OSError:
+        return None
+    with _LOCK:
+        if _BY_KEY.get(key) is not model:
+            return None
+    return model.source, model.fingerprint()
+
+
+def clear() -> None:
+    with _LOCK:
+        _BY_KEY.clear()
+        _BY_HASH.clear()
+        _KEY_BY_PATH.clear()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+"""Treino em blocos (modo hashing): lê o CSV/Excel aos pedaços e chama partial_fit, sem carregar o dataset."""
+from typing import Callable, Optional
+
+from ..io.loader import iter_table, parse_labels
+from .model import TextClassifier
+
+
+def train_from_table(
+    clf: TextClassifier,
+    path: str,
+    text_col: str,
+    label_col: str,
+    chunk_rows: int = 50_000,
+    epochs: int = 1,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Passa `epochs` vezes pelo arquivo, `chunk_rows` linhas por vez. A memória fica em um bloco +
+    os coeficientes do modelo. `clf` pode ser um modelo salvo (continua de onde parou).
+    Devolve o total de linhas vistas (somando as épocas).
+    """
+    if not clf.incremental:
+        raise ValueError("Treino em blocos requer um modelo no modo hashing.")
+    seen = 0
+    for _ in range(max(1, epochs)):
+        for chunk in iter_table(path, text_col, label_col=label_col, chunk_rows=chunk_rows):
+            df = chunk.df
+            clf.partial_fit(df[text_col].astype(str).tolist(), parse_labels(df[label_col]))
+            seen += len(df)
+            if progress:
+                progress(len(df))
+    return seen
@@ -0,0 +1,164 @@
+from __future__ import annotations
+"""
+Busca de hiperparâmetros do modo tfidf (min_df, ngram_max, C) e do limiar do backstop, com validação cruzada.
+
+A tokenização é o passo caro, então é feita uma vez por (fold, ngram_max): a contagem com min_df=1
+serve a todos os min_df (basta descartar as colunas com frequência de documento menor, o que dá a
+mesma matriz do TfidfVectorizer(min_df=k)), e a mesma matriz TF-IDF serve a todos os C.
+Os limiares não custam treino: saem das probabilidades do fold de validação.
+As tarefas (fold, ngram_max) rodam em paralelo com joblib (n_jobs).
+"""
+
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .model import MLConfig
+
+COUNT_COLUMNS = ("vp", "fp", "fn", "vn")
+
+
+@dataclass
+class SearchSpace:
+    min_df: Tuple[int, ...] = (1, 2, 3)
+    ngram_max: Tuple[int, ...] = (1, 2)
+    C: Tuple[float, ...] = (0.5, 1.0, 2.0, 4.0, 8.0)
+    thresholds: Tuple[float, ...] = tuple(round(0.05 * i, 2) for i in range(2, 19))  # 0.10 .. 0.90
+
+    def size(self) -> int:
+        return len(self.min_df) * len(self.ngram_max) * len(self.C)
+
+
+@dataclass
+class TuneResult:
+    config: MLConfig
+    threshold: float
+    score: float
+    beta: float
+    folds: int
+    table: Any = field(repr=False)  # pandas.DataFrame, uma linha por (config, limiar)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "config": asdict(self.config),
+            "threshold": self.threshold,
+            "score": self.score,
+            "beta": self.beta,
+            "folds": self.folds,
+            "candidates": int(len(self.table)),
+        }
+
+
+def _f_beta(vp, fp, fn, beta: float):
+    import numpy as np
+
+    b2 = beta * beta
+    den = (1 + b2) * vp + b2 * fn + fp
+    return np.where(den > 0, (1 + b2) * vp / np.maximum(den, 1), 0.0)
+
+
+def _fold_task(
+    fold: int, train_texts: List[str], y_train, val_texts: List[str], y_val, ngram_max: int, space: SearchSpace,
+) -> List[Dict[str, Any]]:
+    import numpy as np
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+    from sklearn.linear_model import LogisticRegression
+
+    counter = CountVectorizer(ngram_range=(1, ngram_max))
+    counts_tr = counter.fit_transform(train_texts)
+    counts_val = counter.transform(val_texts)
+    doc_freq = np.asarray((counts_tr > 0).sum(axis=0)).ravel()
+    th = np.asarray(space.thresholds, dtype=np.float64)
+    pos = np.asarray(y_val, dtype=bool)[:, None]
+
+    rows: List[Dict[str, Any]] = []
+    for min_df in space.min_df:
+        keep = np.flatnonzero(doc_freq >= min_df)
+        tfidf = TfidfTransformer()
+        X_tr = tfidf.fit_transform(counts_tr[:, keep])
+        X_val = tfidf.transform(counts_val[:, keep])
+        for C in space.C:
+            clf = LogisticRegression(C=C, max_iter=2000, class_weight="balanced").fit(X_tr, y_train)
+            proba = clf.predict_proba(X_val)[:, list(clf.classes_).index(1)]
+            pred = proba[:, None] >= th[None, :]
+            vp = (pred & pos).sum(axis=0)
+            fp = (pred & ~pos).sum(axis=0)
+            fn = (~pred & pos).sum(axis=0)
+            vn = (~pred & ~pos).sum(axis=0)
+            for j, t in enumerate(space.thresholds):
+                rows.append({
+                    "fold": fold, "min_df": min_df, "ngram_max": ngram_max, "C": C, "threshold": t,
+                    "vp": int(vp[j]), "fp": int(fp[j]), "fn": int(fn[j]), "vn": int(vn[j]),
+                })
+    return rows
+
+
+def tune(
+    texts: Sequence[str],
+    labels: Sequence[int],
+    space: Optional[SearchSpace] = None,
+    folds: int = 5,
+    n_jobs: int = 1,
+    beta: float = 1.0,
+    seed: int = 0,
+    progress: Optional[Callable[[int], None]] = None,
+) -> TuneResult:
+    """
+    Validação cruzada estratificada sobre todas as combinações de `space`; o melhor candidato
+    maximiza o F-beta com as contagens somadas dos folds (beta > 1 favorece recall).
+    `progress` recebe quantos candidatos×folds cada tarefa concluída avaliou.
+    """
+    import numpy as np
+    import pandas as pd
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import StratifiedKFold
+
+    space = space or SearchSpace()
+    texts = list(texts)
+    y = np.asarray(labels, dtype=np.int64)
+    if len(set(y.tolist())) < 2:
+        raise ValueError("A busca precisa de exemplos das duas classes (0 e 1).")
+
+    splits = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(np.zeros(len(y)), y)
+    tasks = []
+    for fold, (tr, val) in enumerate(splits):
+        train_texts, val_texts = [texts[i] for i in tr], [texts[i] for i in val]
+        for ngram_max in space.ngram_max:
+            tasks.append(delayed(_fold_task)(fold, train_texts, y[tr], val_texts, y[val], ngram_max, space))
+
+    per_task = len(space.min_df) * len(space.C)
+    rows: List[Dict[str, Any]] = []
+    for chunk in Parallel(n_jobs=n_jobs, return_as="generator_unordered")(tasks):
+        rows.extend(chunk)
+        if progress:
+            progress(per_task)
+
+    by_fold = pd.DataFrame(rows)
+    keys = ["min_df", "ngram_max", "C", "threshold"]
+    by_fold["score"] = _f_beta(by_fold["vp"], by_fold["fp"], by_fold["fn"], beta)
+    table = by_fold.groupby(keys, sort=True).agg(
+        **{c: (c, "sum") for c in COUNT_COLUMNS}, score_std=("score", "std"),
+    ).reset_index()
+    vp, fp, fn = table["vp"], table["fp"], table["fn"]
+    table["precision"] = np.where(vp + fp > 0, vp / (vp + fp).clip(lower=1), 0.0)
+    table["recall"] = np.where(vp + fn > 0, vp / (vp + fn).clip(lower=1), 0.0)
+    table["score"] = _f_beta(vp, fp, fn, beta)
+    # Empate: o menor C (mais regularizado), o menor ngram e o limiar mais próximo de 0.5.
+    table["_dist"] = (table["threshold"] - 0.5).abs()
+    table = table.sort_values(["score", "C", "ngram_max", "_dist"], ascending=[False, True, True, True], kind="stable")
+    table = table.drop(columns="_dist").reset_index(drop=True)
+
+    best = table.iloc[0]
+    config = replace(MLConfig(), min_df=int(best["min_df"]), ngram_max=int(best["ngram_max"]), C=float(best["C"]))
+    return TuneResult(config, float(best["threshold"]), float(best["score"]), beta, folds, table)
+
+
+def write_results(result: TuneResult, json_path: str, table_path: str) -> None:
+    """Melhor configuração (JSON) e a tabela completa de candidatos (CSV, ordenada do melhor ao pior)."""
+    import json
+    import os
+
+    for path in (json_path, table_path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+    result.table.to_csv(table_path, index=False)
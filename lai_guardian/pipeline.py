@@ -2,17 +2,26 @@ from __future__ import annotations
 """Pipeline completo do projeto (auditoria, anonimização, treino e avaliação). Usado por run.py e pelo CLI."""
 
 import os
-import json
 import time
+import datetime
 from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+import pandas as pd
 
 from .ui.render import console, header, kpis, confusion, spinner_progress
-from .io.loader import load_table, parse_labels
+from .io.loader import iter_table, load_table, parse_labels, read_header
 from .core.engine import GuardianEngine
-from .core.metrics import calculate, to_dict
-from .reports.excel import export_excel
+from .core.cache import ResultCache, engine_fingerprint
+from .core.columnar import add_audit_columns, findings_frame
+from .core.engine import decision_to_record, decision_from_record
+from .io.bundle import STATE_FILE, find_previous_bundle, load_state, open_state, row_key, text_hash
+from .core.metrics import calculate, to_dict, update_metrics_file
+from .reports.excel import ExcelAuditWriter
+from .reports.trail import open_trail
+from .reports.findings import write_findings
 from .ml.model import TextClassifier
+from .ml.registry import load_model
 
 
 @dataclass
@@ -23,7 +32,10 @@ class FullPipelineConfig:
 
     # Saídas (auditoria/anonimização)
     excel_out: str = "data/processed/auditoria.xlsx"
-    json_out: str = "data/processed/relatorio.json"
+    excel_shard_rows: int = 0  # divide a auditoria a cada N linhas (0 = só no limite da aba)
+    excel_shard_files: bool = False  # uma planilha por parte (em paralelo, `workers`) + índice em excel_out
+    json_out: str = "data/processed/relatorio.jsonl.gz"
+    findings_out: Optional[str] = None  # .parquet ou .arrow (requer pyarrow, extra "arrow"); None desliga
 
     # ML (treino/avaliação)
     train_csv: Optional[str] = None
@@ -37,9 +49,34 @@ class FullPipelineConfig:
     model_path: str = "data/processed/model.joblib"
     metrics_out: str = "data/processed/metrics.json"
 
+    # Busca de hiperparâmetros antes do treino (ml/tune.py); o treino usa a melhor configuração
+    tune: bool = False
+    tune_folds: int = 5
+    tune_jobs: int = 1  # processos da busca (-1 = todos os núcleos)
+    tune_out: str = "data/processed/tuning.json"
+    tune_table_out: str = "data/processed/tuning.csv"
+
     # Execução
     no_ner: bool = False
     strict: bool = False
+    ner_batch_size: int = 64  # textos por lote no nlp.pipe
+    workers: int = 1  # processos na auditoria (0 = todos os núcleos)
+    chunk_size: int = 256  # linhas por bloco enviado a cada worker
+    chunk_rows: int = 50_000  # linhas por bloco da tabela (a trilha é gravada a cada bloco concluído)
+    overlap_policy: str = "longest"  # tarja de achados sobrepostos: longest | risk | union
+    cache_path: Optional[str] = None  # SQLite de decisões já calculadas (fica fora do bundle, vale entre execuções)
+    columnar: bool = False  # regras vetorizadas sobre a coluna inteira (core/columnar.py)
+    # Probabilidade mínima do backstop de ML; None = 0.5, ou o limiar achado pela busca (tune).
+    ml_threshold: Optional[float] = None
+    regex_backend: str = "auto"  # auto | re | re2 | hyperscan (core/regex_backend.py)
+
+    # Reauditoria incremental: reaproveita as linhas que não mudaram desde o bundle anterior
+    incremental: bool = False
+    previous_bundle: Optional[str] = None  # se vazio, usa o bundle irmão mais recente (find_previous_bundle)
+    id_column: Optional[str] = None  # chave das linhas; sem ela, o hash do texto
+
+    # Diagnóstico: contadores e tempos por família de regra (vão para o summary e o metrics.json)
+    profile_rules: bool = False
 
     # Organização
     bundle_dir: Optional[str] = None  # se definido, salva tudo dentro deste diretório
@@ -61,8 +98,12 @@ def _apply_bundle(cfg: FullPipelineConfig) -> FullPipelineConfig:
 
     cfg.excel_out = join(cfg.excel_out)
     cfg.json_out = join(cfg.json_out)
+    if cfg.findings_out:
+        cfg.findings_out = join(cfg.findings_out)
     cfg.model_path = join(cfg.model_path)
     cfg.metrics_out = join(cfg.metrics_out)
+    cfg.tune_out = join(cfg.tune_out)
+    cfg.tune_table_out = join(cfg.tune_table_out)
     return cfg
 
 
@@ -93,7 +134,7 @@ def run_full_pipeline(cfg: FullPipelineConfig) -> Dict[str, Any]:
     ml_model = None
     if cfg.model_path and os.path.exists(cfg.model_path):
         try:
-            ml_model = TextClassifier.load(cfg.model_path)
+            ml_model = load_model(cfg.model_path)
             summary["warnings"].append(f"Modelo existente carregado: {cfg.model_path}")
         except Exception as e:
             msg = f"Falha ao carregar modelo existente ({cfg.model_path}): {e}"
@@ -101,59 +142,174 @@ def run_full_pipeline(cfg: FullPipelineConfig) -> Dict[str, Any]:
                 raise RuntimeError(msg)
             summary["warnings"].append(msg)
 
-    engine = GuardianEngine(use_ner=not cfg.no_ner, ml_model=ml_model)
+    engine = GuardianEngine(
+        use_ner=not cfg.no_ner,
+        ml_model=ml_model,
+        ner_batch_size=cfg.ner_batch_size,
+        overlap_policy=cfg.overlap_policy,
+        cache=ResultCache(cfg.cache_path) if cfg.cache_path else None,
+        profile_rules=cfg.profile_rules,
+        columnar=cfg.columnar,
+        ml_threshold=0.5 if cfg.ml_threshold is None else cfg.ml_threshold,
+        regex_backend=cfg.regex_backend,
+    )
 
     # --- Etapas 1 e 2 ---
     if cfg.input_path:
-        data = load_table(cfg.input_path, cfg.input_column, label_col=None)
-        df = data.df.copy()
-        texts = df[data.text_col].astype(str).tolist()
-
-        console.print(f"✔ Fonte: [bold]{cfg.input_path}[/bold] | Registros: [bold]{len(df)}[/bold]", style="muted")
-
-        json_rows = []
-        with spinner_progress("Processando auditoria + versão publicável...") as prog:
-            task = prog.add_task("Processando auditoria + versão publicável...", total=max(1, len(texts)))
-            flags, reasons, redacted = [], [], []
-            types_detected, max_risk, findings_count = [], [], []
-            for idx, t in enumerate(texts):
-                dec = engine.analyze(t, redact=True)
-                flags.append(dec.contains_pii)
-                reasons.append(dec.reason)
-                redacted.append(dec.redacted_text)
-                types_detected.append(getattr(dec, 'types_detected', ''))
-                max_risk.append(getattr(dec, 'max_risk', ''))
-                findings_count.append(int(getattr(dec, 'findings_count', 0)))
-                if dec.contains_pii:
-                    json_rows.append({
-                        "row": int(idx),
-                        "reason": dec.reason,
-                        "findings_count": dec.findings_count,
-                        "findings": dec.findings,
-                        "public_text": dec.redacted_text,
-                    })
-                prog.update(task, advance=1)
-
-        df["Contem_Dados_Pessoais"] = flags
-        df["Motivo"] = reasons
-        df["Versao_Publicavel"] = redacted
-        df["Tipos_Detectados"] = types_detected
-        df["Risco_Max"] = max_risk
-        df["Qtd_Achados"] = findings_count
+        columns = read_header(cfg.input_path)
+        if cfg.id_column and cfg.id_column not in columns:
+            raise ValueError(f"Coluna de ID '{cfg.id_column}' não encontrada. Colunas: {list(columns)}")
+        console.print(
+            f"✔ Fonte: [bold]{cfg.input_path}[/bold] (leitura em blocos de {cfg.chunk_rows} linhas)", style="muted",
+        )
+
+        out_dir = os.path.dirname(cfg.excel_out) or "."
+        fingerprint = engine_fingerprint(engine)
+
+        previous = None
+        if cfg.incremental:
+            prev_dir = cfg.previous_bundle or find_previous_bundle(out_dir)
+            previous = load_state(prev_dir) if prev_dir else None
+            if previous is None:
+                where = cfg.previous_bundle or f"bundles irmãos de {os.path.abspath(out_dir)}"
+                msg = f"Modo incremental: nenhum estado anterior legível ({STATE_FILE}) em {where}; processando tudo."
+                if cfg.strict:
+                    raise RuntimeError(msg)
+                summary["warnings"].append(msg)
+            elif previous.fingerprint != fingerprint or previous.id_column != cfg.id_column:
+                summary["warnings"].append(
+                    f"Modo incremental: regras/modelo/chave mudaram desde {previous.path}; processando tudo."
+                )
+                previous = None
+
+        # A tabela é lida, analisada e gravada bloco a bloco (iter_table): trilha, estado e Excel
+        # recebem cada bloco assim que as decisões dele voltam, e só o bloco atual fica em memória.
+        # `pending` guarda o contexto do bloco entregue ao motor: (df, chaves, hashes, decisões, a analisar).
+        pending: List[Any] = []
+        findings_parts: List[Any] = []
+        ids: List[Any] = []
+        n_rows = n_analyzed = 0
 
+        _ensure_dir(cfg.json_out)
         _ensure_dir(cfg.excel_out)
-        export_excel(df, cfg.excel_out)
+        with spinner_progress("Processando auditoria + versão publicável...") as prog, \
+                open_trail(cfg.json_out) as trail, \
+                open_state(out_dir, fingerprint, cfg.id_column) as state, \
+                ExcelAuditWriter(
+                    cfg.excel_out, shard_rows=cfg.excel_shard_rows, shard_files=cfg.excel_shard_files,
+                    workers=cfg.workers,
+                ) as xls:
+            task = prog.add_task("Processando auditoria + versão publicável...", total=None)
+
+            def tables():
+                for chunk in iter_table(cfg.input_path, cfg.input_column, chunk_rows=cfg.chunk_rows):
+                    df = chunk.df
+                    texts = df[chunk.text_col].astype(str).tolist()
+                    digests = [text_hash(t) for t in texts]
+                    if cfg.id_column:
+                        keys = [row_key(h, v) for h, v in zip(digests, df[cfg.id_column].tolist())]
+                    else:
+                        keys = list(digests)
+                    decisions: List[Any] = [None] * len(texts)
+                    if previous is not None:
+                        now = datetime.datetime.now().isoformat()
+                        for i, (k, h) in enumerate(zip(keys, digests)):
+                            rec = previous.lookup(k, h)
+                            if rec is not None:
+                                decisions[i] = decision_from_record(rec, now)
+                    todo = [i for i, d in enumerate(decisions) if d is None]
+                    prog.update(task, advance=len(texts) - len(todo))
+                    pending.append((df, keys, digests, decisions, todo))
+                    yield [texts[i] for i in todo]
+
+            # Um só pool de workers atende todos os blocos.
+            for fresh in engine.analyze_stream(
+                tables(), workers=cfg.workers, chunk_size=cfg.chunk_size, redact=True,
+                progress=lambda n: prog.update(task, advance=n),
+            ):
+                df, keys, digests, decisions, todo = pending.pop(0)
+                for i, dec in zip(todo, fresh):
+                    decisions[i] = dec
+                for i, dec in enumerate(decisions):
+                    if dec.contains_pii:
+                        trail.write({
+                            "row": n_rows + i,
+                            "reason": dec.reason,
+                            "findings_count": dec.findings_count,
+                            "findings": dec.findings,
+                            "public_text": dec.redacted_text,
+                        })
+                    state.write({"key": keys[i], "hash": digests[i], "decision": decision_to_record(dec)})
+
+                # Colunas de resumo derivadas da tabela longa de achados (groupby), inclusive para linhas reaproveitadas.
+                findings = findings_frame(decisions)
+                xls.write(add_audit_columns(df, decisions, engine.ml_model is not None, findings))
+                if cfg.findings_out:
+                    # Só os achados (e o ID de cada linha) seguem acumulados para o arquivo colunar.
+                    findings["row"] += n_rows
+                    findings_parts.append(findings)
+                    if cfg.id_column:
+                        ids.extend(df[cfg.id_column].tolist())
+                n_rows += len(df)
+                n_analyzed += len(todo)
+
+            if not n_rows:
+                xls.write(add_audit_columns(pd.DataFrame(columns=columns), [], engine.ml_model is not None))
+            prog.update(task, total=max(1, n_rows), completed=max(1, n_rows))
+
+        console.print(f"✔ Registros auditados: [bold]{n_rows}[/bold]", style="muted")
+        written = xls.written
         summary["steps"]["audit_excel"] = True
         summary["outputs"]["excel"] = cfg.excel_out
+        if len(written) > 1:
+            summary["outputs"]["excel_shards"] = written[1:]
         console.print(f"✅ Excel gerado: [underline yellow]{cfg.excel_out}[/underline yellow]", style="success")
 
-        _ensure_dir(cfg.json_out)
-        with open(cfg.json_out, "w", encoding="utf-8") as f:
-            json.dump(json_rows, f, ensure_ascii=False, indent=2)
         summary["steps"]["anonymize_json"] = True
         summary["outputs"]["json"] = cfg.json_out
         console.print(f"✅ Relatório JSON: [underline yellow]{cfg.json_out}[/underline yellow]", style="success")
 
+        if cfg.findings_out:
+            findings = pd.concat(findings_parts, ignore_index=True) if findings_parts else findings_frame([])
+            try:
+                write_findings(
+                    findings, cfg.findings_out,
+                    meta={"input": cfg.input_path, "fingerprint": fingerprint, "id_column": cfg.id_column},
+                    ids=ids if cfg.id_column else None,
+                )
+                summary["outputs"]["findings"] = cfg.findings_out
+                console.print(f"✅ Achados (colunar): [underline yellow]{cfg.findings_out}[/underline yellow]", style="success")
+            except RuntimeError as e:
+                if cfg.strict:
+                    raise
+                summary["warnings"].append(f"Achados em formato colunar não gravados: {e}")
+                console.print(f"⚠️ Achados em formato colunar não gravados: {e}", style="warning")
+
+        summary["outputs"]["state"] = state.path
+        if cfg.incremental:
+            reused = n_rows - n_analyzed
+            summary["incremental"] = {
+                "previous_bundle": previous.path if previous is not None else None,
+                "reused_rows": reused,
+                "analyzed_rows": n_analyzed,
+            }
+            console.print(f"✔ Incremental: {reused} linhas reaproveitadas, {n_analyzed} analisadas.", style="muted")
+
+        if engine.cache is not None:
+            summary["cache"] = engine.cache.stats()
+            console.print(
+                f"✔ Cache: {engine.cache.hits} reaproveitados, {engine.cache.misses} calculados ({cfg.cache_path})",
+                style="muted",
+            )
+
+        if engine.detector.profile is not None:
+            summary["detector_profile"] = prof = engine.detector.profile.to_dict()
+            top = sorted(prof["families"].items(), key=lambda kv: -kv[1]["seconds"])[:3]
+            console.print(
+                "✔ Perfil das regras (mais lentas): " + ", ".join(f"{k} {v['seconds']:.3f}s" for k, v in top),
+                style="muted",
+            )
+
     else:
         msg = "Etapas 1/2 puladas: nenhum --input informado."
         if cfg.strict:
@@ -169,7 +325,30 @@ def run_full_pipeline(cfg: FullPipelineConfig) -> Dict[str, Any]:
         y = parse_labels(df[data.label_col])
         X = df[data.text_col].astype(str).tolist()
 
-        trained_model = TextClassifier()
+        ml_config = None
+        if cfg.tune:
+            from .ml.tune import SearchSpace, tune, write_results
+
+            space = SearchSpace()
+            with spinner_progress("Buscando hiperparâmetros (validação cruzada)...") as prog:
+                task = prog.add_task("Buscando hiperparâmetros (validação cruzada)...", total=space.size() * cfg.tune_folds)
+                result = tune(X, y, space, folds=cfg.tune_folds, n_jobs=cfg.tune_jobs,
+                              progress=lambda n: prog.update(task, advance=n))
+            write_results(result, cfg.tune_out, cfg.tune_table_out)
+            ml_config = result.config
+            if cfg.ml_threshold is None:
+                # O limiar da busca passa a valer para o modelo treinado aqui (backstop e avaliação).
+                engine.ml_threshold = result.threshold
+            summary["tuning"] = result.to_dict()
+            summary["outputs"]["tuning"] = cfg.tune_out
+            summary["outputs"]["tuning_table"] = cfg.tune_table_out
+            console.print(
+                f"✅ Melhor configuração: min_df={ml_config.min_df}, ngram_max={ml_config.ngram_max}, C={ml_config.C}, "
+                f"limiar={result.threshold} (F={result.score:.4f})",
+                style="success",
+            )
+
+        trained_model = TextClassifier(ml_config)
         with spinner_progress("Treinando modelo ML (TF-IDF + LogReg)...") as prog:
             task = prog.add_task("Treinando modelo ML (TF-IDF + LogReg)...", total=100)
             for _ in range(20):
@@ -192,7 +371,7 @@ def run_full_pipeline(cfg: FullPipelineConfig) -> Dict[str, Any]:
         model_for_eval = trained_model
         if model_for_eval is None and cfg.model_path and os.path.exists(cfg.model_path):
             try:
-                model_for_eval = TextClassifier.load(cfg.model_path)
+                model_for_eval = load_model(cfg.model_path)  # o mesmo objeto do backstop, se já carregado
             except Exception as e:
                 msg = f"Não foi possível carregar modelo para avaliação: {e}"
                 if cfg.strict:
@@ -217,16 +396,19 @@ def run_full_pipeline(cfg: FullPipelineConfig) -> Dict[str, Any]:
                 y_pred = []
                 for i in range(0, len(X), 256):
                     batch = X[i:i+256]
-                    y_pred.extend(model_for_eval.predict(batch))
+                    # Mesmo limiar do backstop (--ml-threshold ou o da busca).
+                    y_pred.extend(int(p >= engine.ml_threshold) for p in model_for_eval.predict_proba(batch))
                     prog.update(task, advance=len(batch))
 
             m = calculate(y_true, y_pred)
             kpis(m.precision, m.recall, m.f1, m.fn)
             confusion(m.vn, m.fp, m.fn, m.vp)
 
-            _ensure_dir(cfg.metrics_out)
-            with open(cfg.metrics_out, "w", encoding="utf-8") as f:
-                json.dump(to_dict(m), f, ensure_ascii=False, indent=2)
+            metrics = to_dict(m)
+            metrics["ml_threshold"] = engine.ml_threshold
+            if "detector_profile" in summary:
+                metrics["detector_profile"] = summary["detector_profile"]
+            update_metrics_file(cfg.metrics_out, metrics)
 
             summary["steps"]["evaluate_ml"] = True
             summary["outputs"]["metrics"] = cfg.metrics_out
@@ -234,6 +416,11 @@ def run_full_pipeline(cfg: FullPipelineConfig) -> Dict[str, Any]:
     else:
         summary["warnings"].append("Etapa 4 (avaliação) pulada: nenhum --eval-csv informado.")
 
+    if "detector_profile" in summary and not summary["steps"]["evaluate_ml"]:
+        # Sem avaliação o metrics.json não seria gravado; o perfil das regras entra sozinho.
+        update_metrics_file(cfg.metrics_out, {"detector_profile": summary["detector_profile"]})
+        summary["outputs"]["metrics"] = cfg.metrics_out
+
     console.print("\n[success]🏁 FULL PIPELINE CONCLUÍDO[/success]")
     if summary["warnings"]:
         console.print(f"[warning]⚠️ Avisos: {len(summary['warnings'])}[/warning]")
@@ -2,10 +2,14 @@ from __future__ import annotations
 """Exportador de Excel em padrão institucional (resumo + auditoria), com formatação voltada a leitura e controle."""
 
 import datetime
-from typing import Dict
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import pandas as pd
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.formatting.rule import FormulaRule
 from openpyxl.utils import get_column_letter
 
@@ -28,6 +32,13 @@ RISK_COLOR = {
 THIN = Side(style="thin", color=CGDF_GRAY_DARK)
 BORDER = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
 
+# Acima disso, export_excel troca para o modo streaming (write-only, memória constante).
+STREAMING_MIN_ROWS = 50_000
+# Limite de linhas de uma aba xlsx (cabeçalho incluído); acima dele a auditoria é dividida em partes.
+MAX_SHEET_ROWS = 1_048_576
+
+WIDE_TEXT_COLUMNS = ("Texto_Analise", "Texto Mascarado", "Versao_Publicavel")
+
 
 def _style_header(ws, ncols: int) -> None:
     fill = PatternFill("solid", fgColor=CGDF_BLUE)
@@ -76,6 +87,8 @@ def _auto_width(ws, max_rows_scan: int = 2000) -> None:
 
 
 def _add_conditional_formatting(ws, header_map: Dict[str, int], nrows: int) -> None:
+    if nrows < 2:
+        return  # só cabeçalho: não há intervalo de linhas para formatar
     # Contém dados pessoais: verde (False) / vermelho (True)
     if "Contem_Dados_Pessoais" in header_map:
         col = get_column_letter(header_map["Contem_Dados_Pessoais"])
@@ -181,7 +194,21 @@ def _create_summary_sheet(wb, df: pd.DataFrame, sheet_name: str = "resumo") -> N
     ws.freeze_panes = "A5"
 
 
-def export_excel(df: pd.DataFrame, path: str) -> None:
+def _shard_limit(shard_rows: Optional[int]) -> int:
+    limit = MAX_SHEET_ROWS - 1
+    if shard_rows is not None and shard_rows < 0:
+        raise ValueError(f"shard_rows deve ser positivo (0 = só no limite da aba): {shard_rows}")
+    return min(shard_rows, limit) if shard_rows else limit
+
+
+def export_excel(
+    df: pd.DataFrame,
+    path: str,
+    streaming: Optional[bool] = None,
+    shard_rows: Optional[int] = None,
+    shard_files: bool = False,
+    workers: int = 1,
+) -> List[str]:
     """
     Exporta um relatório Excel premium (banca/CGDF/TCU).
 
@@ -190,7 +217,24 @@ def export_excel(df: pd.DataFrame, path: str) -> None:
       - Aba "auditoria" (linha a linha)
       - Cabeçalho institucional, zebra striping, bordas, filtros
       - Formatação condicional (Risco_Max e Contem_Dados_Pessoais)
+
+    streaming=None decide pelo tamanho (STREAMING_MIN_ROWS); True força o modo write-only.
+
+    A auditoria é dividida em partes de `shard_rows` linhas (padrão e máximo: o limite de uma aba).
+    Sem `shard_files`, as partes são as abas auditoria, auditoria_2, ... do mesmo arquivo (modo streaming);
+    com `shard_files`, ver export_excel_shards(). Devolve os arquivos gravados, `path` primeiro.
     """
+    limit = _shard_limit(shard_rows)
+    if shard_files:
+        return export_excel_shards(df, path, limit, workers=workers)
+    if len(df) > limit:
+        streaming = True
+    if streaming is None:
+        streaming = len(df) > STREAMING_MIN_ROWS
+    if streaming:
+        export_excel_stream([df], path, shard_rows=limit)
+        return [path]
+
     with pd.ExcelWriter(path, engine="openpyxl") as writer:
         df.to_excel(writer, index=False, sheet_name="auditoria")
         ws = writer.sheets["auditoria"]
@@ -214,7 +258,7 @@ def export_excel(df: pd.DataFrame, path: str) -> None:
         _add_conditional_formatting(ws, header_map, ws.max_row)
 
         # Ajustes pontuais para leitura
-        for name in ("Texto_Analise", "Texto Mascarado", "Versao_Publicavel"):
+        for name in WIDE_TEXT_COLUMNS:
             if name in header_map:
                 col = get_column_letter(header_map[name])
                 ws.column_dimensions[col].width = 70
@@ -223,3 +267,390 @@ def export_excel(df: pd.DataFrame, path: str) -> None:
             col = get_column_letter(header_map["Qtd_Achados"])
             for r in range(2, ws.max_row + 1):
                 ws[f"{col}{r}"].alignment = Alignment(horizontal="center", vertical="top", wrap_text=True)
+    return [path]
+
+
+# --- Modo streaming (write-only) ---
+# Mesmo layout institucional, mas as linhas vão direto para o disco: estilos nomeados
+# compartilhados, larguras estimadas pela amostra do primeiro bloco e resumo acumulado.
+
+def _register_named_styles(wb) -> Dict[str, str]:
+    body_font = Font(color="111827", size=10)
+    zebra = PatternFill("solid", fgColor=CGDF_GRAY)
+    wrap = Alignment(vertical="top", wrap_text=True)
+    center = Alignment(horizontal="center", vertical="top", wrap_text=True)
+    styles = {
+        "header": NamedStyle(
+            name="lai_header",
+            font=Font(color=WHITE, bold=True, size=11),
+            fill=PatternFill("solid", fgColor=CGDF_BLUE),
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            border=BORDER,
+        ),
+        "body": NamedStyle(name="lai_body", font=body_font, alignment=wrap, border=BORDER),
+        "body_zebra": NamedStyle(name="lai_body_zebra", font=body_font, alignment=wrap, border=BORDER, fill=zebra),
+        "center": NamedStyle(name="lai_center", font=body_font, alignment=center, border=BORDER),
+        "center_zebra": NamedStyle(name="lai_center_zebra", font=body_font, alignment=center, border=BORDER, fill=zebra),
+    }
+    for st in styles.values():
+        wb.add_named_style(st)
+    return {k: st.name for k, st in styles.items()}
+
+
+def _estimate_widths(sample: pd.DataFrame) -> List[float]:
+    widths = []
+    for name in sample.columns:
+        values = sample[name].dropna().astype(str)
+        max_len = max([len(str(name))] + values.str.len().tolist())
+        width = min(max(12, max_len + 2), 70)
+        if str(name) in WIDE_TEXT_COLUMNS:
+            width = 70
+        widths.append(width)
+    return widths
+
+
+class StreamingExcelExporter:
+    """
+    Exportador da auditoria em blocos, com memória constante (openpyxl write_only).
+
+    Uso:
+        with StreamingExcelExporter(path) as xls:
+            for chunk in blocos:
+                xls.write(chunk)
+
+    A cada `shard_rows` linhas (padrão: o limite de uma aba) a auditoria continua numa aba nova
+    (auditoria_2, auditoria_3, ...); o resumo soma todas e lista as partes.
+    """
+
+    def __init__(self, path: str, sample_rows: int = 2000, shard_rows: Optional[int] = None):
+        self.path = path
+        self.sample_rows = sample_rows
+        self.shard_rows = _shard_limit(shard_rows)
+        self.wb = Workbook(write_only=True)
+        self._styles = _register_named_styles(self.wb)
+        # A aba resumo é criada primeiro (fica na frente), mas só é escrita no close().
+        self._summary_ws = self.wb.create_sheet("resumo")
+        self._ws = self.wb.create_sheet("auditoria")
+        self._columns: Optional[List[str]] = None
+        self._widths: List[float] = []
+        self._center_cols = set()
+        self._row = 1
+        self._total = 0
+        self._positives = 0
+        self._risk_counts: Dict[str, int] = {}
+        # (aba, registros, com dados pessoais) de cada parte já escrita ou em escrita
+        self._parts: List[List] = [[self._ws.title, 0, 0]]
+
+    def __enter__(self) -> "StreamingExcelExporter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+    def _start(self, first: pd.DataFrame) -> None:
+        self._columns = [str(c) for c in first.columns]
+        self._widths = _estimate_widths(first.head(self.sample_rows))
+        self._center_cols = {i for i, c in enumerate(self._columns) if c == "Qtd_Achados"}
+        self._open_sheet()
+
+    def _open_sheet(self) -> None:
+        ws = self._ws
+        for i, width in enumerate(self._widths, start=1):
+            ws.column_dimensions[get_column_letter(i)].width = width
+        ws.freeze_panes = "A2"
+        ws.row_dimensions[1].height = 26
+        ws.append([self._cell(c, self._styles["header"]) for c in self._columns])
+
+    def _finish_sheet(self) -> None:
+        ws = self._ws
+        header_map = {c: i + 1 for i, c in enumerate(self._columns)}
+        if self._columns:
+            ws.auto_filter.ref = f"A1:{get_column_letter(len(self._columns))}{self._row}"
+        _add_conditional_formatting(ws, header_map, self._row)
+
+    def _next_sheet(self) -> None:
+        self._finish_sheet()
+        self._ws = self.wb.create_sheet(f"auditoria_{len(self._parts) + 1}")
+        self._parts.append([self._ws.title, 0, 0])
+        self._row = 1
+        self._open_sheet()
+
+    def _cell(self, value, style: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(self._ws, value=value)
+        cell.style = style
+        return cell
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._columns is None:
+            self._start(df)
+        pos = 0
+        while pos < len(df):
+            room = self.shard_rows - (self._row - 1)
+            if room <= 0:
+                self._next_sheet()
+                continue
+            self._write_rows(df.iloc[pos:pos + room])
+            pos += room
+
+    def _write_rows(self, df: pd.DataFrame) -> None:
+        ws, styles = self._ws, self._styles
+        for values in df.itertuples(index=False, name=None):
+            self._row += 1
+            zebra = "_zebra" if self._row % 2 == 0 else ""
+            body, center = styles["body" + zebra], styles["center" + zebra]
+            if self._row < 3000:
+                ws.row_dimensions[self._row].height = 42
+            ws.append([
+                self._cell(None if pd.isna(v) else v, center if i in self._center_cols else body)
+                for i, v in enumerate(values)
+            ])
+
+        total, positives, risks = _count_rows(df)
+        self._total += total
+        self._positives += positives
+        for risk, n in risks.items():
+            self._risk_counts[risk] = self._risk_counts.get(risk, 0) + n
+        self._parts[-1][1] += total
+        self._parts[-1][2] += positives
+
+    def counts(self) -> Tuple[int, int, Dict[str, int]]:
+        """(registros, com dados pessoais, registros por Risco_Max) do que já foi escrito."""
+        return self._total, self._positives, dict(self._risk_counts)
+
+    def close(self) -> None:
+        if self._columns is None:
+            self._start(pd.DataFrame())
+        self._finish_sheet()
+        parts = [tuple(p) for p in self._parts] if len(self._parts) > 1 else None
+        _write_summary(self._summary_ws, self._total, self._positives, self._risk_counts, parts, "Aba")
+        self.wb.save(self.path)
+
+
+def _count_rows(df: pd.DataFrame) -> Tuple[int, int, Dict[str, int]]:
+    positives = int(df["Contem_Dados_Pessoais"].sum()) if "Contem_Dados_Pessoais" in df.columns else 0
+    if "Risco_Max" in df.columns:
+        risks = {str(k): int(n) for k, n in df["Risco_Max"].fillna("").astype(str).value_counts().items()}
+    else:
+        risks = {"": len(df)} if len(df) else {}
+    return len(df), positives, risks
+
+
+def _write_summary(
+    ws,
+    total: int,
+    positives: int,
+    risk_counts: Dict[str, int],
+    parts: Optional[Sequence[Tuple[str, int, int]]] = None,
+    part_label: str = "Aba",
+) -> None:
+    """Aba resumo numa planilha write-only; com `parts`, acrescenta a tabela das partes (aba ou arquivo)."""
+    title_font = Font(color=WHITE, bold=True, size=14)
+    subtitle_font = Font(color="111827", bold=True, size=11)
+    head = dict(font=Font(color=WHITE, bold=True), fill=PatternFill("solid", fgColor=CGDF_BLUE),
+                alignment=Alignment(horizontal="center", vertical="center"), border=BORDER)
+
+    def cell(value, **style):
+        c = WriteOnlyCell(ws, value=value)
+        for k, v in style.items():
+            setattr(c, k, v)
+        return c
+
+    ws.column_dimensions["A"].width = 32
+    ws.column_dimensions["B"].width = 12
+    if parts:
+        ws.column_dimensions["C"].width = 22
+    ws.freeze_panes = "A5"
+    ws.row_dimensions[1].height = 30
+    ws.merged_cells.add("A1:E1")
+
+    pct = (positives / total) if total else 0.0
+    left = Alignment(horizontal="left")
+
+    ws.append([cell("LAI Guardian — Resumo Executivo", font=title_font,
+                    fill=PatternFill("solid", fgColor=CGDF_BLUE_DARK),
+                    alignment=Alignment(horizontal="left", vertical="center"))])
+    ws.append([])
+    ws.append([cell("Data/Hora do Relatório", font=subtitle_font),
+               datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")])
+    ws.append([])
+    ws.append([cell("Total de Registros", font=subtitle_font, alignment=left), cell(total, alignment=left)])
+    ws.append([cell("Registros com Dados Pessoais", font=subtitle_font, alignment=left),
+               cell(positives, alignment=left)])
+    ws.append([cell("Percentual com Dados Pessoais", font=subtitle_font, alignment=left),
+               cell(pct, alignment=left, number_format="0.00%")])
+    ws.append([])
+    ws.append([cell("Distribuição por Risco", font=subtitle_font)])
+    ws.append([cell("Risco", **head), cell("Qtd", **head)])
+
+    for risk, key in (("CRÍTICO", "CRÍTICO"), ("ALTO", "ALTO"), ("MÉDIO", "MÉDIO"), ("BAIXO", "BAIXO"), ("(vazio)", "")):
+        style = dict(border=BORDER, alignment=Alignment(horizontal="left"))
+        if risk in RISK_COLOR:
+            style.update(fill=PatternFill("solid", fgColor=RISK_COLOR[risk]), font=Font(color=WHITE, bold=True))
+        ws.append([cell(risk, **style),
+                   cell(int(risk_counts.get(key, 0)), border=BORDER, alignment=Alignment(horizontal="center"))])
+
+    if parts:
+        center = Alignment(horizontal="center")
+        ws.append([])
+        ws.append([cell("Partes da Auditoria", font=subtitle_font)])
+        ws.append([cell(part_label, **head), cell("Registros", **head), cell("Com Dados Pessoais", **head)])
+        for name, rows, pii in parts:
+            ws.append([cell(name, border=BORDER, alignment=Alignment(horizontal="left")),
+                       cell(int(rows), border=BORDER, alignment=center),
+                       cell(int(pii), border=BORDER, alignment=center)])
+
+
+def export_excel_stream(
+    chunks: Iterable[pd.DataFrame], path: str, sample_rows: int = 2000, shard_rows: Optional[int] = None,
+) -> None:
+    """export_excel para blocos de linhas (ex.: saída de iter_table + motor), em memória constante."""
+    with StreamingExcelExporter(path, sample_rows=sample_rows, shard_rows=shard_rows) as xls:
+        for chunk in chunks:
+            xls.write(chunk)
+
+
+def _write_shard(df: pd.DataFrame, path: str, sample_rows: int) -> Tuple[int, int, Dict[str, int]]:
+    # Roda num worker: grava uma parte completa (resumo próprio + auditoria) e devolve as contagens.
+    with StreamingExcelExporter(path, sample_rows=sample_rows) as xls:
+        xls.write(df)
+    return xls.counts()
+
+
+class _ShardFiles:
+    """
+    Escritor de export_excel_shards em blocos: junta linhas até completar uma parte e a entrega a
+    um worker; no close() espera as partes e grava o índice. Em memória fica no máximo uma parte
+    em formação mais as que estão sendo gravadas.
+    """
+
+    def __init__(self, path: str, shard_rows: Optional[int] = None, workers: int = 1, sample_rows: int = 2000):
+        self.path = path
+        self.limit = _shard_limit(shard_rows)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.sample_rows = sample_rows
+        base, ext = os.path.splitext(path)
+        self._base, self._ext = base, ext or ".xlsx"
+        self._buf: List[pd.DataFrame] = []
+        self._buf_rows = 0
+        self._paths: List[str] = []
+        self._results: List = []  # contagens ou futures, na ordem das partes
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        self._buf.append(df)
+        self._buf_rows += len(df)
+        while self._buf_rows >= self.limit:
+            frame = pd.concat(self._buf) if len(self._buf) > 1 else self._buf[0]
+            rest = frame.iloc[self.limit:]
+            self._submit(frame.iloc[:self.limit])
+            self._buf, self._buf_rows = ([rest], len(rest)) if len(rest) else ([], 0)
+
+    def _submit(self, piece: pd.DataFrame) -> None:
+        path = f"{self._base}_{len(self._paths) + 1:03d}{self._ext}"
+        self._paths.append(path)
+        if self.workers == 1:
+            self._results.append(_write_shard(piece, path, self.sample_rows))
+            return
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._results.append(self._pool.submit(_write_shard, piece, path, self.sample_rows))
+
+    def close(self) -> List[str]:
+        if self._buf_rows or not self._paths:
+            self._submit(pd.concat(self._buf) if self._buf else pd.DataFrame())
+        try:
+            results = [r.result() if hasattr(r, "result") else r for r in self._results]
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+
+        total = sum(r[0] for r in results)
+        positives = sum(r[1] for r in results)
+        risk_counts: Dict[str, int] = {}
+        for _, _, risks in results:
+            for risk, k in risks.items():
+                risk_counts[risk] = risk_counts.get(risk, 0) + k
+        parts = [(os.path.basename(p), r[0], r[1]) for p, r in zip(self._paths, results)]
+
+        wb = Workbook(write_only=True)
+        _write_summary(wb.create_sheet("resumo"), total, positives, risk_counts, parts, "Arquivo")
+        wb.save(self.path)
+        return [self.path] + self._paths
+
+
+def export_excel_shards(
+    df: pd.DataFrame, path: str, shard_rows: Optional[int] = None, workers: int = 1, sample_rows: int = 2000,
+) -> List[str]:
+    """
+    Uma pasta de trabalho por parte de `shard_rows` linhas (<nome>_001.xlsx, <nome>_002.xlsx, ...),
+    gravadas em paralelo por `workers` processos (0 = todos os núcleos). Cada parte tem o próprio
+    resumo; `path` vira o índice: a aba resumo com as contagens somadas e a lista dos arquivos.
+    Devolve [path, parte 1, parte 2, ...].
+    """
+    shards = _ShardFiles(path, shard_rows, workers=workers, sample_rows=sample_rows)
+    shards.write(df)
+    return shards.close()
+
+
+class ExcelAuditWriter:
+    """
+    export_excel em blocos, sem juntar a tabela inteira: o resultado é o mesmo de
+    export_excel(pd.concat(blocos), ...). Até STREAMING_MIN_ROWS linhas (e dentro de uma aba) os
+    blocos ficam em memória e saem no layout completo; passando disso, o que já veio e o resto
+    seguem para o modo streaming (ou para as partes em arquivos, com `shard_files`).
+
+    Uso:
+        with ExcelAuditWriter(path) as xls:
+            for chunk in blocos:
+                xls.write(chunk)
+        xls.written  # arquivos gravados, `path` primeiro
+    """
+
+    def __init__(
+        self, path: str, shard_rows: Optional[int] = None, shard_files: bool = False, workers: int = 1,
+        sample_rows: int = 2000,
+    ):
+        self.path = path
+        self.shard_rows = shard_rows
+        self.shard_files = shard_files
+        self.workers = workers
+        self.sample_rows = sample_rows
+        self.written: List[str] = []
+        self._small_max = min(STREAMING_MIN_ROWS, _shard_limit(shard_rows))
+        self._pending: List[pd.DataFrame] = []
+        self._pending_rows = 0
+        self._sink = None  # StreamingExcelExporter ou _ShardFiles, quando a tabela deixa de ser pequena
+
+    def __enter__(self) -> "ExcelAuditWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._sink is not None:
+            self._sink.write(df)
+            return
+        self._pending.append(df)
+        self._pending_rows += len(df)
+        if self.shard_files or self._pending_rows > self._small_max:
+            if self.shard_files:
+                self._sink = _ShardFiles(self.path, self.shard_rows, self.workers, self.sample_rows)
+            else:
+                self._sink = StreamingExcelExporter(self.path, self.sample_rows, shard_rows=self.shard_rows)
+            for frame in self._pending:
+                self._sink.write(frame)
+            self._pending, self._pending_rows = [], 0
+
+    def close(self) -> List[str]:
+        if self._sink is None:
+            df = pd.concat(self._pending) if self._pending else pd.DataFrame()
+            self.written = export_excel(df, self.path, streaming=False)
+        elif isinstance(self._sink, _ShardFiles):
+            self.written = self._sink.close()
+        else:
+            self._sink.close()
+            self.written = [self.path]
+        return self.written
@@ -0,0 +1,136 @@
+from __future__ import annotations
+"""
+Achados em formato colunar (Parquet ou Arrow IPC), ao lado do Excel e do JSON no bundle.
+
+Uma linha por achado, sem JSON aninhado: `tipo`/`risco` em dicionário (categorias fixas, iguais
+em todas as execuções), offsets em int32 e um único timestamp da execução. O BI lê vários meses
+com pyarrow.dataset / DuckDB e filtra por coluna sem interpretar texto; o .arrow pode ser
+mapeado em memória.
+"""
+
+import datetime
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..core.detector import DEFAULT_RISK, RISK_ORDER
+
+FORMAT_VERSION = "1"
+# Categorias fixas: o mesmo código significa o mesmo tipo em qualquer arquivo.
+TIPO_CATEGORIES = tuple(DEFAULT_RISK)
+RISCO_CATEGORIES = tuple(sorted(RISK_ORDER, key=RISK_ORDER.get))
+
+_PARQUET_EXT = (".parquet", ".pq")
+_ARROW_EXT = (".arrow", ".feather", ".ipc")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise RuntimeError("Saída Parquet/Arrow requer o pacote 'pyarrow' (pip install pyarrow).") from e
+    return pyarrow
+
+
+def format_for(path: str) -> str:
+    low = path.lower()
+    if low.endswith(_PARQUET_EXT):
+        return "parquet"
+    if low.endswith(_ARROW_EXT):
+        return "arrow"
+    raise ValueError(f"Extensão não suportada para achados: {path} (use .parquet ou .arrow)")
+
+
+def _categories(values: pd.Series, fixed: Sequence[str]) -> List[str]:
+    # Valores fora da lista fixa (ex.: tipo novo) entram no fim, sem mudar os códigos existentes.
+    return list(fixed) + sorted(set(values.unique()) - set(fixed))
+
+
+def to_columnar(findings: pd.DataFrame, ids: Optional[Sequence[Any]] = None) -> pd.DataFrame:
+    """
+    Tabela longa de core/columnar.py (row, tipo, valor, risco, start, end) com os tipos compactos:
+    tipo/risco categóricos com categorias fixas e row/start/end em int32.
+    Com `ids` (um por linha da entrada), ganha a coluna `id` com o identificador da linha.
+    """
+    rows = findings["row"].to_numpy(dtype=np.int32)
+    out = pd.DataFrame({
+        "row": rows,
+        "tipo": pd.Categorical(findings["tipo"], categories=_categories(findings["tipo"], TIPO_CATEGORIES)),
+        "valor": findings["valor"].astype(object).to_numpy(),
+        "risco": pd.Categorical(findings["risco"], categories=_categories(findings["risco"], RISCO_CATEGORIES)),
+        "start": findings["start"].to_numpy(dtype=np.int32),
+        "end": findings["end"].to_numpy(dtype=np.int32),
+    })
+    if ids is not None:
+        out.insert(1, "id", pd.Series([str(v) for v in ids], dtype=object).to_numpy()[rows])
+    return out
+
+
+def _dictionary(pa, values: pd.Categorical):
+    return pa.DictionaryArray.from_arrays(
+        pa.array(values.codes.astype(np.int8), pa.int8()), pa.array(list(values.categories), pa.string()),
+    )
+
+
+def _table(findings: pd.DataFrame, run_timestamp: datetime.datetime, meta: Dict[str, str], ids: Optional[Sequence[Any]]):
+    pa = _pyarrow()
+    cols = to_columnar(findings, ids)
+    columns = {"row": pa.array(cols["row"].to_numpy(), pa.int32())}
+    if "id" in cols:
+        columns["id"] = pa.array(cols["id"].tolist(), pa.string())
+    columns.update({
+        "tipo": _dictionary(pa, cols["tipo"].array),
+        "valor": pa.array(cols["valor"].tolist(), pa.string()),
+        "risco": _dictionary(pa, cols["risco"].array),
+        "start": pa.array(cols["start"].to_numpy(), pa.int32()),
+        "end": pa.array(cols["end"].to_numpy(), pa.int32()),
+        # Um valor só para a execução inteira; no Parquet vira uma sequência RLE de custo quase zero.
+        "run_ts": pa.array(np.full(len(cols), np.datetime64(run_timestamp.replace(tzinfo=None), "ms")), pa.timestamp("ms")),
+    })
+    table = pa.table(columns)
+    metadata = {
+        "lai_guardian.format": FORMAT_VERSION,
+        "lai_guardian.run_timestamp": run_timestamp.isoformat(),
+        **meta,
+    }
+    return table.replace_schema_metadata({k.encode(): str(v).encode() for k, v in metadata.items()})
+
+
+def write_findings(
+    findings: pd.DataFrame,
+    path: str,
+    run_timestamp: Optional[datetime.datetime] = None,
+    meta: Optional[Dict[str, Any]] = None,
+    ids: Optional[Sequence[Any]] = None,
+) -> str:
+    """
+    Grava os achados em `path`. .parquet sai comprimido (zstd); .arrow/.feather sai em Arrow IPC
+    sem compressão, pronto para memory map. `meta` vai para os metadados do schema.
+    """
+    fmt = format_for(path)
+    meta = {k: str(v) for k, v in (meta or {}).items() if v is not None}
+    table = _table(findings, run_timestamp or datetime.datetime.now(), meta, ids)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path, compression="zstd")
+    else:
+        import pyarrow as pa
+
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return path
+
+
+def read_findings(path: str, memory_map: bool = True):
+    """pyarrow.Table dos achados; o Arrow IPC é lido por memory map (sem copiar para a memória)."""
+    pa = _pyarrow()
+    if format_for(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, memory_map=memory_map)
+    source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+    return pa.ipc.open_file(source).read_all()
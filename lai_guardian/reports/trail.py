@@ -0,0 +1,215 @@
+from __future__ import annotations
+"""Trilha de auditoria em JSONL (um achado positivo por linha), gravada à medida que o motor decide."""
+
+import gzip
+import io
+import json
+import os
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _compression_for(path: str) -> Optional[str]:
+    low = path.lower()
+    if low.endswith(".gz"):
+        return "gzip"
+    if low.endswith((".zst", ".zstd")):
+        return "zstd"
+    return None
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("Compressão zstd requer o pacote 'zstandard' (pip install zstandard).") from e
+    return zstandard
+
+
+def is_jsonl_path(path: str) -> bool:
+    """True para .jsonl, .jsonl.gz e .jsonl.zst (as saídas .json continuam no formato antigo)."""
+    low = path.lower()
+    for ext in (".gz", ".zst", ".zstd"):
+        if low.endswith(ext):
+            low = low[: -len(ext)]
+    return low.endswith((".jsonl", ".ndjson"))
+
+
+class JsonlTrailWriter:
+    """
+    Grava registros em JSON Lines assim que são produzidos.
+
+    A compressão vem do argumento ou da extensão (.gz / .zst). A cada `flush_every` registros
+    ou `flush_seconds` segundos o buffer vai para o disco, então um arquivo de uma execução
+    interrompida continua legível até o último flush.
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None, flush_every: int = 1000, flush_seconds: float = 5.0):
+        self.path = path
+        self.compression = compression or _compression_for(path)
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.count = 0
+        self._since_flush = 0
+        self._last_flush = time.monotonic()
+
+        self._raw = open(path, "wb")
+        if self.compression == "gzip":
+            self._bin = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif self.compression == "zstd":
+            self._bin = _zstd().ZstdCompressor().stream_writer(self._raw, closefd=False)
+        elif self.compression is None:
+            self._bin = self._raw
+        else:
+            raise ValueError(f"Compressão não suportada: {self.compression}")
+        self._fh = io.TextIOWrapper(self._bin, encoding="utf-8", newline="\n", write_through=True)
+
+    def __enter__(self) -> "JsonlTrailWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+        self._since_flush += 1
+        if self._since_flush >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        self._fh.flush()
+        self._bin.flush()
+        self._raw.flush()
+        self._since_flush = 0
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        self._fh.flush()
+        self._fh.detach()
+        if self._bin is not self._raw:
+            self._bin.close()
+        self._raw.close()
+
+
+class JsonArrayTrailWriter:
+    """Mesma interface do JsonlTrailWriter, mas grava o JSON indentado de sempre no close()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows: List[Dict[str, Any]] = []
+        self.count = 0
+
+    def __enter__(self) -> "JsonArrayTrailWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.rows.append(record)
+        self.count += 1
+
+    def close(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.rows, f, ensure_ascii=False, indent=2)
+
+
+def open_trail(path: str, flush_every: int = 1000):
+    """Escolhe o escritor pela extensão: .jsonl[.gz|.zst] em streaming, .json no formato antigo."""
+    if is_jsonl_path(path):
+        return JsonlTrailWriter(path, flush_every=flush_every)
+    return JsonArrayTrailWriter(path)
+
+
+def _read_chunks(path: str, size: int = 1 << 16) -> Iterator[bytes]:
+    """
+    Bytes da trilha, descomprimidos conforme o conteúdo (magic bytes). Um .gz/.zst de execução
+    interrompida não tem o fim do fluxo: a leitura para no que foi gravado até o último flush.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(4)
+        f.seek(0)
+        if magic.startswith(GZIP_MAGIC):
+            gz = gzip.GzipFile(fileobj=f, mode="rb")
+            try:
+                while True:
+                    chunk = gz.read1(size)
+                    if not chunk:
+                        return
+                    yield chunk
+            except (EOFError, zlib.error):
+                return
+        elif magic.startswith(ZSTD_MAGIC):
+            # read_to_iter, não stream_reader: este descarta saída já decodificada quando o frame não terminou.
+            zstandard = _zstd()
+            try:
+                yield from zstandard.ZstdDecompressor().read_to_iter(f, read_size=size)
+            except zstandard.ZstdError:
+                return
+        else:
+            yield from iter(lambda: f.read(size), b"")
+
+
+def iter_trail(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Itera os registros de uma trilha JSONL (comprimida ou não). Arquivo de execução interrompida
+    (linha final truncada, ou .gz/.zst sem o fim do fluxo) termina na última linha completa.
+    """
+    pending = b""
+    for chunk in _read_chunks(path):
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    # `pending` sem "\n" é uma escrita interrompida no meio: fica de fora.
+
+
+def find_row(path: str, row: int) -> Optional[Dict[str, Any]]:
+    """
+    Busca o registro de uma linha da planilha ("row").
+
+    Em JSONL sem compressão os registros estão em ordem de linha, então fazemos busca binária
+    por offset de bytes (sem índice auxiliar). Arquivos comprimidos são percorridos em sequência.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC) or magic.startswith(ZSTD_MAGIC):
+        for rec in iter_trail(path):
+            if rec.get("row") == row:
+                return rec
+            if rec.get("row", -1) > row:
+                return None
+        return None
+
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+
+        def record_at(offset: int):
+            # Primeiro registro completo que começa em `offset` ou depois.
+            if offset:
+                f.seek(offset - 1)
+                f.readline()
+            else:
+                f.seek(0)
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                return None
+            return json.loads(line)
+
+        lo, hi = 0, size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            rec = record_at(mid)
+            if rec is None or rec["row"] >= row:
+                hi = mid
+            else:
+                lo = mid + 1
+        rec = record_at(lo)
+        return rec if rec is not None and rec["row"] == row else None
@@ -0,0 +1,303 @@
+from __future__ import annotations
+"""Modo serviço: mantém um GuardianEngine carregado e responde por HTTP local (TCP ou socket Unix)."""
+
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .core.engine import Decision, GuardianEngine
+
+MAX_BODY_BYTES = 32 << 20
+
+
+class Overloaded(RuntimeError):
+    """Fila de pedidos cheia: o cliente deve tentar de novo mais tarde (HTTP 503)."""
+
+
+class MicroBatcher:
+    """
+    Junta pedidos que chegam quase juntos num único analyze_batch (um nlp.pipe só).
+
+    Um despachante espera até `max_wait` segundos ou `max_batch` textos e entrega o lote a um
+    pool de `workers` threads. Enquanto todos os workers estão ocupados os pedidos se acumulam
+    na fila (limitada a `max_pending` pedidos), então o lote seguinte sai naturalmente maior.
+    """
+
+    def __init__(
+        self,
+        engine: GuardianEngine,
+        max_batch: int = 64,
+        max_wait: float = 0.005,
+        workers: int = 2,
+        max_pending: int = 10_000,
+    ):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Optional[Tuple[List[str], bool, Future]]]" = queue.Queue(maxsize=max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lai-serve")
+        self._slots = threading.BoundedSemaphore(workers)
+        self._thread = threading.Thread(target=self._loop, name="lai-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str], redact: bool = True) -> "Future[List[Decision]]":
+        fut: "Future[List[Decision]]" = Future()
+        try:
+            self._queue.put_nowait((texts, redact, fut))
+        except queue.Full:
+            raise Overloaded("Fila de análise cheia.")
+        return fut
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+
+    def _loop(self) -> None:
+        while True:
+            self._slots.acquire()  # só monta o lote quando há worker livre
+            first = self._queue.get()
+            if first is None:
+                return
+            jobs = [first]
+            n = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while n < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                jobs.append(job)
+                n += len(job[0])
+            self._pool.submit(self._run, jobs)
+            if stop:
+                return
+
+    def _run(self, jobs: List[Tuple[List[str], bool, Future]]) -> None:
+        try:
+            for redact in (True, False):
+                group = [j for j in jobs if j[1] == redact and j[2].set_running_or_notify_cancel()]
+                if not group:
+                    continue
+                texts = [t for j in group for t in j[0]]
+                try:
+                    decisions = self.engine.analyze_batch(texts, redact=redact)
+                except Exception as e:
+                    for _, _, fut in group:
+                        fut.set_exception(e)
+                    continue
+                i = 0
+                for job_texts, _, fut in group:
+                    fut.set_result(decisions[i:i + len(job_texts)])
+                    i += len(job_texts)
+        finally:
+            self._slots.release()
+
+
+class ModelReloader:
+    """Recarrega o modelo ML quando o arquivo .joblib muda (mtime/tamanho), sem derrubar o serviço."""
+
+    def __init__(self, engine: GuardianEngine, path: str, interval: float = 2.0):
+        self.engine = engine
+        self.path = path
+        self.interval = interval
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._stamp = self._current_stamp()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _current_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def check(self) -> bool:
+        """Recarrega se o arquivo mudou. Falha de leitura (ex.: arquivo ainda sendo gravado) mantém o modelo atual."""
+        stamp = self._current_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        from .ml.registry import load_model
+        try:
+            model = load_model(self.path)
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            return False
+        self.engine.ml_model = model  # troca atômica: lotes em andamento terminam com o modelo antigo
+        self._stamp = stamp
+        self.reloads += 1
+        self.last_error = None
+        return True
+
+    def start(self) -> None:
+        def loop():
+            while not self._stop.wait(self.interval):
+                self.check()
+
+        self._thread = threading.Thread(target=loop, name="lai-model-reload", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class GuardianService:
+    """Motor residente + micro-batching + recarga de modelo: o que o servidor HTTP expõe."""
+
+    def __init__(
+        self,
+        engine: GuardianEngine,
+        model_path: Optional[str] = None,
+        max_batch: int = 64,
+        max_wait: float = 0.005,
+        workers: int = 2,
+        max_pending: int = 10_000,
+        timeout: float = 60.0,
+        reload_interval: float = 2.0,
+    ):
+        self.engine = engine
+        self.timeout = timeout
+        engine.detector._ensure_ner()  # carrega o spaCy agora, não no primeiro pedido
+        self.batcher = MicroBatcher(engine, max_batch, max_wait, workers, max_pending)
+        self.reloader = ModelReloader(engine, model_path, reload_interval) if model_path else None
+        if self.reloader is not None and reload_interval > 0:
+            self.reloader.start()
+
+    def analyze(self, texts: List[str], redact: bool = True) -> List[Decision]:
+        return self.batcher.submit(texts, redact).result(timeout=self.timeout)
+
+    def health(self) -> Dict[str, Any]:
+        model = self.engine.ml_model
+        return {
+            "status": "ok",
+            "ner": bool(self.engine.detector._ner_ready),
+            "model": model.fingerprint() if model is not None else None,
+            "model_reloads": self.reloader.reloads if self.reloader else 0,
+            "model_error": self.reloader.last_error if self.reloader else None,
+        }
+
+    def close(self) -> None:
+        if self.reloader is not None:
+            self.reloader.stop()
+        self.batcher.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    GET  /health
+    POST /analyze        {"text": "...", "redact": true}   -> Decision
+    POST /analyze/batch  {"texts": [...], "redact": true}  -> {"results": [Decision, ...]}
+    POST /redact         {"text": "..."}                   -> {"redacted_text": "...", "contains_pii": bool}
+    POST /redact/batch   {"texts": [...]}                  -> {"results": [{...}, ...]}
+    """
+
+    protocol_version = "HTTP/1.1"
+    service: GuardianService = None  # preenchido por make_server
+    quiet = True
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            return self._send(200, self.service.health())
+        return self._send(404, {"error": f"Rota não encontrada: {self.path}"})
+
+    def do_POST(self):
+        route = self.path.rstrip("/")
+        if route not in ("/analyze", "/analyze/batch", "/redact", "/redact/batch"):
+            return self._send(404, {"error": f"Rota não encontrada: {self.path}"})
+        try:
+            body = self._read_json()
+            batch = route.endswith("/batch")
+            texts = body.get("texts") if batch else [body.get("text")]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError("Envie 'text' (string) ou 'texts' (lista de strings).")
+            redact = bool(body.get("redact", True)) if route.startswith("/analyze") else True
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+
+        try:
+            decisions = self.service.analyze(texts, redact) if texts else []
+        except Overloaded as e:
+            return self._send(503, {"error": str(e)})
+        except FutureTimeout:
+            return self._send(504, {"error": "Tempo de análise esgotado."})
+        except Exception as e:
+            # Erro do motor repassado pelo lote: registra sempre (mesmo com quiet) e responde 500,
+            # em vez de derrubar a conexão sem resposta.
+            BaseHTTPRequestHandler.log_message(self, "Erro na análise: %s", traceback.format_exc().rstrip())
+            return self._send(500, {"error": f"Erro interno: {type(e).__name__}: {e}"})
+
+        if route.startswith("/redact"):
+            results = [{"redacted_text": d.redacted_text, "contains_pii": d.contains_pii} for d in decisions]
+        else:
+            results = [asdict(d) for d in decisions]
+        return self._send(200, {"results": results} if batch else results[0])
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("Corpo da requisição grande demais.")
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            body = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"JSON inválido: {e}")
+        if not isinstance(body, dict):
+            raise ValueError("O corpo deve ser um objeto JSON.")
+        return body
+
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)  # BaseHTTPRequestHandler espera (host, porta)
+
+
+def make_server(
+    service: GuardianService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: Optional[str] = None,
+    quiet: bool = True,
+):
+    """Cria o servidor (sem iniciar). Com `unix_socket`, escuta no arquivo em vez de TCP."""
+    handler = type("GuardianHandler", (_Handler,), {"service": service, "quiet": quiet})
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        return _UnixHTTPServer(unix_socket, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
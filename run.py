@@ -12,6 +12,7 @@ O script tenta rodar o pipeline completo (FULL):
   - Avaliação ML (idem)
 
 Saídas ficam em data/processed/run_YYYYMMDD_HHMMSS/
+A auditoria é incremental: linhas iguais às do bundle anterior são reaproveitadas.
 """
 from __future__ import annotations
 
@@ -33,7 +34,7 @@ def main():
         input_path=DEFAULT_XLSX if os.path.exists(DEFAULT_XLSX) else None,
         input_column=DEFAULT_COL,
         excel_out=os.path.join("data", "processed", "auditoria.xlsx"),
-        json_out=os.path.join("data", "processed", "relatorio.json"),
+        json_out=os.path.join("data", "processed", "relatorio.jsonl.gz"),
         train_csv=DEFAULT_CSV if os.path.exists(DEFAULT_CSV) else None,
         train_text_col="text",
         train_label_col="label_any_pii",
@@ -43,6 +44,7 @@ def main():
         model_path=os.path.join("data", "processed", "model.joblib"),
         metrics_out=os.path.join("data", "processed", "metrics.json"),
         bundle_dir=bundle,
+        incremental=True,
         strict=False,
     )
 
@@ -14,6 +14,7 @@ import datetime
 import json
 import os
 
+from lai_guardian.cli import add_overlap_policy_argument, add_regex_backend_argument
 from lai_guardian.pipeline import FullPipelineConfig, run_full_pipeline
 
 
@@ -24,7 +25,13 @@ def build_parser():
     p.add_argument("--input", type=str, default="")
     p.add_argument("--column", type=str, default="Texto Mascarado")
     p.add_argument("--excel", type=str, default="data/processed/auditoria.xlsx")
-    p.add_argument("--json", type=str, default="data/processed/relatorio.json")
+    p.add_argument("--excel-shard-rows", type=int, default=0, help="Divide a auditoria a cada N linhas (0 = só no limite de 1.048.576 linhas da aba).")
+    p.add_argument("--excel-shard-files", action="store_true", help="Uma planilha por parte, gravadas em paralelo (--workers), com um índice/resumo consolidado no arquivo de saída.")
+    p.add_argument("--json", type=str, default="data/processed/relatorio.jsonl.gz",
+                   help="Trilha de saída. .jsonl/.jsonl.gz/.jsonl.zst grava em streaming; .json no formato antigo (tudo no fim).")
+    p.add_argument("--chunk-rows", type=int, default=50_000, help="Linhas por bloco da tabela (a trilha é gravada a cada bloco).")
+    p.add_argument("--findings", type=str, default="",
+                   help="Achados em Parquet (.parquet) ou Arrow IPC (.arrow); requer pyarrow. Desligado por padrão (ex.: data/processed/achados.parquet).")
 
     # Treino ML
     p.add_argument("--train-csv", type=str, default="")
@@ -39,10 +46,23 @@ def build_parser():
     # Artefatos ML
     p.add_argument("--model", type=str, default="data/processed/model.joblib")
     p.add_argument("--metrics", type=str, default="data/processed/metrics.json")
+    p.add_argument("--tune", action="store_true", help="Busca hiperparâmetros (validação cruzada) antes do treino.")
+    p.add_argument("--tune-folds", type=int, default=5)
+    p.add_argument("--tune-jobs", type=int, default=1, help="Processos da busca (-1 = todos os núcleos).")
 
     # Execução
     p.add_argument("--no-ner", action="store_true")
     p.add_argument("--strict", action="store_true")
+    p.add_argument("--workers", type=int, default=1, help="Processos para auditoria/anonimização (0 = todos os núcleos).")
+    add_overlap_policy_argument(p)
+    p.add_argument("--cache", type=str, default="", help="Arquivo SQLite com decisões já calculadas (reaproveitadas entre execuções).")
+    p.add_argument("--incremental", action="store_true", help="Reaproveita as linhas que não mudaram desde o bundle anterior.")
+    p.add_argument("--previous-bundle", type=str, default="", help="Bundle de referência do modo incremental (padrão: o irmão mais recente do bundle de saída com estado.jsonl.gz).")
+    p.add_argument("--id-column", type=str, default="", help="Coluna que identifica cada linha (padrão: hash do texto).")
+    p.add_argument("--profile-rules", action="store_true", help="Mede tempo e contadores por regra (summary e metrics.json).")
+    p.add_argument("--columnar", action="store_true", help="Regras vetorizadas sobre a coluna inteira (mesmo resultado).")
+    p.add_argument("--ml-threshold", type=float, default=None, help="Probabilidade mínima para o backstop de ML marcar a linha (padrão 0.5, ou o limiar achado por --tune).")
+    add_regex_backend_argument(p)
 
     # Bundle
     p.add_argument("--bundle", action="store_true", help="Salva todas as saídas em um diretório único por execução.")
@@ -68,7 +88,10 @@ def main():
         input_path=args.input or None,
         input_column=args.column,
         excel_out=args.excel,
+        excel_shard_rows=args.excel_shard_rows,
+        excel_shard_files=args.excel_shard_files,
         json_out=args.json,
+        findings_out=args.findings or None,
         train_csv=args.train_csv or None,
         train_text_col=args.train_text_col,
         train_label_col=args.train_label_col,
@@ -77,8 +100,22 @@ def main():
         eval_label_col=args.eval_label_col,
         model_path=args.model,
         metrics_out=args.metrics,
+        tune=args.tune,
+        tune_folds=args.tune_folds,
+        tune_jobs=args.tune_jobs,
         no_ner=args.no_ner,
         strict=args.strict,
+        workers=args.workers,
+        chunk_rows=args.chunk_rows,
+        overlap_policy=args.overlap_policy,
+        cache_path=args.cache or None,
+        incremental=args.incremental,
+        previous_bundle=args.previous_bundle or None,
+        id_column=args.id_column or None,
+        profile_rules=args.profile_rules,
+        columnar=args.columnar,
+        ml_threshold=args.ml_threshold,
+        regex_backend=args.regex_backend,
         bundle_dir=bundle_dir,
     )
 
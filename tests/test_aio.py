@@ -0,0 +1,71 @@
+import asyncio
+
+from lai_guardian.core.aio import AsyncGuardian, analyze_stream
+from lai_guardian.core.engine import GuardianEngine
+
+TEXTS = [
+    "Meu CPF é 529.982.247-25.",
+    "Sem dados pessoais aqui.",
+    "email joao@exemplo.gov.br",
+    "Ligue (61) 99876-5432",
+] * 10
+
+
+def _plain(decisions):
+    for d in decisions:
+        for f in d.findings:
+            f.pop("timestamp", None)
+    return decisions
+
+
+def test_stream_ordered_unordered_and_batching():
+    engine = GuardianEngine(use_ner=False)
+    expected = _plain(engine.analyze_batch(TEXTS))
+    calls = []
+    original = engine.analyze_batch
+    engine.analyze_batch = lambda texts, redact=True: calls.append(len(texts)) or original(texts, redact)
+
+    async def source():
+        for t in TEXTS:
+            yield t
+
+    async def main():
+        async with AsyncGuardian(engine, max_batch=16, max_wait=0.05, max_pending=8) as g:
+            ordered = [d async for d in g.analyze_stream(source())]
+            unordered = [p async for p in g.analyze_stream(TEXTS, ordered=False)]
+            gathered = await asyncio.gather(*(g.analyze(t) for t in TEXTS[:5]))
+        return ordered, unordered, gathered
+
+    ordered, unordered, gathered = asyncio.run(main())
+    assert _plain(ordered) == expected
+    assert sorted(i for i, _ in unordered) == list(range(len(TEXTS)))
+    assert _plain([d for _, d in sorted(unordered, key=lambda p: p[0])]) == expected
+    assert _plain(gathered) == expected[:5]
+    assert calls[-1] == 5  # as 5 chamadas simultâneas viraram um único lote
+    assert max(calls) <= 16
+
+
+def test_cancelled_request_is_dropped():
+    engine = GuardianEngine(use_ner=False)
+    seen = []
+    original = engine.analyze_batch
+    engine.analyze_batch = lambda texts, redact=True: seen.extend(texts) or original(texts, redact)
+
+    async def main():
+        async with AsyncGuardian(engine, max_wait=0.05) as g:
+            doomed = asyncio.ensure_future(g.analyze("cancelado"))
+            kept = asyncio.ensure_future(g.analyze(TEXTS[0]))
+            await asyncio.sleep(0)
+            doomed.cancel()
+            return await kept, doomed.cancelled()
+
+    decision, cancelled = asyncio.run(main())
+    assert cancelled and decision.contains_pii
+    assert seen == [TEXTS[0]]
+
+
+def test_module_level_analyze_stream():
+    async def main():
+        return [d async for d in analyze_stream(TEXTS[:4], GuardianEngine(use_ner=False))]
+
+    assert [d.contains_pii for d in asyncio.run(main())] == [True, False, True, True]
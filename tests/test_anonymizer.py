@@ -0,0 +1,31 @@
+import pytest
+
+from lai_guardian.core.anonymizer import redact_by_spans
+from lai_guardian.core.detector import Finding
+
+TEXT = "SEI 00015-01009853/2026-01 tel (61) 99876-5432"
+SEI = Finding("PROCESSO_SEI", "00015-01009853/2026-01", "BAIXO", 4, 26)
+CEP = Finding("CEP", "01009853", "MÉDIO", 10, 18)
+PHONE = Finding("TELEFONE", "(61) 99876-5432", "MÉDIO", 31, 46)
+
+
+def test_non_overlapping_spans():
+    assert redact_by_spans(TEXT, [PHONE, SEI]) == "SEI [PROCESSO_SEI_BAIXO_OMITIDO] tel [TELEFONE_MEDIO_OMITIDO]"
+
+
+@pytest.mark.parametrize("policy,tag", [
+    ("longest", "[PROCESSO_SEI_BAIXO_OMITIDO]"),
+    ("risk", "[CEP_MEDIO_OMITIDO]"),
+    ("union", "[PROCESSO_SEI+CEP_MEDIO_OMITIDO]"),
+])
+def test_overlap_policies_cover_the_union(policy, tag):
+    out = redact_by_spans(TEXT, [CEP, SEI, PHONE], policy=policy)
+    assert out == f"SEI {tag} tel [TELEFONE_MEDIO_OMITIDO]"
+
+
+def test_many_findings_in_long_text():
+    text = " ".join(f"n{i:05d}" for i in range(2000))
+    findings = [Finding("PROTOCOLO", text[i * 7 + 1:i * 7 + 6], "BAIXO", i * 7 + 1, i * 7 + 6) for i in range(2000)]
+    out = redact_by_spans(text, findings)
+    assert out.count("[PROTOCOLO_BAIXO_OMITIDO]") == 2000
+    assert not any(ch.isdigit() for ch in out)
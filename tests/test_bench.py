@@ -0,0 +1,21 @@
+from lai_guardian.bench.corpus import CorpusConfig, generate_corpus, to_frame
+from lai_guardian.bench.runner import compare, run_benchmarks
+from lai_guardian.core.validators import validate_cpf_mod11
+
+
+def test_corpus_is_seeded_and_labeled():
+    cfg = CorpusConfig(n_rows=300, seed=7, pii_density=0.5)
+    rows = generate_corpus(cfg)
+    assert [r.text for r in rows] == [r.text for r in generate_corpus(cfg)]
+    cpfs = [r.text[s:e] for r in rows for t, s, e in r.entities if t == "CPF"]
+    assert cpfs and all(validate_cpf_mod11(c) for c in cpfs)
+    df = to_frame(rows)
+    assert df["label_any_pii"].tolist() == [r.label for r in rows]
+    assert 0.3 < df["label_any_pii"].mean() < 0.7
+
+
+def test_runner_smoke():
+    res = run_benchmarks(CorpusConfig(n_rows=40), only=("detect", "redact"), ner_modes=(False,), isolate=False)
+    det = res["results"]["detect[no_ner]"]
+    assert det["rows"] == 40 and det["rows_per_sec"] > 0 and det["p99_ms"] >= det["p50_ms"]
+    assert compare(res, res)["detect[no_ner]"]["rows_per_sec"] == 1.0
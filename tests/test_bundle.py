@@ -0,0 +1,115 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from lai_guardian.io.bundle import STATE_FILE, find_previous_bundle, load_state, open_state, write_state
+from lai_guardian.pipeline import FullPipelineConfig, run_full_pipeline
+
+
+def _run(tmp_path, csv, name, **kw):
+    cfg = FullPipelineConfig(
+        input_path=str(csv), input_column="texto", no_ner=True, json_out="relatorio.json",
+        model_path=str(tmp_path / "sem_modelo.joblib"), bundle_dir=str(tmp_path / name), **kw,
+    )
+    return run_full_pipeline(cfg)
+
+
+def _trail(path):
+    with open(path, encoding="utf-8") as f:
+        rows = json.load(f)
+    for r in rows:
+        for fnd in r["findings"]:
+            fnd.pop("timestamp")
+    return rows
+
+
+def test_incremental_reuses_unchanged_rows(tmp_path):
+    csv = tmp_path / "pedidos.csv"
+    rows = ["Meu CPF é 529.982.247-25.", "Sem dados pessoais.", "email joao@exemplo.gov.br"]
+    pd.DataFrame({"id": [1, 2, 3], "texto": rows}).to_csv(csv, index=False)
+    _run(tmp_path, csv, "run_1", incremental=True, id_column="id")
+
+    rows[1] = "Ligue para (61) 99876-5432."
+    pd.DataFrame({"id": [1, 2, 3], "texto": rows}).to_csv(csv, index=False)
+    summary = _run(tmp_path, csv, "run_2", incremental=True, id_column="id")
+    assert summary["incremental"]["reused_rows"] == 2
+    assert summary["incremental"]["analyzed_rows"] == 1
+
+    full = _run(tmp_path, csv, "x_full", id_column="id")
+    assert "incremental" not in full
+    assert _trail(tmp_path / "run_2" / "relatorio.json") == _trail(tmp_path / "x_full" / "relatorio.json")
+    pd.testing.assert_frame_equal(
+        pd.read_excel(tmp_path / "run_2" / "auditoria.xlsx", sheet_name="auditoria"),
+        pd.read_excel(tmp_path / "x_full" / "auditoria.xlsx", sheet_name="auditoria"),
+    )
+
+
+def test_trail_streams_in_blocks_with_jsonl_default(tmp_path):
+    from lai_guardian.reports.trail import iter_trail
+
+    csv = tmp_path / "pedidos.csv"
+    rows = ["Meu CPF é 529.982.247-25.", "Sem dados pessoais.", "email joao@exemplo.gov.br"] * 3
+    pd.DataFrame({"texto": rows}).to_csv(csv, index=False)
+    assert FullPipelineConfig().json_out.endswith(".jsonl.gz")
+    blocks = run_full_pipeline(FullPipelineConfig(
+        input_path=str(csv), input_column="texto", no_ner=True, chunk_rows=2,
+        model_path=str(tmp_path / "sem_modelo.joblib"), bundle_dir=str(tmp_path / "blocos"),
+    ))
+    _run(tmp_path, csv, "inteiro")
+    streamed = list(iter_trail(blocks["outputs"]["json"]))
+    for r in streamed:
+        for fnd in r["findings"]:
+            fnd.pop("timestamp")
+    assert [r["row"] for r in streamed] == [0, 2, 3, 5, 6, 8]
+    assert streamed == _trail(tmp_path / "inteiro" / "relatorio.json")
+    pd.testing.assert_frame_equal(
+        pd.read_excel(blocks["outputs"]["excel"], sheet_name="auditoria"),
+        pd.read_excel(tmp_path / "inteiro" / "auditoria.xlsx", sheet_name="auditoria"),
+    )
+
+
+def test_previous_bundle_lookup_and_strict(tmp_path):
+    csv = tmp_path / "pedidos.csv"
+    pd.DataFrame({"id": [1, 2], "texto": ["Meu CPF é 529.982.247-25.", "Sem dados pessoais."]}).to_csv(csv, index=False)
+
+    # Sem estado anterior: aviso normalmente, erro com strict.
+    summary = _run(tmp_path, csv, "run_1", incremental=True, id_column="id")
+    assert summary["incremental"]["previous_bundle"] is None
+    assert any("nenhum estado anterior" in w for w in summary["warnings"])
+    with pytest.raises(RuntimeError, match="nenhum estado anterior"):
+        _run(tmp_path, csv, "run_0", incremental=True, id_column="id", strict=True, previous_bundle=str(tmp_path / "vazio"))
+
+    # Sem caminho explícito: o irmão mais recente com estado.jsonl.gz; diretórios sem estado são ignorados.
+    os.makedirs(tmp_path / "z_sem_estado")
+    os.utime(tmp_path / "run_1" / STATE_FILE, (1, 1))
+    _run(tmp_path, csv, "run_2", incremental=True, id_column="id")
+    summary = _run(tmp_path, csv, "run_3", incremental=True, id_column="id", strict=True)
+    assert os.path.basename(summary["incremental"]["previous_bundle"]) == "run_2"
+
+    # Caminho explícito vale mesmo fora do diretório-pai do bundle de saída.
+    other = tmp_path / "outro" / "run_4"
+    summary = _run(tmp_path, csv, os.path.join("outro", "run_4"), incremental=True, id_column="id",
+                   strict=True, previous_bundle=str(tmp_path / "run_1"))
+    assert summary["incremental"]["previous_bundle"] == str(tmp_path / "run_1")
+    assert summary["incremental"]["reused_rows"] == 2
+    assert other.is_dir()
+
+
+def test_interrupted_state_is_not_published(tmp_path):
+    ok = tmp_path / "run_1"
+    write_state(str(ok), "fp", None, [("k1", "h1", {"contains_pii": False})])
+
+    crashed = tmp_path / "run_2"
+    with pytest.raises(KeyboardInterrupt):
+        with open_state(str(crashed), "fp", None) as state:
+            for i in range(25_000):
+                state.write({"key": f"k{i}", "hash": "h", "decision": {}})
+            raise KeyboardInterrupt
+    assert not os.path.exists(crashed / STATE_FILE)
+    assert find_previous_bundle(str(tmp_path / "run_3")) == str(ok)
+
+    # Estado ilegível conta como "sem bundle anterior" (o pipeline avisa, ou falha com strict).
+    (ok / STATE_FILE).write_bytes(b"{corrompido\n")
+    assert load_state(str(ok)) is None
@@ -0,0 +1,54 @@
+from lai_guardian.core.cache import ResultCache
+from lai_guardian.core.engine import GuardianEngine
+
+TEXTS = [
+    "Meu CPF é 529.982.247-25, por favor retornem.",
+    "Sem dados pessoais aqui.",
+    "Meu CPF é 529.982.247-25, por favor retornem.",
+]
+
+
+def _strip_ts(decisions):
+    for d in decisions:
+        for f in d.findings:
+            f.pop("timestamp", None)
+    return decisions
+
+
+def test_cache_reuses_and_invalidates(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    plain = _strip_ts(GuardianEngine(use_ner=False).analyze_batch(TEXTS))
+
+    engine = GuardianEngine(use_ner=False, cache=ResultCache(path))
+    first = engine.analyze_many(TEXTS)
+    assert (engine.cache.hits, engine.cache.misses) == (0, 2)  # repetido no lote conta uma vez
+    assert all(f["timestamp"] for f in first[0].findings)
+    assert _strip_ts(first) == plain
+    engine.cache.close()
+
+    # Nova execução, mesmo arquivo: tudo vem do disco.
+    again = GuardianEngine(use_ner=False, cache=ResultCache(path))
+    assert _strip_ts(again.analyze_many(TEXTS)) == plain
+    assert (again.cache.hits, again.cache.misses) == (2, 0)
+
+    # Mudou a impressão digital do motor: nada é reaproveitado.
+    again.overlap_policy = "risk"
+    again.analyze_batch(TEXTS)
+    assert again.cache.misses == 2
+
+
+def test_sqlite_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / "c.sqlite"), max_items=2, max_bytes=2_000)
+    cache.put_many({f"k{i}": {"v": "x" * 100} for i in range(40)})
+    assert cache.stats()["disk_bytes"] <= 2_000
+    assert cache.get_many(["k39"]) and not cache.get_many(["k0"])
+
+
+def test_cache_skips_non_text_cells(tmp_path):
+    texts = [None, float("nan"), TEXTS[0], None]
+    plain = _strip_ts(GuardianEngine(use_ner=False).analyze_batch(texts))
+    engine = GuardianEngine(use_ner=False, cache=ResultCache(str(tmp_path / "cache.sqlite")))
+    assert _strip_ts(engine.analyze_batch(texts)) == plain
+    assert (engine.cache.hits, engine.cache.misses) == (0, 1)
+    assert _strip_ts(engine.analyze_batch(texts)) == plain
+    assert engine.cache.hits == 1
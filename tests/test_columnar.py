@@ -0,0 +1,46 @@
+import csv
+import os
+import random
+
+from lai_guardian.bench.corpus import CorpusConfig, generate_corpus
+from lai_guardian.core import columnar
+from lai_guardian.core.detector import HybridDetector
+from lai_guardian.core.engine import GuardianEngine
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "dataset_labeled.csv")
+
+
+def _texts():
+    with open(DATA, encoding="utf-8") as f:
+        texts = [row["text"] for row in csv.DictReader(f)]
+    texts += [r.text for r in generate_corpus(CorpusConfig(n_rows=1500, seed=5))]
+    rnd = random.Random(13)
+    alphabet = "0123456789 -./(),@xRGrua\n"
+    texts += ["".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 120))) for _ in range(2000)]
+    return texts
+
+
+def test_frame_matches_detector():
+    texts = _texts()
+    frame = columnar.detect_frame(texts)
+    assert list(frame.columns) == list(columnar.FINDING_COLUMNS)
+    assert columnar.findings_by_row(frame, len(texts)) == HybridDetector(use_ner=False).detect_batch(texts)
+
+
+def test_summary_columns_match_decisions():
+    texts = _texts()[:800]
+    decisions = GuardianEngine(use_ner=False).analyze_batch(texts)
+    ml_positive = [i % 7 == 0 and not d.findings for i, d in enumerate(decisions)]
+    out = columnar.summary_columns(columnar.findings_frame(decisions), len(decisions), ml_positive=ml_positive)
+    assert out["Qtd_Achados"].tolist() == [d.findings_count for d in decisions]
+    assert out["Tipos_Detectados"].tolist() == [d.types_detected for d in decisions]
+    assert out["Risco_Max"].tolist() == [d.max_risk for d in decisions]
+    assert out["Contem_Dados_Pessoais"].tolist() == [d.contains_pii or m for d, m in zip(decisions, ml_positive)]
+
+
+def test_columnar_engine_same_decisions():
+    texts = _texts()[:500] + [""]
+    plain = GuardianEngine(use_ner=False).analyze_batch(texts)
+    col = GuardianEngine(use_ner=False, columnar=True).analyze_batch(texts)
+    strip = lambda ds: [(d.contains_pii, d.redacted_text, [{k: v for k, v in f.items() if k != "timestamp"} for f in d.findings]) for d in ds]
+    assert strip(col) == strip(plain)
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from lai_guardian.core.detector import HybridDetector
+
+
+class _FakeNLP:
+    """Stand-in mínimo do spaCy: marca como PER toda ocorrência de 'Maria Souza'."""
+
+    def __init__(self):
+        self.pipe_calls = 0
+
+    def __call__(self, text):
+        ents = []
+        start = text.find("Maria Souza")
+        if start >= 0:
+            ents.append(SimpleNamespace(label_="PER", text="Maria Souza", start_char=start, end_char=start + 11))
+        return SimpleNamespace(ents=ents)
+
+    def pipe(self, texts, batch_size=64, n_process=1):
+        self.pipe_calls += 1
+        return (self(t) for t in texts)
+
+
+TEXTS = [
+    "Meu CPF é 529.982.247-25, falar com Maria Souza.",
+    None,
+    "Sem dados pessoais aqui.",
+    "Maria Souza, Rua das Flores bonitas, 123 telefone (61) 99876-5432",
+]
+
+
+def test_detect_batch_matches_detect():
+    det = HybridDetector(use_ner=False)
+    det._nlp, det._ner_ready = _FakeNLP(), True
+    assert det.detect_batch(TEXTS) == [det.detect(t) for t in TEXTS]
+    assert det._nlp.pipe_calls == 1
+    assert [f.tipo for f in det.detect_batch(TEXTS)[0]] == ["CPF", "NOME_PESSOA"]
+
+
+def test_profile_counts_rejections_and_keeps_output():
+    texts = ["CPF 111.111.111-11 e 529.982.247-25", "ano 2024 1234, tel (61) 99876-5432", "Maria Souza"]
+    plain = HybridDetector(use_ner=False)
+    det = HybridDetector(use_ner=False, profile=True, profile_top_n=2)
+    det._nlp, det._ner_ready = _FakeNLP(), True
+    plain._nlp, plain._ner_ready = _FakeNLP(), True
+    assert [det.detect(t) for t in texts] == [plain.detect(t) for t in texts]
+    assert det.detect_batch(texts) == plain.detect_batch(texts)
+
+    prof = det.profile.to_dict()
+    assert prof["texts"] == 6
+    assert prof["families"]["CPF"]["matched"] == 4 and prof["families"]["CPF"]["rejected"] == {"mod11": 2}
+    assert prof["families"]["NER"]["accepted"] == 2
+    assert len(prof["slowest"]) == 2 and "scan" in prof["slowest"][0]["breakdown"]
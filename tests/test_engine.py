@@ -0,0 +1,77 @@
+from lai_guardian.core.engine import GuardianEngine
+
+TEXTS = [
+    "Meu CPF é 529.982.247-25, por favor retornem.",
+    "Processo SEI 00015-01009853/2026-01, contato (61) 99876-5432.",
+    "Sem dados pessoais aqui.",
+    "email joao.silva@exemplo.gov.br",
+] * 5
+
+
+def _strip_ts(decisions):
+    for d in decisions:
+        for f in d.findings:
+            f.pop("timestamp", None)
+    return decisions
+
+
+def test_analyze_many_parallel_matches_serial():
+    engine = GuardianEngine(use_ner=False)
+    serial = engine.analyze_many(TEXTS, workers=1, chunk_size=3)
+    parallel = engine.analyze_many(TEXTS, workers=3, chunk_size=3)
+    assert _strip_ts(parallel) == _strip_ts(serial)
+    assert _strip_ts(serial) == _strip_ts([engine.analyze(t) for t in TEXTS])
+
+
+def test_analyze_many_merges_worker_profiles():
+    serial = GuardianEngine(use_ner=False, profile_rules=True)
+    serial.analyze_many(TEXTS[:4] * 3, workers=1, chunk_size=3)
+    parallel = GuardianEngine(use_ner=False, profile_rules=True)
+    parallel.analyze_many(TEXTS[:4] * 3, workers=2, chunk_size=1)
+    a, b = serial.detector.profile.to_dict(), parallel.detector.profile.to_dict()
+    assert a["texts"] == b["texts"] == 4  # repetidos são analisados uma vez
+    assert {k: v["matched"] for k, v in a["families"].items()} == {k: v["matched"] for k, v in b["families"].items()}
+
+
+def test_ml_backstop_scores_negatives_in_one_call():
+    from lai_guardian.bench.corpus import CorpusConfig, generate_corpus
+    from lai_guardian.ml.model import MLConfig, TextClassifier
+
+    rows = generate_corpus(CorpusConfig(n_rows=300, seed=5, pii_density=0.5))
+    clf = TextClassifier(MLConfig(min_df=1))
+    clf.train([r.text for r in rows], [r.label for r in rows])
+    calls = []
+    proba = clf.predict_proba
+    clf.predict_proba = lambda texts: calls.append(len(texts)) or proba(texts)
+
+    texts = TEXTS[:4] + [r.text for r in rows[:40]]
+    decisions = GuardianEngine(use_ner=False, ml_model=clf).analyze_batch(texts)
+    negatives = [i for i, d in enumerate(decisions) if not d.findings]
+    assert len(calls) == 1 and calls[0] == len(negatives)
+    assert all(d.ml_probability is None for d in decisions if d.findings)
+    expected = clf.predict([texts[i] for i in negatives])
+    assert [int(decisions[i].contains_pii) for i in negatives] == expected
+
+    strict = GuardianEngine(use_ner=False, ml_model=clf, ml_threshold=1.01).analyze_batch(texts)
+    assert not any(d.contains_pii for d in strict if not d.findings)
+
+
+def test_analyze_stream_reuses_one_pool(monkeypatch):
+    from lai_guardian.core import engine as engine_mod
+
+    created = []
+
+    class CountingPool(engine_mod.ProcessPoolExecutor):
+        def __init__(self, *a, **kw):
+            created.append(kw.get("max_workers"))
+            super().__init__(*a, **kw)
+
+    monkeypatch.setattr(engine_mod, "ProcessPoolExecutor", CountingPool)
+    engine = GuardianEngine(use_ner=False)
+    # O primeiro bloco tem só 2 pedaços; o pool ainda assim tem os 3 workers pedidos.
+    tables = [TEXTS[:4], ["outro texto 1234"] + TEXTS[4:14], TEXTS[14:]]
+    streamed = list(engine.analyze_stream(iter(tables), workers=3, chunk_size=2))
+    assert created == [3]
+    assert [len(d) for d in streamed] == [len(t) for t in tables]
+    expected = GuardianEngine(use_ner=False).analyze_many([t for table in tables for t in table])
+    assert _strip_ts([d for chunk in streamed for d in chunk]) == _strip_ts(expected)
@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from lai_guardian.reports.excel import export_excel, export_excel_stream
+
+DF = pd.DataFrame({
+    "Texto Mascarado": ["CPF 529.982.247-25", "nada", "tel (61) 99876-5432"],
+    "Contem_Dados_Pessoais": [True, False, True],
+    "Tipos_Detectados": ["CPF", "", "TELEFONE"],
+    "Risco_Max": ["ALTO", "", "MÉDIO"],
+    "Qtd_Achados": [1, 0, 1],
+})
+
+
+def test_streaming_export_matches_standard(tmp_path):
+    std, stream = tmp_path / "std.xlsx", tmp_path / "stream.xlsx"
+    export_excel(DF, str(std), streaming=False)
+    export_excel_stream([DF.iloc[:2], DF.iloc[2:]], str(stream))
+
+    a, b = load_workbook(std), load_workbook(stream)
+    assert a.sheetnames == b.sheetnames == ["resumo", "auditoria"]
+    rows = lambda ws: [r for r in ws.iter_rows(values_only=True)]
+    assert rows(a["auditoria"]) == rows(b["auditoria"])
+    resumo_a, resumo_b = rows(a["resumo"]), rows(b["resumo"])
+    assert resumo_a[:2] + resumo_a[3:] == resumo_b[:2] + resumo_b[3:]  # linha 3 = data/hora
+    assert b["auditoria"].auto_filter.ref == "A1:E4"
+    assert b["auditoria"]["A2"].fill.fgColor.rgb.endswith("F2F4F7")
+
+
+def test_sharded_export_sheets_and_files(tmp_path):
+    rows = lambda ws: [r for r in ws.iter_rows(values_only=True)]
+    # Célula com "" volta como None do xlsx.
+    body = [tuple(v if v != "" else None for v in r) for r in DF.itertuples(index=False, name=None)]
+
+    sheets = tmp_path / "abas.xlsx"
+    assert export_excel(DF, str(sheets), shard_rows=2) == [str(sheets)]
+    wb = load_workbook(sheets)
+    assert wb.sheetnames == ["resumo", "auditoria", "auditoria_2"]
+    assert rows(wb["auditoria"])[1:] + rows(wb["auditoria_2"])[1:] == body
+    assert rows(wb["auditoria_2"])[0] == tuple(DF.columns)
+    resumo = rows(wb["resumo"])
+    assert resumo[4][1] == 3 and resumo[5][1] == 2
+    assert ("auditoria_2", 1, 1) in [r[:3] for r in resumo]
+
+    index = tmp_path / "auditoria.xlsx"
+    written = export_excel(DF, str(index), shard_rows=2, shard_files=True, workers=2)
+    assert written == [str(index), str(tmp_path / "auditoria_001.xlsx"), str(tmp_path / "auditoria_002.xlsx")]
+    parts = [load_workbook(p) for p in written[1:]]
+    assert [r for wb in parts for r in rows(wb["auditoria"])[1:]] == body
+    resumo = rows(load_workbook(index)["resumo"])
+    assert resumo[4][1] == 3 and resumo[5][1] == 2
+    assert [r[:3] for r in resumo[-2:]] == [("auditoria_001.xlsx", 2, 1), ("auditoria_002.xlsx", 1, 1)]
+
+
+def test_audit_writer_in_blocks_matches_export_excel(tmp_path, monkeypatch):
+    from lai_guardian.reports import excel
+
+    rows = lambda ws: [r for r in ws.iter_rows(values_only=True)]
+    blocks = [DF.iloc[:1], DF.iloc[1:3], DF.iloc[3:]]
+    for label, kw in (("small", {}), ("shards", {"shard_rows": 2}), ("files", {"shard_rows": 2, "shard_files": True})):
+        whole, parts = tmp_path / f"{label}_a.xlsx", tmp_path / f"{label}_b.xlsx"
+        expected = export_excel(DF, str(whole), **kw)
+        with excel.ExcelAuditWriter(str(parts), **kw) as xls:
+            for block in blocks:
+                xls.write(block)
+        assert len(xls.written) == len(expected)
+        for a, b in zip(expected, xls.written):
+            wa, wb = load_workbook(a), load_workbook(b)
+            assert wa.sheetnames == wb.sheetnames
+            for name in wa.sheetnames:
+                ra, rb = rows(wa[name]), rows(wb[name])
+                if name == "resumo":
+                    ra, rb = ra[:2] + ra[3:], rb[:2] + rb[3:]  # linha 3 = data/hora
+                    ra = [tuple(str(v).replace(os.path.basename(whole)[:-5], "") for v in r) for r in ra]
+                    rb = [tuple(str(v).replace(os.path.basename(parts)[:-5], "") for v in r) for r in rb]
+                assert ra == rb, (label, name)
+
+    # Passando de STREAMING_MIN_ROWS, o que estava em memória segue para o modo streaming.
+    monkeypatch.setattr(excel, "STREAMING_MIN_ROWS", 2)
+    with excel.ExcelAuditWriter(str(tmp_path / "stream.xlsx")) as xls:
+        for block in blocks:
+            xls.write(block)
+    assert isinstance(xls._sink, excel.StreamingExcelExporter)
+    assert rows(load_workbook(tmp_path / "stream.xlsx")["auditoria"]) == rows(load_workbook(tmp_path / "small_a.xlsx")["auditoria"])
@@ -0,0 +1,60 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from lai_guardian.core.columnar import detect_frame
+from lai_guardian.pipeline import FullPipelineConfig, run_full_pipeline
+from lai_guardian.reports.findings import TIPO_CATEGORIES, read_findings, to_columnar, write_findings
+
+TEXTS = ["Meu CPF é 529.982.247-25.", "Sem dados pessoais.", "email joao@exemplo.gov.br, tel (61) 99876-5432"]
+
+
+def test_to_columnar_types():
+    cols = to_columnar(detect_frame(TEXTS), ids=["a", "b", "c"])
+    assert str(cols["row"].dtype) == "int32" and str(cols["start"].dtype) == "int32"
+    assert list(cols["tipo"].cat.categories[: len(TIPO_CATEGORIES)]) == list(TIPO_CATEGORIES)
+    assert cols["id"].tolist() == ["a", "c", "c"]
+
+
+@pytest.mark.parametrize("name", ["achados.parquet", "achados.arrow"])
+def test_roundtrip(tmp_path, name):
+    pytest.importorskip("pyarrow")
+    frame = detect_frame(TEXTS)
+    ts = datetime.datetime(2026, 1, 31, 12, 0)
+    path = write_findings(frame, str(tmp_path / name), run_timestamp=ts, meta={"input": "x.csv"})
+    table = read_findings(path)
+    assert str(table.schema.field("tipo").type) == "dictionary<values=string, indices=int8, ordered=0>"
+    assert table.schema.metadata[b"lai_guardian.run_timestamp"] == ts.isoformat().encode()
+    back = table.to_pandas()
+    assert back["tipo"].astype(str).tolist() == frame["tipo"].tolist()
+    assert back[["row", "start", "end"]].values.tolist() == frame[["row", "start", "end"]].values.tolist()
+    assert set(back["run_ts"]) == {pd.Timestamp(ts)}
+
+
+def test_pipeline_writes_or_warns(tmp_path):
+    csv = tmp_path / "pedidos.csv"
+    pd.DataFrame({"texto": TEXTS}).to_csv(csv, index=False)
+    summary = run_full_pipeline(FullPipelineConfig(
+        input_path=str(csv), input_column="texto", no_ner=True, json_out="relatorio.json",
+        findings_out="achados.parquet",
+        model_path=str(tmp_path / "sem_modelo.joblib"), bundle_dir=str(tmp_path / "run"),
+    ))
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        assert any("pyarrow" in w for w in summary["warnings"])
+    else:
+        assert read_findings(summary["outputs"]["findings"]).num_rows == len(detect_frame(TEXTS))
+
+
+def test_pipeline_findings_off_by_default(tmp_path):
+    # Sem pedir o arquivo colunar, nem aviso nem falha em --strict quando falta pyarrow.
+    csv = tmp_path / "pedidos.csv"
+    pd.DataFrame({"texto": TEXTS}).to_csv(csv, index=False)
+    summary = run_full_pipeline(FullPipelineConfig(
+        input_path=str(csv), input_column="texto", no_ner=True, json_out="relatorio.json", strict=True,
+        model_path=str(tmp_path / "sem_modelo.joblib"), bundle_dir=str(tmp_path / "run"),
+    ))
+    assert "findings" not in summary["outputs"]
+    assert not any("pyarrow" in w for w in summary["warnings"])
@@ -0,0 +1,23 @@
+import os
+
+import pandas as pd
+import pytest
+
+from lai_guardian.io.loader import iter_table, load_table, read_header
+
+RAW = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
+
+
+@pytest.mark.parametrize("name,col", [("AMOSTRA_e-SIC.xlsx", "Texto Mascarado"), ("dataset_labeled.csv", "text")])
+def test_iter_table_matches_load_table(name, col):
+    path = os.path.join(RAW, name)
+    chunks = list(iter_table(path, col, chunk_rows=7))
+    assert all(len(c.df) <= 7 for c in chunks)
+    pd.testing.assert_frame_equal(pd.concat([c.df for c in chunks]), load_table(path, col).df)
+
+
+def test_iter_table_validates_header_only():
+    path = os.path.join(RAW, "dataset_labeled.csv")
+    assert "label_any_pii" in read_header(path)
+    with pytest.raises(ValueError):
+        next(iter_table(path, "text", label_col="nao_existe"))
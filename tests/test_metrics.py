@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+
+from lai_guardian.core.metrics import (
+    bootstrap_counts, calculate, confusion_counts, label_matrix, per_type_report, to_dict, update_metrics_file,
+)
+
+
+def test_confusion_counts_matches_per_column_loop():
+    rng = np.random.default_rng(1)
+    t = rng.random((500, 4)) < 0.3
+    p = t ^ (rng.random((500, 4)) < 0.1)
+    counts = confusion_counts(t, p)
+    for j in range(4):
+        m = calculate(t[:, j].astype(int).tolist(), p[:, j].astype(int).tolist())
+        assert counts[j].tolist() == [m.vp, m.fp, m.fn, m.vn]
+        assert sum(1 for a, b in zip(t[:, j], p[:, j]) if a and not b) == m.fn
+
+
+def test_bootstrap_resamples_rows():
+    rng = np.random.default_rng(2)
+    t = rng.random((300, 3)) < 0.4
+    p = t ^ (rng.random((300, 3)) < 0.15)
+    boot = bootstrap_counts(t, p, n_boot=200, seed=7)
+    assert boot.shape == (200, 3, 4) and (boot.sum(axis=2) == 300).all()
+    assert (boot == bootstrap_counts(t, p, n_boot=200, seed=7)).all()
+    # Mesma reamostragem de linhas para todos os tipos: os positivos reais sorteados batem com o rótulo.
+    assert np.allclose(boot[:, :, [0, 2]].sum(axis=2).mean(axis=0) / 300, t.mean(axis=0), atol=0.02)
+
+    report = per_type_report(t, p, ["a", "b", "c"], n_boot=200)
+    for entry in list(report["tipos"].values()) + [report["micro"]]:
+        lo, hi = entry["ic"]["f1"]
+        assert lo <= entry["metricas"]["f1"] <= hi
+
+
+def test_label_matrix_maps_types_to_labels():
+    labels = {"label_cpf": ("CPF",), "label_process": ("PROCESSO_SEI", "PROTOCOLO"), "label_any": ("CPF", "E-MAIL")}
+    m = label_matrix([["CPF"], [], ["PROTOCOLO", "PROCESSO_SEI"], ["E-MAIL", "NOME"]], labels)
+    assert m.astype(int).tolist() == [[1, 0, 1], [0, 0, 0], [0, 1, 0], [0, 0, 1]]
+
+
+def test_update_metrics_file_keeps_other_keys(tmp_path):
+    path = str(tmp_path / "sub" / "metrics.json")
+    update_metrics_file(path, {"detector": {"micro": 1}})
+    update_metrics_file(path, to_dict(calculate([1, 0, 1], [1, 0, 0])))
+    update_metrics_file(path, {"detector_profile": {"CPF": 2}})
+    with open(path, encoding="utf-8") as f:
+        metrics = json.load(f)
+    assert metrics["detector"] == {"micro": 1}
+    assert metrics["contagens"] == {"vp": 1, "fp": 0, "fn": 1, "vn": 1}
+    assert metrics["detector_profile"] == {"CPF": 2}
@@ -0,0 +1,144 @@
+import pytest
+
+from lai_guardian.bench.corpus import CorpusConfig, generate_corpus, to_frame
+from lai_guardian.ml.model import MLConfig, TextClassifier
+from lai_guardian.ml.train import train_from_table
+
+
+def _csv(tmp_path, n, seed):
+    path = tmp_path / f"treino_{seed}.csv"
+    to_frame(generate_corpus(CorpusConfig(n_rows=n, seed=seed, pii_density=0.5))).to_csv(path, index=False)
+    return str(path)
+
+
+def test_hashing_streaming_and_warm_start(tmp_path):
+    rows = generate_corpus(CorpusConfig(n_rows=400, seed=99, pii_density=0.5))
+    texts, labels = [r.text for r in rows], [r.label for r in rows]
+
+    clf = TextClassifier(MLConfig(mode="hashing", n_features=2 ** 16))
+    seen = train_from_table(clf, _csv(tmp_path, 1500, 1), "Texto Mascarado", "label_any_pii", chunk_rows=200, epochs=3)
+    assert seen == 4500
+    acc = sum(p == y for p, y in zip(clf.predict(texts), labels)) / len(labels)
+    assert acc > 0.8
+
+    path = str(tmp_path / "model.joblib")
+    clf.save(path)
+    warm = TextClassifier.load(path)
+    before = warm.fingerprint()
+    train_from_table(warm, _csv(tmp_path, 300, 2), "Texto Mascarado", "label_any_pii", chunk_rows=100)
+    assert warm.class_counts[0] + warm.class_counts[1] == 4800
+    assert warm.fingerprint() != before
+
+
+def test_tfidf_has_no_partial_fit():
+    with pytest.raises(ValueError):
+        TextClassifier().partial_fit(["a"], [0])
+
+
+def test_compact_artifact_and_registry(tmp_path):
+    import os
+
+    from lai_guardian.ml import registry
+
+    rows = generate_corpus(CorpusConfig(n_rows=400, seed=7, pii_density=0.5))
+    texts, labels = [r.text for r in rows], [r.label for r in rows]
+    clf = TextClassifier(MLConfig(min_df=1))
+    clf.train(texts, labels)
+    full, compact = str(tmp_path / "full.joblib"), str(tmp_path / "compact.joblib")
+    clf.save(full)
+    clf.save(compact, compact=True)
+    assert os.path.getsize(compact) < os.path.getsize(full)
+
+    registry.clear()
+    model = registry.load_model(compact)
+    assert model.compact and registry.load_model(compact) is model
+    assert model.predict(texts) == clf.predict(texts)
+    assert max(abs(a - b) for a, b in zip(model.predict_proba(texts), clf.predict_proba(texts))) < 1e-5
+    assert registry.model_ref(model) == (compact, model.fingerprint())
+    with pytest.raises(ValueError):
+        model.train(texts, labels)
+
+    clf.save(compact, compact=True, prune=0.05)  # regravar o arquivo troca a entrada do registro
+    os.utime(compact, ns=(1, 1))
+    pruned = registry.load_model(compact)
+    assert pruned is not model and registry.model_ref(model) is None
+    assert len(pruned.pipe.vectorizer.vocabulary_) < len(clf.pipe.named_steps["tfidf"].vocabulary_)
+
+
+def test_tune_reuses_counts_without_changing_results():
+    import numpy as np
+
+    from lai_guardian.ml.tune import SearchSpace, _fold_task, tune
+
+    rows = generate_corpus(CorpusConfig(n_rows=300, seed=11, pii_density=0.5))
+    texts, labels = [r.text for r in rows], [r.label for r in rows]
+    space = SearchSpace(min_df=(1, 2), ngram_max=(1, 2), C=(1.0, 4.0), thresholds=(0.3, 0.5))
+
+    # Colunas filtradas por frequência de documento == TfidfVectorizer(min_df=k) treinado do zero.
+    y = np.asarray(labels)
+    by_task = _fold_task(0, texts[:200], y[:200], texts[200:], y[200:], 2, space)
+    for row in by_task:
+        clf = TextClassifier(MLConfig(min_df=row["min_df"], ngram_max=2, C=row["C"]))
+        clf.train(texts[:200], labels[:200])
+        pred = np.asarray(clf.predict_proba(texts[200:])) >= row["threshold"]
+        assert row["vp"] == int((pred & (y[200:] == 1)).sum()) and row["fp"] == int((pred & (y[200:] == 0)).sum())
+
+    result = tune(texts, labels, space, folds=3)
+    assert len(result.table) == space.size() * len(space.thresholds)
+    assert (result.table[["vp", "fp", "fn", "vn"]].sum(axis=1) == len(texts)).all()
+    assert result.threshold in space.thresholds and result.score == result.table["score"].max()
+
+
+def test_pipeline_applies_tuned_threshold_unless_set(tmp_path):
+    import json
+
+    import pandas as pd
+
+    from lai_guardian.bench.corpus import CorpusConfig, generate_corpus
+    from lai_guardian.pipeline import FullPipelineConfig, run_full_pipeline
+
+    rows = generate_corpus(CorpusConfig(n_rows=120, seed=2, pii_density=0.5))
+    csv = tmp_path / "treino.csv"
+    pd.DataFrame({"text": [r.text for r in rows], "label": [r.label for r in rows]}).to_csv(csv, index=False)
+
+    def run(name, **kw):
+        summary = run_full_pipeline(FullPipelineConfig(
+            train_csv=str(csv), eval_csv=str(csv), tune=True, tune_folds=2, no_ner=True,
+            bundle_dir=str(tmp_path / name), **kw,
+        ))
+        with open(summary["outputs"]["metrics"], encoding="utf-8") as f:
+            return summary, json.load(f)
+
+    summary, metrics = run("tuned")
+    assert metrics["ml_threshold"] == summary["tuning"]["threshold"]
+    _, metrics = run("fixed", ml_threshold=0.7)
+    assert metrics["ml_threshold"] == 0.7
+
+
+def test_evaluate_command_uses_ml_threshold(tmp_path, monkeypatch):
+    import json
+    import sys
+
+    import pandas as pd
+
+    from lai_guardian import cli
+    from lai_guardian.pipeline import FullPipelineConfig, run_full_pipeline
+
+    rows = generate_corpus(CorpusConfig(n_rows=120, seed=2, pii_density=0.5))
+    csv = tmp_path / "treino.csv"
+    pd.DataFrame({"text": [r.text for r in rows], "label": [r.label for r in rows]}).to_csv(csv, index=False)
+    summary = run_full_pipeline(FullPipelineConfig(
+        train_csv=str(csv), eval_csv=str(csv), no_ner=True, ml_threshold=0.3, bundle_dir=str(tmp_path / "run"),
+    ))
+    with open(summary["outputs"]["metrics"], encoding="utf-8") as f:
+        expected = json.load(f)
+
+    report = tmp_path / "avaliacao.json"
+    monkeypatch.setattr(sys, "argv", [
+        "lai_guardian", "evaluate", "--csv", str(csv), "--model", summary["outputs"]["model"],
+        "--report", str(report), "--ml-threshold", "0.3",
+    ])
+    cli.main()
+    metrics = json.loads(report.read_text(encoding="utf-8"))
+    assert metrics["ml_threshold"] == 0.3
+    assert metrics["contagens"] == expected["contagens"]
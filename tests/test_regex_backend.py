@@ -0,0 +1,67 @@
+import csv
+import os
+import random
+import re
+
+import pytest
+
+from lai_guardian.bench.corpus import CorpusConfig, generate_corpus
+from lai_guardian.core import triage
+from lai_guardian.core.detector import HybridDetector
+from lai_guardian.core.patterns import RULES
+from lai_guardian.core.regex_backend import make_scanner, needs_re, translate
+from lai_guardian.core.scanner import RuleScanner
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "dataset_labeled.csv")
+
+UNICODE_CASES = [
+    "CPF ٥٢٩.٩٨٢.٢٤٧-٢٥ em dígitos arábicos",
+    "telefone (61)\xa099876-5432 com espaço não separável",
+    "nº12345-678 e n°70040-010",
+    "contato: ã.foo@x.com ou joão@exemplo.gov.br",
+    "RG: 12.345.678-X; İdentidade 1.234.567 ſ K",
+    "Cartão 4111 1111 1111 1111",
+]
+
+
+def _texts():
+    with open(DATA, encoding="utf-8") as f:
+        texts = [row["text"] for row in csv.DictReader(f)]
+    texts += [r.text for r in generate_corpus(CorpusConfig(n_rows=2000, seed=5, pii_density=0.9))]
+    rnd = random.Random(17)
+    alphabet = "0123456789٣ \xa0-./(),@xXçãéRGrgIdentidadeRua\n"
+    texts += ["".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 80))) for _ in range(2000)]
+    return texts + UNICODE_CASES
+
+
+@pytest.mark.parametrize("backend,module", [("re2", "re2"), ("hyperscan", "hyperscan")])
+def test_backend_spans_match_re(backend, module):
+    pytest.importorskip(module)
+    reference = RuleScanner()
+    scanner = make_scanner(backend)
+    assert scanner.backend == backend
+    for t in _texts():
+        assert scanner.scan(t) == reference.scan(t), t
+        only = triage.families(t)
+        assert scanner.scan(t, only) == reference.scan(t, only), t
+
+
+def test_translate_keeps_ascii_semantics():
+    for _, pattern in RULES:
+        src = translate(pattern)
+        assert "\\d" not in src and "\\s" not in src
+        compiled = re.compile(src, pattern.flags)
+        for t in ("CPF 529.982.247-25", "Rua A, 12\x0b\x1c 70040-010", "x@y.com (61) 3344-5566"):
+            assert [m.span() for m in compiled.finditer(t)] == [m.span() for m in pattern.finditer(t)]
+    with pytest.raises(ValueError):
+        translate(re.compile(r"(?<=a)\d+"))
+
+
+def test_needs_re_and_default_backend():
+    assert not needs_re("CPF 529.982.247-25, pedido de informação")
+    assert needs_re("CPF ٥٢٩")
+    assert needs_re("ã.foo@x.com")
+    assert make_scanner("re").backend == "re"
+    assert HybridDetector(use_ner=False, regex_backend="re").regex_backend == "re"
+    with pytest.raises(ValueError):
+        make_scanner("pcre")
@@ -0,0 +1,90 @@
+import csv
+import os
+import random
+
+from lai_guardian.core.detector import (
+    HybridDetector, Finding, DEFAULT_RISK, SEI_OR_CNJ, YEARS, IDISH_PUNCT,
+)
+from lai_guardian.core.patterns import (
+    CPF, EMAIL, CEP, CARD, RG_CTX, PHONE, ADDRESS,
+    PROCESSO_SEI, PROCESSO_CNJ, PROTOCOLO_NUM, KW_PROCESSO,
+)
+from lai_guardian.core.validators import validate_cpf_mod11, only_digits
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "dataset_labeled.csv")
+
+EDGE_CASES = [
+    "",
+    "Processo SEI 00015-01009853/2026-01, contato (61) 99876-5432.",
+    "CPF 529.982.247-25 52998224725 e 529.982.247-25",
+    "Rua das Flores bonitas, 123 casa amarela perto, 45 Bloco B, 7",
+    "autos 0001234-55.2024.8.07.0001 tel 3344-5566 e 2024 1234",
+    "RG: 12.345.678-X, identidade 1234567-8 reg geral 9.876.543-2",
+    "Cartão 4111 1111 1111 1111 e 4111-1111-1111-1111, CEP 70040-010 ou 70040010",
+    "email joao.silva@exemplo.gov.br; maria@x.com",
+    "protocolo 2024/000123 e 12345-678 sem contexto 98765/2023-01",
+    "SQS 308 Bloco C, 301 Asa Sul, Brasília 12345-01009853/2026-01 9999-8888",
+]
+
+
+def _reference_detect(t):
+    """Versão multi-passada original (só regras), usada como oráculo."""
+    findings = []
+    for m in PROCESSO_SEI.finditer(t):
+        findings.append(Finding("PROCESSO_SEI", m.group(0), DEFAULT_RISK["PROCESSO_SEI"], m.start(0), m.end(0)))
+    for m in PROCESSO_CNJ.finditer(t):
+        findings.append(Finding("PROCESSO_CNJ", m.group(0), DEFAULT_RISK["PROCESSO_CNJ"], m.start(0), m.end(0)))
+    for m in PROTOCOLO_NUM.finditer(t):
+        if KW_PROCESSO.search(t[max(0, m.start(0) - 20):min(len(t), m.end(0) + 20)]):
+            findings.append(Finding("PROTOCOLO", m.group(0), DEFAULT_RISK["PROTOCOLO"], m.start(0), m.end(0)))
+    for m in CPF.finditer(t):
+        if validate_cpf_mod11(m.group(1)):
+            findings.append(Finding("CPF", m.group(1), DEFAULT_RISK["CPF"], m.start(1), m.end(1)))
+    for m in RG_CTX.finditer(t):
+        findings.append(Finding("RG", m.group(1), DEFAULT_RISK["RG"], m.start(1), m.end(1)))
+    for m in ADDRESS.finditer(t):
+        if len(m.group(1).split(",")[0].strip()) >= 6:
+            findings.append(Finding("ENDEREÇO", m.group(1), DEFAULT_RISK["ENDEREÇO"], m.start(1), m.end(1)))
+    for m in CEP.finditer(t):
+        findings.append(Finding("CEP", m.group(0), DEFAULT_RISK["CEP"], m.start(0), m.end(0)))
+    for m in EMAIL.finditer(t):
+        findings.append(Finding("E-MAIL", m.group(0), DEFAULT_RISK["E-MAIL"], m.start(0), m.end(0)))
+    for m in PHONE.finditer(SEI_OR_CNJ.sub(" ", t)):
+        raw = m.group(0)
+        digits = only_digits(raw)
+        if len(digits) < 8 or (len(digits) == 8 and digits[:4] in YEARS):
+            continue
+        if len(digits) == 8 and not any(c in raw for c in "-() "):
+            continue
+        if IDISH_PUNCT.search(raw):
+            continue
+        findings.append(Finding("TELEFONE", raw, DEFAULT_RISK["TELEFONE"], m.start(0), m.end(0)))
+    for m in CARD.finditer(t):
+        findings.append(Finding("CARTÃO", m.group(0), DEFAULT_RISK["CARTÃO"], m.start(0), m.end(0)))
+    out, seen = [], set()
+    for f in sorted(findings, key=lambda f: (f.start, f.end, f.tipo)):
+        if (f.tipo, f.start, f.end, f.valor) not in seen:
+            seen.add((f.tipo, f.start, f.end, f.valor))
+            out.append(f)
+    return out
+
+
+def _corpus():
+    with open(DATA, encoding="utf-8") as f:
+        texts = [row["text"] for row in csv.DictReader(f)]
+    return EDGE_CASES + texts + [" ".join(EDGE_CASES)]
+
+
+def test_single_pass_matches_multi_pass():
+    det = HybridDetector(use_ner=False)
+    for t in _corpus():
+        assert det.detect(t) == _reference_detect(t), t
+
+
+def test_single_pass_matches_multi_pass_fuzz():
+    det = HybridDetector(use_ner=False)
+    rnd = random.Random(7)
+    alphabet = "0123456789 -./(),@xRGrua\n"
+    for _ in range(2000):
+        t = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 120)))
+        assert det.detect(t) == _reference_detect(t), t
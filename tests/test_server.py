@@ -0,0 +1,102 @@
+import json
+import threading
+import urllib.request
+
+from lai_guardian.core.engine import GuardianEngine
+from lai_guardian.ml.model import TextClassifier
+from lai_guardian.server import GuardianService, make_server
+
+TEXTS = ["Meu CPF é 529.982.247-25.", "Sem dados pessoais aqui.", "email joao@exemplo.gov.br"]
+
+
+def _post(base, path, payload):
+    req = urllib.request.Request(base + path, data=json.dumps(payload).encode(), method="POST",
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req) as r:
+        return json.loads(r.read())
+
+
+def _strip_ts(d):
+    for f in d["findings"]:
+        f.pop("timestamp")
+    return d
+
+
+def test_serve_single_and_batch_on_loopback():
+    service = GuardianService(GuardianEngine(use_ner=False), max_wait=0.05)
+    server = make_server(service, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        expected = [_strip_ts(r) for r in _post(base, "/analyze/batch", {"texts": TEXTS})["results"]]
+        # Pedidos simultâneos caem no mesmo lote e cada um recebe a sua resposta.
+        got = [None] * len(TEXTS)
+        threads = [threading.Thread(target=lambda i=i: got.__setitem__(i, _post(base, "/analyze", {"text": TEXTS[i]})))
+                   for i in range(len(TEXTS))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert [_strip_ts(g) for g in got] == expected
+        assert _post(base, "/redact", {"text": TEXTS[0]})["redacted_text"] == expected[0]["redacted_text"]
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def test_model_hot_reload(tmp_path):
+    path = str(tmp_path / "model.joblib")
+    X, y = ["cpf do cidadão", "relatório anual"] * 4, [1, 0] * 4
+    first = TextClassifier()
+    first.train(X, y)
+    first.save(path)
+
+    engine = GuardianEngine(use_ner=False, ml_model=TextClassifier.load(path))
+    service = GuardianService(engine, model_path=path, reload_interval=0)
+    try:
+        before = service.health()["model"]
+        assert not service.reloader.check()
+        with open(path, "wb") as f:
+            f.write(b"gravando...")  # arquivo pela metade: mantém o modelo atual
+        assert not service.reloader.check() and service.health()["model"] == before
+        second = TextClassifier()
+        second.train(X, [0, 1] * 4)
+        second.save(path)
+        assert service.reloader.check()
+        assert service.health()["model"] not in (None, before)
+    finally:
+        service.close()
+
+
+def test_engine_error_returns_500(capsys):
+    import urllib.error
+
+    class Broken(GuardianEngine):
+        def analyze_batch(self, texts, redact=True):
+            raise KeyError("quebrado")
+
+    service = GuardianService(Broken(use_ner=False), max_wait=0.01)
+    server = make_server(service, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        try:
+            _post(base, "/analyze", {"text": TEXTS[0]})
+        except urllib.error.HTTPError as e:
+            assert e.code == 500
+            assert "KeyError" in json.loads(e.read())["error"]
+        else:
+            raise AssertionError("esperava HTTP 500")
+        # O serviço continua de pé depois do erro.
+        assert _get_health(base)["status"] == "ok"
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+    assert "KeyError" in capsys.readouterr().err
+
+
+def _get_health(base):
+    with urllib.request.urlopen(base + "/health") as r:
+        return json.loads(r.read())
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+from lai_guardian import cli
+from lai_guardian.core import anonymizer, regex_backend
+
+# Meta de tempo de import do CLI (medida com python -X importtime). Hoje fica perto de 20 ms;
+# a folga cobre máquinas de CI lentas, mas não a volta de pandas/sklearn (~2 s).
+STARTUP_TARGET_US = 300_000
+HEAVY = ("pandas", "numpy", "sklearn", "scipy", "openpyxl", "rich", "spacy", "joblib")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _importtime(code):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=ROOT, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_startup_is_light():
+    times = _importtime("import lai_guardian.cli; lai_guardian.cli.build_parser()")
+    loaded = sorted(m for m in times if m.split(".")[0] in HEAVY)
+    assert loaded == [], f"CLI importou dependências pesadas no startup: {loaded}"
+    assert times["lai_guardian.cli"] < STARTUP_TARGET_US
+
+
+def test_cli_overlap_policies_mirror():
+    assert cli.OVERLAP_POLICIES == anonymizer.OVERLAP_POLICIES
+    assert cli.DEFAULT_OVERLAP_POLICY == anonymizer.DEFAULT_OVERLAP_POLICY
+    assert cli.REGEX_BACKENDS == regex_backend.BACKENDS
@@ -0,0 +1,41 @@
+import pytest
+
+from lai_guardian.reports.trail import JsonlTrailWriter, find_row, iter_trail, open_trail
+
+ROWS = [0, 3, 4, 10, 11, 57, 200]
+
+
+@pytest.mark.parametrize("name", ["trilha.jsonl", "trilha.jsonl.gz"])
+def test_trail_roundtrip_and_seek(tmp_path, name):
+    path = str(tmp_path / name)
+    with open_trail(path) as trail:
+        for r in ROWS:
+            trail.write({"row": r, "public_text": "ação " * r})
+    assert [rec["row"] for rec in iter_trail(path)] == ROWS
+    assert find_row(path, 57)["public_text"] == "ação " * 57
+    assert find_row(path, 5) is None
+    assert find_row(path, 0)["row"] == 0
+
+
+def test_trail_survives_truncated_tail(tmp_path):
+    path = tmp_path / "trilha.jsonl"
+    with JsonlTrailWriter(str(path), flush_every=1) as trail:
+        for r in ROWS:
+            trail.write({"row": r})
+    with open(path, "ab") as f:
+        f.write(b'{"row": 300, "pub')  # escrita interrompida
+    assert [rec["row"] for rec in iter_trail(str(path))] == ROWS
+    assert find_row(str(path), 200) == {"row": 200}
+
+
+@pytest.mark.parametrize("name", ["trilha.jsonl.gz", "trilha.jsonl.zst"])
+def test_compressed_trail_survives_missing_end(tmp_path, name):
+    if name.endswith(".zst"):
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / name)
+    trail = JsonlTrailWriter(path, flush_every=1000)
+    for r in range(2500):
+        trail.write({"row": r})  # execução interrompida: sem close(), só os flushes periódicos
+    assert [rec["row"] for rec in iter_trail(path)] == list(range(2000))
+    assert find_row(path, 1999) == {"row": 1999}
+    trail.close()
@@ -0,0 +1,42 @@
+import csv
+import os
+import random
+
+from lai_guardian.bench.corpus import CorpusConfig, generate_corpus
+from lai_guardian.core import triage
+from lai_guardian.core.detector import HybridDetector
+from lai_guardian.core.scanner import RuleScanner
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "dataset_labeled.csv")
+
+
+def _texts():
+    with open(DATA, encoding="utf-8") as f:
+        texts = [row["text"] for row in csv.DictReader(f)]
+    texts += [r.text for r in generate_corpus(CorpusConfig(n_rows=2000, seed=3))]
+    rnd = random.Random(11)
+    alphabet = "0123456789٣ -./(),@xXRGrgIdentidadeRua\n"
+    texts += ["".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 80))) for _ in range(3000)]
+    return texts
+
+
+def test_triage_never_drops_a_rule():
+    scanner = RuleScanner()
+    texts = _texts()
+    gates = triage.families_batch(texts)
+    assert gates == [triage.families(t) for t in texts]
+    skipped = 0
+    for t, only in zip(texts, gates):
+        full = scanner.scan(t)
+        assert {name for name, spans in full.items() if spans} <= only, t
+        assert scanner.scan(t, only) == full, t
+        skipped += len(triage.ALL - only)
+    assert skipped > 0
+
+
+def test_detector_with_and_without_triage():
+    texts = _texts() + [None]
+    plain = HybridDetector(use_ner=False, triage=False)
+    gated = HybridDetector(use_ner=False)
+    assert gated.detect_batch(texts) == plain.detect_batch(texts)
+    assert [gated.detect(t) for t in texts] == [plain.detect(t) for t in texts]
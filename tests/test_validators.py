@@ -5,3 +5,25 @@ def test_cpf_valid():
 
 def test_cpf_invalid():
     assert validate_cpf_mod11("111.111.111-11") is False
+
+def test_other_documents():
+    from lai_guardian.core.validators import validate_cnh, validate_cnpj, validate_luhn, validate_titulo_eleitor
+    assert validate_cnpj("11.222.333/0001-81") is True
+    assert validate_cnpj("11.222.333/0001-82") is False
+    assert validate_luhn("4111 1111 1111 1111") is True
+    assert validate_luhn("4111 1111 1111 1112") is False
+    assert validate_titulo_eleitor("0043 5687 09 06") is True
+    assert validate_cnh("000.000.000-00") is False
+
+def test_batch_matches_scalar():
+    import random
+    from lai_guardian.core.validators import SCHEMES, NUMPY_MIN_BATCH, validate, validate_batch
+    rng = random.Random(0)
+    for name, scheme in SCHEMES.items():
+        sizes = scheme.lengths + (scheme.lengths[0] - 1,)
+        values = ["".join(rng.choice("0123456789") for _ in range(rng.choice(sizes))) for _ in range(20_000)]
+        values += ["529.982.247-25", "", "x"]
+        assert len(values) >= NUMPY_MIN_BATCH
+        expected = [validate(v, name) for v in values]
+        assert any(expected)
+        assert validate_batch(values, name).tolist() == expected